@@ -1,9 +1,9 @@
 from __future__ import annotations
 
 import re
-from typing import Iterable
+from typing import Iterable, Sequence
 
-from app.models import AdviceResponse
+from app.models import AdviceResponse, Citation, EvidenceItem, ForecastItem, PolicyOption
 
 NUMERIC_PATTERN = re.compile(r"\b\d+(?:\.\d+)?%?\b")
 
@@ -17,34 +17,61 @@ def _validate_item_has_citations(text: str, citations: Iterable[str], context: s
         raise ValueError(f"Numeric claim without citation in {context}.")
 
 
-def validate_response_citations(response: AdviceResponse) -> None:
-    if not response.citations:
+def validate_summary(summary: str) -> None:
+    _validate_item_has_citations(summary, [], "summary")
+
+
+def validate_evidence_item(evidence: EvidenceItem) -> None:
+    _validate_item_has_citations(evidence.claim, evidence.citations, f"evidence:{evidence.label}")
+
+
+def validate_forecast_item(outlook: ForecastItem) -> None:
+    if outlook.predicted_value is not None and not outlook.citations:
+        raise ValueError(f"Forecast without citations: {outlook.metric}")
+
+
+def validate_option(option: PolicyOption) -> None:
+    _validate_item_has_citations(option.description, [], f"option:{option.title}")
+    for bullet in option.pros + option.cons:
+        _validate_item_has_citations(bullet, [], f"option:{option.title}")
+    _validate_item_has_citations(option.implementation_notes, [], f"option:{option.title}")
+
+
+def validate_risk(risk: str) -> None:
+    _validate_item_has_citations(risk, [], "risk")
+
+
+def validate_citation_references(
+    citations: Sequence[Citation],
+    evidence: Iterable[EvidenceItem],
+    outlook: Iterable[ForecastItem],
+) -> None:
+    if not citations:
         raise ValueError("Response must include citations.")
 
-    citation_ids = {citation.citation_id for citation in response.citations}
-    if len(citation_ids) != len(response.citations):
+    citation_ids = {citation.citation_id for citation in citations}
+    if len(citation_ids) != len(citations):
         raise ValueError("Duplicate citation_id values found.")
 
-    _validate_item_has_citations(response.summary, [], "summary")
-
-    for evidence in response.evidence:
-        _validate_item_has_citations(evidence.claim, evidence.citations, f"evidence:{evidence.label}")
-        for citation_id in evidence.citations:
+    for item in evidence:
+        for citation_id in item.citations:
             if citation_id not in citation_ids:
                 raise ValueError(f"Evidence references unknown citation_id: {citation_id}")
 
-    for outlook in response.outlook:
-        if outlook.predicted_value is not None and not outlook.citations:
-            raise ValueError(f"Forecast without citations: {outlook.metric}")
-        for citation_id in outlook.citations:
+    for item in outlook:
+        for citation_id in item.citations:
             if citation_id not in citation_ids:
                 raise ValueError(f"Forecast references unknown citation_id: {citation_id}")
 
-    for option in response.options:
-        _validate_item_has_citations(option.description, [], f"option:{option.title}")
-        for bullet in option.pros + option.cons:
-            _validate_item_has_citations(bullet, [], f"option:{option.title}")
-        _validate_item_has_citations(option.implementation_notes, [], f"option:{option.title}")
 
+def validate_response_citations(response: AdviceResponse) -> None:
+    validate_citation_references(response.citations, response.evidence, response.outlook)
+    validate_summary(response.summary)
+    for evidence in response.evidence:
+        validate_evidence_item(evidence)
+    for outlook in response.outlook:
+        validate_forecast_item(outlook)
+    for option in response.options:
+        validate_option(option)
     for risk in response.risks:
-        _validate_item_has_citations(risk, [], "risk")
+        validate_risk(risk)
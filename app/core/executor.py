@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+
+from app.core.threads import configure_thread_budget, thread_budget
+
+T = TypeVar("T")
+
+_cancel_event: contextvars.ContextVar[Optional[threading.Event]] = contextvars.ContextVar(
+    "advice_cancel_event",
+    default=None,
+)
+
+
+class PoolSaturated(Exception):
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Advice workers are busy; retry shortly.")
+        self.retry_after = retry_after
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+def cancellation_requested() -> bool:
+    event = _cancel_event.get()
+    return event is not None and event.is_set()
+
+
+def _run_cancellable(event: threading.Event, fn: Callable[..., T], args: tuple) -> T:
+    token = _cancel_event.set(event)
+    try:
+        return fn(*args)
+    finally:
+        _cancel_event.reset(token)
+
+
+def _init_process_worker(threads: int) -> None:
+    configure_thread_budget(threads)
+
+
+@dataclass
+class Job(Generic[T]):
+    future: Future
+    event: threading.Event
+    result: "asyncio.Future[T]"
+
+    def cancel(self) -> None:
+        self.event.set()
+        self.future.cancel()
+
+
+class WorkPool:
+    def __init__(self, workers: int, max_queue: int, kind: str = "thread", retry_after: int = 5) -> None:
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.kind = kind
+        self.retry_after = max(1, retry_after)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor: Executor
+        if kind == "process":
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_process_worker,
+                initargs=(thread_budget(),),
+            )
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="advice")
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                raise PoolSaturated(self.retry_after)
+            self._pending += 1
+
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def start(self, fn: Callable[..., T], *args) -> "Job[T]":
+        self._acquire()
+        event = threading.Event()
+        try:
+            if self.kind == "process":
+                future = self._executor.submit(fn, *args)
+            else:
+                future = self._executor.submit(_run_cancellable, event, fn, args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return Job(future=future, event=event, result=asyncio.wrap_future(future))
+
+    async def run(
+        self,
+        fn: Callable[..., T],
+        *args,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+        poll_seconds: float = 0.25,
+    ) -> T:
+        job = self.start(fn, *args)
+        try:
+            if is_disconnected is None:
+                return await job.result
+            while True:
+                done, _ = await asyncio.wait({job.result}, timeout=poll_seconds)
+                if done:
+                    return job.result.result()
+                if await is_disconnected():
+                    raise ClientDisconnected()
+        except (ClientDisconnected, asyncio.CancelledError):
+            job.cancel()
+            raise
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool: Optional[WorkPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> WorkPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkPool(
+                workers=int(os.getenv("ADVICE_WORKERS", "2")),
+                max_queue=int(os.getenv("ADVICE_MAX_QUEUE", "8")),
+                kind=os.getenv("ADVICE_EXECUTOR", "thread"),
+                retry_after=int(os.getenv("ADVICE_RETRY_AFTER", "5")),
+            )
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+DisconnectCheck = Callable[[], Awaitable[bool]]
+
+
+def request_key(payload: BaseModel, *versions: str) -> str:
+    canonical = json.dumps(
+        {"payload": payload.model_dump(mode="json"), "versions": list(versions)},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class _Flight(Generic[T]):
+    task: Optional["asyncio.Future[T]"] = None
+    waiters: List[Optional[DisconnectCheck]] = field(default_factory=list)
+
+    async def abandoned(self) -> bool:
+        if not self.waiters:
+            return True
+        for is_disconnected in list(self.waiters):
+            if is_disconnected is None or not await is_disconnected():
+                return False
+        return True
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._flights: Dict[str, _Flight] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def do(
+        self,
+        key: str,
+        run: Callable[[DisconnectCheck], Awaitable[T]],
+        is_disconnected: Optional[DisconnectCheck] = None,
+    ) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.ensure_future(run(flight.abandoned))
+            flight.task.add_done_callback(lambda _task, key=key, flight=flight: self._forget(key, flight))
+        flight.waiters.append(is_disconnected)
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters.remove(is_disconnected)
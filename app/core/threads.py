@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # pragma: no cover - optional dependency
+    threadpool_limits = None
+
+BLAS_THREAD_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+_configured: Optional[int] = None
+
+
+def thread_budget() -> int:
+    configured = os.getenv("FORECAST_NUM_THREADS")
+    if configured:
+        return max(1, int(configured))
+    servers = max(1, int(os.getenv("WEB_CONCURRENCY", "1")))
+    advice_workers = max(1, int(os.getenv("ADVICE_WORKERS", "2")))
+    return max(1, (os.cpu_count() or 1) // (servers * advice_workers))
+
+
+def configure_thread_budget(threads: Optional[int] = None) -> int:
+    global _configured
+    threads = threads or thread_budget()
+    if _configured == threads:
+        return threads
+    for name in BLAS_THREAD_VARS:
+        os.environ.setdefault(name, str(threads))
+    if threadpool_limits is not None:
+        threadpool_limits(limits=threads)
+    torch = None
+    if os.getenv("FORECAST_INFERENCE", "train") != "prebuilt":
+        try:
+            import torch
+        except ImportError:
+            torch = None
+    if torch is not None:
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass
+    _configured = threads
+    return threads
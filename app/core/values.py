@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 import json
 from dataclasses import dataclass
 from pathlib import Path
@@ -43,3 +44,9 @@ def load_admin_values() -> AdminValues:
         feasibility_weight=float(payload.get("feasibility_weight", defaults.feasibility_weight)),
         risk_weight=float(payload.get("risk_weight", defaults.risk_weight)),
     )
+
+
+def values_version() -> str:
+    if not VALUES_PATH.exists():
+        return "default"
+    return hashlib.sha256(VALUES_PATH.read_bytes()).hexdigest()[:16]
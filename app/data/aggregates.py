@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.data.schemas import memory_report, schema_for
+from app.data.snapshots import current_processed_dir
+
+DERIVED_DIR = "_derived"
+ACS_FILE = "census_acs_fl_county/acs_county.csv"
+SERIES_FILES = (
+    "bls_unemployment/unemployment.csv",
+    "bls_unemployment/county/*.csv",
+    "bls_unemployment/metro/*.csv",
+    "fred_macro/fred_macro.csv",
+)
+DERIVED_INPUTS: Dict[str, Optional[Set[str]]] = {
+    "state_averages.csv": {"census_acs_fl_county"},
+    "series_latest.csv": {"bls_unemployment", "fred_macro"},
+    "county_ranks.csv": {"census_acs_fl_county"},
+    "county_peers.csv": {"census_acs_fl_county"},
+    "dataset_memory.csv": None,
+}
+RANK_INDICATORS = (
+    "median_household_income",
+    "median_gross_rent",
+    "median_home_value",
+    "poverty_rate",
+    "vacancy_rate",
+    "rent_to_income",
+    "population",
+)
+
+
+def derived_path(name: str, processed_dir: Optional[Path] = None) -> Path:
+    return (processed_dir or current_processed_dir()) / DERIVED_DIR / name
+
+
+def load_derived(name: str, processed_dir: Optional[Path] = None) -> pd.DataFrame:
+    path = derived_path(name, processed_dir)
+    if not path.exists():
+        return pd.DataFrame()
+    return pd.read_csv(path, dtype={"county_fips": str, "peer_fips": str, "series_id": str, "latest_date": str, "prior_date": str})
+
+
+def state_averages(acs: pd.DataFrame) -> pd.DataFrame:
+    if acs.empty or "year" not in acs.columns:
+        return pd.DataFrame()
+    numeric_cols = acs.select_dtypes(include="number").columns.drop("year")
+    return acs.groupby("year")[numeric_cols].mean().reset_index()
+
+
+def series_changes(df: pd.DataFrame, source: str) -> pd.DataFrame:
+    columns = ["source", "series_id", "latest_date", "latest_value", "prior_date", "prior_value", "change", "pct_change"]
+    if df.empty or not {"series_id", "date", "value"} <= set(df.columns):
+        return pd.DataFrame(columns=columns)
+    dates = df["date"]
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        dates = dates.dt.strftime(schema_for(source.split("/")[0]).date_format)
+    ordered = df.assign(series_id=df["series_id"].astype(str), date=dates.astype(str)).sort_values(["series_id", "date"])
+    tail = ordered.groupby("series_id").tail(2)
+    latest = tail.groupby("series_id").last()
+    prior = tail.groupby("series_id").nth(-2).set_index("series_id") if len(tail) else tail
+    frame = pd.DataFrame({
+        "source": source,
+        "series_id": latest.index,
+        "latest_date": latest["date"].to_numpy(),
+        "latest_value": latest["value"].to_numpy(),
+    })
+    frame["prior_date"] = frame["series_id"].map(prior["date"]) if not prior.empty else None
+    frame["prior_value"] = frame["series_id"].map(prior["value"]) if not prior.empty else None
+    frame["change"] = frame["latest_value"] - frame["prior_value"]
+    frame["pct_change"] = frame["change"] / frame["prior_value"].where(frame["prior_value"] != 0) * 100
+    return frame[columns]
+
+
+def county_ranks(acs: pd.DataFrame) -> pd.DataFrame:
+    if acs.empty or "year" not in acs.columns:
+        return pd.DataFrame()
+    latest = acs[acs["year"] == acs["year"].max()].drop_duplicates("county_fips")
+    latest = latest.assign(county_fips=latest["county_fips"].astype(str).str.zfill(5))
+    indicators = [column for column in RANK_INDICATORS if column in latest.columns]
+    long = latest.melt(
+        id_vars=["county_fips", "county_name", "year"],
+        value_vars=indicators,
+        var_name="indicator",
+        value_name="value",
+    ).dropna(subset=["value"])
+    grouped = long.groupby("indicator")["value"]
+    long["percentile"] = (grouped.rank(method="max", pct=True) * 100).round(1)
+    long["rank"] = grouped.rank(method="min", ascending=False).astype(int)
+    long["count"] = grouped.transform("size")
+    return long.sort_values(["indicator", "rank"]).reset_index(drop=True)
+
+
+def peer_count() -> int:
+    return max(1, int(os.getenv("PEER_COUNT", "5")))
+
+
+def county_peers(acs: pd.DataFrame, k: Optional[int] = None) -> pd.DataFrame:
+    columns = ["county_fips", "peer_rank", "peer_fips", "peer_name", "distance"]
+    if acs.empty or "year" not in acs.columns:
+        return pd.DataFrame(columns=columns)
+    latest = acs[acs["year"] == acs["year"].max()].drop_duplicates("county_fips")
+    indicators = [column for column in RANK_INDICATORS if column in latest.columns]
+    k = min(k or peer_count(), len(latest) - 1)
+    if k < 1 or not indicators:
+        return pd.DataFrame(columns=columns)
+    features = latest[indicators].astype(float)
+    if "population" in features.columns:
+        features["population"] = np.log1p(features["population"].clip(lower=0))
+    std = features.std(ddof=0).replace(0, 1.0)
+    z = ((features - features.mean()) / std).fillna(0.0).to_numpy()
+    squared = (z * z).sum(axis=1)
+    distances = np.sqrt(np.maximum(squared[:, None] + squared[None, :] - 2.0 * z @ z.T, 0.0))
+    np.fill_diagonal(distances, np.inf)
+    nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(distances, nearest, axis=1).argsort(axis=1)
+    nearest = np.take_along_axis(nearest, order, axis=1)
+    fips = latest["county_fips"].astype(str).str.zfill(5).to_numpy()
+    names = latest["county_name"].to_numpy()
+    return pd.DataFrame({
+        "county_fips": np.repeat(fips, k),
+        "peer_rank": np.tile(np.arange(1, k + 1), len(fips)),
+        "peer_fips": fips[nearest].ravel(),
+        "peer_name": names[nearest].ravel(),
+        "distance": np.take_along_axis(distances, nearest, axis=1).ravel().round(4),
+    })
+
+
+def _read(path: Path) -> pd.DataFrame:
+    return pd.read_csv(path, dtype={"county_fips": str, "series_id": str, "date": str}) if path.exists() else pd.DataFrame()
+
+
+def _series_sources(processed_dir: Path) -> Iterator[Tuple[str, Path]]:
+    for pattern in SERIES_FILES:
+        for path in sorted(processed_dir.glob(pattern)):
+            yield str(path.relative_to(processed_dir)), path
+
+
+def _memory(processed_dir: Path, datasets: Optional[Set[str]]) -> pd.DataFrame:
+    previous = load_derived("dataset_memory.csv", processed_dir)
+    if datasets is None or previous.empty:
+        return memory_report(processed_dir)
+    kept = previous[~previous["dataset_id"].isin(datasets)]
+    fresh = memory_report(processed_dir, datasets)
+    return pd.concat([kept, fresh], ignore_index=True).sort_values("dataset_id")
+
+
+def build_aggregates(processed_dir: Path, datasets: Optional[Iterable[str]] = None) -> List[Path]:
+    changed = None if datasets is None else set(datasets)
+    target = processed_dir / DERIVED_DIR
+    target.mkdir(parents=True, exist_ok=True)
+    builders: Dict[str, Callable[[], pd.DataFrame]] = {
+        "state_averages.csv": lambda: state_averages(_read(processed_dir / ACS_FILE)),
+        "series_latest.csv": lambda: pd.concat(
+            [series_changes(_read(path), source) for source, path in _series_sources(processed_dir)]
+            or [series_changes(pd.DataFrame(), "")],
+            ignore_index=True,
+        ),
+        "county_ranks.csv": lambda: county_ranks(_read(processed_dir / ACS_FILE)),
+        "county_peers.csv": lambda: county_peers(_read(processed_dir / ACS_FILE)),
+        "dataset_memory.csv": lambda: _memory(processed_dir, changed),
+    }
+    written = []
+    for name, build in builders.items():
+        path = target / name
+        inputs = DERIVED_INPUTS.get(name)
+        if changed is not None and path.exists() and inputs is not None and not inputs & changed:
+            continue
+        tmp = path.with_suffix(".tmp")
+        build().to_csv(tmp, index=False)
+        os.replace(tmp, path)
+        written.append(path)
+    return written
+
+
+def build_all(processed_root: Path, datasets: Optional[Iterable[str]] = None) -> List[Path]:
+    datasets = None if datasets is None else list(datasets)
+    partitions = [processed_root]
+    states_dir = processed_root / "states"
+    if states_dir.exists():
+        partitions += sorted(path for path in states_dir.iterdir() if path.is_dir())
+    return [path for partition in partitions for path in build_aggregates(partition, datasets)]
+
+
+if __name__ == "__main__":
+    from app.data.snapshots import current_snapshot, default_store
+
+    snapshot = current_snapshot()
+    for path in build_all(snapshot.processed_dir if snapshot else default_store().legacy_processed):
+        print(path)
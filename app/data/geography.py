@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import contextvars
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+STATE_FIPS = "12"
+DEFAULT_STATE = "FL"
+
+STATES: Dict[str, Tuple[str, str]] = {
+    "AL": ("01", "Alabama"), "AK": ("02", "Alaska"), "AZ": ("04", "Arizona"),
+    "AR": ("05", "Arkansas"), "CA": ("06", "California"), "CO": ("08", "Colorado"),
+    "CT": ("09", "Connecticut"), "DE": ("10", "Delaware"), "DC": ("11", "District of Columbia"),
+    "FL": ("12", "Florida"), "GA": ("13", "Georgia"), "HI": ("15", "Hawaii"),
+    "ID": ("16", "Idaho"), "IL": ("17", "Illinois"), "IN": ("18", "Indiana"),
+    "IA": ("19", "Iowa"), "KS": ("20", "Kansas"), "KY": ("21", "Kentucky"),
+    "LA": ("22", "Louisiana"), "ME": ("23", "Maine"), "MD": ("24", "Maryland"),
+    "MA": ("25", "Massachusetts"), "MI": ("26", "Michigan"), "MN": ("27", "Minnesota"),
+    "MS": ("28", "Mississippi"), "MO": ("29", "Missouri"), "MT": ("30", "Montana"),
+    "NE": ("31", "Nebraska"), "NV": ("32", "Nevada"), "NH": ("33", "New Hampshire"),
+    "NJ": ("34", "New Jersey"), "NM": ("35", "New Mexico"), "NY": ("36", "New York"),
+    "NC": ("37", "North Carolina"), "ND": ("38", "North Dakota"), "OH": ("39", "Ohio"),
+    "OK": ("40", "Oklahoma"), "OR": ("41", "Oregon"), "PA": ("42", "Pennsylvania"),
+    "RI": ("44", "Rhode Island"), "SC": ("45", "South Carolina"), "SD": ("46", "South Dakota"),
+    "TN": ("47", "Tennessee"), "TX": ("48", "Texas"), "UT": ("49", "Utah"),
+    "VT": ("50", "Vermont"), "VA": ("51", "Virginia"), "WA": ("53", "Washington"),
+    "WV": ("54", "West Virginia"), "WI": ("55", "Wisconsin"), "WY": ("56", "Wyoming"),
+}
+
+FL_COUNTIES: Dict[str, str] = {
+    "12001": "Alachua", "12003": "Baker", "12005": "Bay", "12007": "Bradford",
+    "12009": "Brevard", "12011": "Broward", "12013": "Calhoun", "12015": "Charlotte",
+    "12017": "Citrus", "12019": "Clay", "12021": "Collier", "12023": "Columbia",
+    "12027": "DeSoto", "12029": "Dixie", "12031": "Duval", "12033": "Escambia",
+    "12035": "Flagler", "12037": "Franklin", "12039": "Gadsden", "12041": "Gilchrist",
+    "12043": "Glades", "12045": "Gulf", "12047": "Hamilton", "12049": "Hardee",
+    "12051": "Hendry", "12053": "Hernando", "12055": "Highlands", "12057": "Hillsborough",
+    "12059": "Holmes", "12061": "Indian River", "12063": "Jackson", "12065": "Jefferson",
+    "12067": "Lafayette", "12069": "Lake", "12071": "Lee", "12073": "Leon",
+    "12075": "Levy", "12077": "Liberty", "12079": "Madison", "12081": "Manatee",
+    "12083": "Marion", "12085": "Martin", "12086": "Miami-Dade", "12087": "Monroe",
+    "12089": "Nassau", "12091": "Okaloosa", "12093": "Okeechobee", "12095": "Orange",
+    "12097": "Osceola", "12099": "Palm Beach", "12101": "Pasco", "12103": "Pinellas",
+    "12105": "Polk", "12107": "Putnam", "12109": "St. Johns", "12111": "St. Lucie",
+    "12113": "Santa Rosa", "12115": "Sarasota", "12117": "Seminole", "12119": "Sumter",
+    "12121": "Suwannee", "12123": "Taylor", "12125": "Union", "12127": "Volusia",
+    "12129": "Wakulla", "12131": "Walton", "12133": "Washington",
+}
+
+FL_METROS: Dict[str, str] = {
+    "15980": "Cape Coral-Fort Myers",
+    "18880": "Crestview-Fort Walton Beach-Destin",
+    "19660": "Deltona-Daytona Beach-Ormond Beach",
+    "23540": "Gainesville",
+    "26140": "Homosassa Springs",
+    "27260": "Jacksonville",
+    "29460": "Lakeland-Winter Haven",
+    "33100": "Miami-Fort Lauderdale-West Palm Beach",
+    "34940": "Naples-Marco Island",
+    "35840": "North Port-Sarasota-Bradenton",
+    "36100": "Ocala",
+    "36740": "Orlando-Kissimmee-Sanford",
+    "37340": "Palm Bay-Melbourne-Titusville",
+    "37460": "Panama City",
+    "37860": "Pensacola-Ferry Pass-Brent",
+    "38940": "Port St. Lucie",
+    "39460": "Punta Gorda",
+    "42680": "Sebastian-Vero Beach",
+    "42700": "Sebring-Avon Park",
+    "45220": "Tallahassee",
+    "45300": "Tampa-St. Petersburg-Clearwater",
+    "45540": "The Villages",
+}
+
+
+_state: contextvars.ContextVar[str] = contextvars.ContextVar("active_state", default=DEFAULT_STATE)
+
+
+def resolve_state(value: str) -> Optional[str]:
+    text = value.strip()
+    if text.upper() in STATES:
+        return text.upper()
+    for code, (fips, name) in STATES.items():
+        if text.zfill(2) == fips or text.lower() in (name.lower(), f"state of {name.lower()}"):
+            return code
+    return None
+
+
+def state_fips(state: Optional[str] = None) -> str:
+    return STATES[state or current_state()][0]
+
+
+def state_name(state: Optional[str] = None) -> str:
+    return STATES[state or current_state()][1]
+
+
+def active_states() -> List[str]:
+    states = [resolve_state(item) for item in os.getenv("STATES", DEFAULT_STATE).split(",") if item.strip()]
+    return sorted({state for state in states if state}) or [DEFAULT_STATE]
+
+
+def current_state() -> str:
+    return _state.get()
+
+
+@contextmanager
+def state_scope(state: str) -> Iterator[str]:
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+def state_partition(root: Path, state: Optional[str] = None) -> Path:
+    state = state or current_state()
+    return root if state == DEFAULT_STATE else root / "states" / state
+
+
+def request_state(geography) -> str:
+    if getattr(geography, "state", None):
+        return resolve_state(geography.state) or DEFAULT_STATE
+    if geography.level == "state":
+        return resolve_state(geography.value) or DEFAULT_STATE
+    value = geography.value.strip()
+    if value.isdigit() and len(value) == 5:
+        return resolve_state(value[:2]) or DEFAULT_STATE
+    return DEFAULT_STATE
+
+
+def resolve_county_fips(value: str, state: Optional[str] = None) -> Optional[str]:
+    state = state or current_state()
+    prefix = state_fips(state)
+    text = value.strip()
+    if text.isdigit():
+        fips = text.zfill(5) if len(text) > 3 else prefix + text.zfill(3)
+        if state != DEFAULT_STATE:
+            return fips if fips.startswith(prefix) else None
+        return fips if fips in FL_COUNTIES else None
+    if state != DEFAULT_STATE:
+        return None
+    name = text.lower().removesuffix(" county").replace("saint ", "st. ")
+    for fips, county in FL_COUNTIES.items():
+        if county.lower() == name:
+            return fips
+    return None
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.data.aggregates import build_all
+from app.data.loaders import LOADERS
+from app.data.loaders.base import DATA_DIR
+from app.data.lock import refresh_lock
+from app.data.snapshots import Snapshot, SnapshotStore, default_store
+from app.data.staging import Stage, discard_stage, has_changes, run_commit_hooks, staged
+
+STAGING_DIR = DATA_DIR / "staging"
+MAX_JOBS = 20
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+@dataclass
+class DatasetProgress:
+    dataset_id: str
+    status: str = "pending"
+    rows: Optional[str] = None
+    started_at: Optional[str] = None
+    seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class RefreshJob:
+    job_id: str
+    allow_network: bool
+    status: str = "queued"
+    created_at: str = field(default_factory=_now)
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    snapshot_id: Optional[int] = None
+    datasets: List[DatasetProgress] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    options: Dict[str, Dict[str, object]] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return self.status in {"queued", "running", "committing"}
+
+    def to_dict(self) -> dict:
+        completed = sum(1 for item in self.datasets if item.status not in {"pending", "running"})
+        return {**asdict(self), "progress": {"completed": completed, "total": len(self.datasets)}}
+
+
+class RefreshJobs:
+    def __init__(
+        self,
+        loaders: Optional[Dict[str, Callable[..., dict]]] = None,
+        store: Optional[SnapshotStore] = None,
+        staging_dir: Optional[Path] = None,
+        lock_path: Optional[Path] = None,
+        precompute: Optional[Callable[[Snapshot, List[str]], object]] = None,
+    ) -> None:
+        self.loaders = LOADERS if loaders is None else loaders
+        self.store = store
+        self.staging_dir = staging_dir or STAGING_DIR
+        self.lock_path = lock_path
+        self.precompute = precompute
+        self._jobs: "OrderedDict[str, RefreshJob]" = OrderedDict()
+        self._active: Optional[RefreshJob] = None
+        self._lock = threading.Lock()
+        self._on_commit: List[Callable[[RefreshJob], None]] = []
+
+    def on_commit(self, callback: Callable[[RefreshJob], None]) -> None:
+        self._on_commit.append(callback)
+
+    def get(self, job_id: str) -> Optional[RefreshJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def submit(
+        self,
+        allow_network: bool = True,
+        dataset_ids: Optional[Sequence[str]] = None,
+        options: Optional[Dict[str, Dict[str, object]]] = None,
+    ) -> Tuple[RefreshJob, bool]:
+        with self._lock:
+            if self._active is not None and self._active.active:
+                return self._active, False
+            job = RefreshJob(
+                job_id=uuid.uuid4().hex,
+                allow_network=allow_network,
+                options=dict(options or {}),
+                datasets=[
+                    DatasetProgress(dataset_id=dataset_id)
+                    for dataset_id in self.loaders
+                    if dataset_ids is None or dataset_id in dataset_ids
+                ],
+            )
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > MAX_JOBS:
+                self._jobs.popitem(last=False)
+            self._active = job
+        threading.Thread(target=self._run, args=(job,), name=f"refresh-{job.job_id[:8]}", daemon=True).start()
+        return job, True
+
+    def _run(self, job: RefreshJob) -> None:
+        job.status = "running"
+        job.started_at = _now()
+        stage = Stage(root=self.staging_dir / job.job_id)
+        try:
+            with refresh_lock(self.lock_path) as acquired:
+                if not acquired:
+                    job.status = "locked"
+                    job.error = "Another refresh holds the refresh lock."
+                    return
+                with staged(stage):
+                    for progress in job.datasets:
+                        self._run_loader(job, progress)
+                if not has_changes(stage):
+                    discard_stage(stage)
+                    run_commit_hooks(stage)
+                    job.status = "unchanged"
+                    return
+                job.status = "committing"
+                job.changed = sorted(stage.registry_updates)
+                snapshot = (self.store or default_store()).commit(
+                    stage.root,
+                    stage.registry_updates,
+                    lambda building: self._finalize(building, job.changed),
+                )
+                run_commit_hooks(stage)
+            job.snapshot_id = snapshot.snapshot_id
+            discard_stage(stage)
+            for callback in self._on_commit:
+                callback(job)
+            job.status = "committed"
+        except Exception as exc:
+            discard_stage(stage)
+            job.status = "failed"
+            job.error = str(exc)
+        finally:
+            job.finished_at = _now()
+            with self._lock:
+                if self._active is job:
+                    self._active = None
+
+    def _finalize(self, snapshot: Snapshot, changed: List[str]) -> None:
+        build_all(snapshot.processed_dir, changed or None)
+        if self.precompute is not None:
+            self.precompute(snapshot, changed)
+
+    def _run_loader(self, job: RefreshJob, progress: DatasetProgress) -> None:
+        progress.status = "running"
+        progress.started_at = _now()
+        started = time.perf_counter()
+        try:
+            result = self.loaders[progress.dataset_id](
+                allow_network=job.allow_network,
+                **job.options.get(progress.dataset_id, {}),
+            )
+            progress.status = result.get("status", "completed")
+            progress.rows = result.get("rows")
+            progress.error = result.get("error")
+        except Exception as exc:
+            progress.status = "error"
+            progress.error = str(exc)
+        progress.seconds = round(time.perf_counter() - started, 3)
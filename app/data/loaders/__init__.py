@@ -1,5 +1,15 @@
 from app.data.loaders.bls import refresh as refresh_bls
 from app.data.loaders.census_acs import refresh as refresh_acs
+from app.data.loaders.downloads import refresh_bdc, refresh_ccd, refresh_hpms, refresh_nri, refresh_places
 from app.data.loaders.fred import refresh as refresh_fred
 
-LOADERS = [refresh_bls, refresh_acs, refresh_fred]
+LOADERS = {
+    "bls_unemployment": refresh_bls,
+    "census_acs_fl_county": refresh_acs,
+    "fred_macro": refresh_fred,
+    "cdc_places": refresh_places,
+    "fema_nri": refresh_nri,
+    "fhwa_hpms": refresh_hpms,
+    "fcc_bdc": refresh_bdc,
+    "nces_ccd_grad": refresh_ccd,
+}
@@ -1,7 +1,16 @@
 from __future__ import annotations
 
+import io
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from app.data.geography import DEFAULT_STATE, active_states, current_state, state_partition, state_scope
+from app.data.registry import update_dataset_refresh
+from app.data.snapshots import current_processed_dir
+from app.data.sqlite import write_table
+from app.data.staging import current_stage
 
 ROOT_DIR = Path(__file__).resolve().parents[3]
 DATA_DIR = ROOT_DIR / "data"
@@ -18,8 +27,91 @@ def fixture_path(dataset_id: str, filename: str) -> Optional[Path]:
 
 
 def processed_path(dataset_id: str, filename: str) -> Path:
-    return DATA_DIR / "processed" / dataset_id / filename
+    stage = current_stage()
+    root = stage.root if stage is not None else DATA_DIR / "processed"
+    return state_partition(root) / dataset_id / filename
 
 
 def raw_path(dataset_id: str, filename: str) -> Path:
-    return DATA_DIR / "raw" / dataset_id / filename
+    return state_partition(DATA_DIR / "raw") / dataset_id / filename
+
+
+def published_path(dataset_id: str, filename: str, state: Optional[str] = None) -> Path:
+    with state_scope(state or current_state()):
+        return current_processed_dir() / dataset_id / filename
+
+
+def unchanged_result(dataset_id: str) -> Dict[str, str]:
+    return {"dataset_id": dataset_id, "status": "unchanged", "rows": "0"}
+
+
+def for_each_state(dataset_id: str, refresh_state: Callable[[str], Dict[str, str]]) -> Dict[str, str]:
+    results = {}
+    for state in active_states():
+        with state_scope(state):
+            results[state] = refresh_state(state)
+    if len(results) == 1:
+        return next(iter(results.values()))
+    statuses = {result.get("status") for result in results.values()}
+    if len(statuses) == 1:
+        status = statuses.pop()
+    elif statuses & {"failed", "fallback"}:
+        status = "partial"
+    else:
+        status = next(item for item in ("downloaded", "cached", "unchanged") if item in statuses)
+    combined = {
+        "dataset_id": dataset_id,
+        "status": status,
+        "rows": str(sum(int(result["rows"]) for result in results.values() if str(result.get("rows")).isdigit())),
+        "states": ",".join(results),
+    }
+    errors = [
+        f"{state}: {result.get('error', 'failed')}"
+        for state, result in results.items()
+        if result.get("status") in {"failed", "fallback"} or result.get("error")
+    ]
+    if errors:
+        combined["error"] = "; ".join(errors)
+    return combined
+
+
+def failed_result(dataset_id: str, error: Optional[str] = None) -> Dict[str, str]:
+    result = {"dataset_id": dataset_id, "status": "failed", "rows": "0"}
+    if error:
+        result["error"] = error
+    return result
+
+
+def refresh_from_fixture(
+    dataset_id: str,
+    filename: str,
+    retrieval_date: str,
+    error: Optional[str] = None,
+) -> Optional[Dict[str, str]]:
+    if current_state() != DEFAULT_STATE:
+        return None
+    fixture = fixture_path(dataset_id, filename)
+    if fixture is None:
+        return None
+    content = fixture.read_bytes()
+    published = published_path(dataset_id, filename)
+    if published.exists() and published.read_bytes() == content:
+        result = unchanged_result(dataset_id)
+        if error:
+            result.update(status="fallback", error=error)
+        return result
+    processed_file = processed_path(dataset_id, filename)
+    ensure_dir(processed_file.parent)
+    processed_file.write_bytes(content)
+    raw_file = raw_path(dataset_id, "fixture.csv")
+    ensure_dir(raw_file.parent)
+    raw_file.write_bytes(content)
+    try:
+        write_table(pd.read_csv(io.BytesIO(content)), dataset_id)
+    except Exception:
+        pass
+    update_dataset_refresh(dataset_id, retrieval_date)
+    result = {"dataset_id": dataset_id, "status": "cached", "rows": "fixture"}
+    if error:
+        result.update(status="fallback", error=error)
+    return result
@@ -2,88 +2,192 @@ from __future__ import annotations
 
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
-from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Sequence, Tuple
 
 import pandas as pd
 import requests
 
-from app.data.loaders.base import ensure_dir, fixture_path, processed_path, raw_path
-from app.data.sqlite import write_table
+from app.data.geography import DEFAULT_STATE, FL_COUNTIES, FL_METROS, state_fips, state_name
+from app.data.loaders.base import (
+    ensure_dir,
+    failed_result,
+    for_each_state,
+    processed_path,
+    published_path,
+    raw_path,
+    refresh_from_fixture,
+    unchanged_result,
+)
+from app.data.loaders.fetch import FetchResult, RateLimiter, fetch, save_after_commit
 from app.data.registry import update_dataset_refresh
+from app.data.schemas import STORED_MEASURE, apply_schema, write_csv
+from app.data.sqlite import write_table
 
 BLS_URL = "https://api.bls.gov/publicAPI/v2/timeseries/data/"
+MEASURES = {"03": "unemployment_rate", "04": "unemployment", "05": "employment", "06": "labor_force"}
+
+Batch = Tuple[Tuple[str, ...], int, int]
+
+
+def state_counties(state: str) -> Dict[str, str]:
+    if state == DEFAULT_STATE:
+        return dict(FL_COUNTIES)
+    acs = published_path("census_acs_fl_county", "acs_county.csv")
+    if not acs.exists():
+        return {}
+    frame = pd.read_csv(acs, dtype={"county_fips": str}, usecols=["county_fips", "county_name"])
+    return dict(frame.drop_duplicates("county_fips").itertuples(index=False, name=None))
+
+
+def series_catalog(measures: Sequence[str] = ("03",), state: str = DEFAULT_STATE) -> pd.DataFrame:
+    fips = state_fips(state)
+    metros = FL_METROS if state == DEFAULT_STATE else {}
+    areas = [("state", fips, state_name(state), f"ST{fips}00000000000")]
+    areas += [("county", county, name, f"CN{county}00000000") for county, name in state_counties(state).items()]
+    areas += [("metro", cbsa, name, f"MT{fips}{cbsa}000000") for cbsa, name in metros.items()]
+    return pd.DataFrame([
+        {
+            "series_id": f"LAU{area_code}{measure}",
+            "area_type": area_type,
+            "area_code": code,
+            "area_name": name,
+            "measure": MEASURES.get(measure, measure),
+        }
+        for area_type, code, name, area_code in areas
+        for measure in measures
+    ])
+
+
+def batch_limits(has_key: bool) -> Tuple[int, int]:
+    return (50, 20) if has_key else (25, 10)
+
+
+def plan_batches(series_ids: Sequence[str], start_year: int, end_year: int, max_series: int, max_years: int) -> List[Batch]:
+    windows = [
+        (first, min(first + max_years - 1, end_year))
+        for first in range(start_year, end_year + 1, max_years)
+    ]
+    return [
+        (tuple(series_ids[offset:offset + max_series]), first, last)
+        for offset in range(0, len(series_ids), max_series)
+        for first, last in windows
+    ]
 
 
 def _process_bls_json(payload: Dict) -> pd.DataFrame:
     series = payload.get("Results", {}).get("series", [])
-    rows = []
+    series_ids, dates, values = [], [], []
     for series_item in series:
         series_id = series_item.get("seriesID")
         for entry in series_item.get("data", []):
             year = entry.get("year")
             period = entry.get("period", "")
-            if not period.startswith("M"):
+            if not period.startswith("M") or period == "M13":
+                continue
+            try:
+                value = float(entry.get("value"))
+            except (TypeError, ValueError):
                 continue
-            month = period.replace("M", "")
-            date_str = f"{year}-{month.zfill(2)}"
-            rows.append({
-                "series_id": series_id,
-                "date": date_str,
-                "value": float(entry.get("value")),
-            })
-    return pd.DataFrame(rows)
+            series_ids.append(series_id)
+            dates.append(f"{year}-{period[1:].zfill(2)}")
+            values.append(value)
+    return apply_schema(pd.DataFrame({"series_id": series_ids, "date": dates, "value": values}), "bls_unemployment", STORED_MEASURE)
+
+
+def _results_fingerprint(content: bytes) -> bytes:
+    return json.dumps(json.loads(content).get("Results"), sort_keys=True).encode("utf-8")
+
+
+def _fetch_batch(batch: Batch, api_key: str, session: requests.Session, limiter: RateLimiter) -> Tuple[FetchResult, Dict]:
+    series_ids, start_year, end_year = batch
+    payload = {
+        "seriesid": list(series_ids),
+        "startyear": str(start_year),
+        "endyear": str(end_year),
+    }
+    if api_key:
+        payload["registrationkey"] = api_key
+    result = fetch(
+        "POST",
+        BLS_URL,
+        json_body=payload,
+        timeout=30,
+        session=session,
+        limiter=limiter,
+        fingerprint=_results_fingerprint,
+    )
+    body = result.json()
+    if body.get("status") != "REQUEST_SUCCEEDED":
+        raise ValueError("; ".join(body.get("message", [])) or "BLS request failed")
+    return result, body
+
+
+def _write_partitions(df: pd.DataFrame, catalog: pd.DataFrame) -> None:
+    merged = df.merge(catalog[["series_id", "area_type", "area_code", "measure"]], on="series_id")
+    for (area_type, area_code), rows in merged.groupby(["area_type", "area_code"]):
+        if area_type == "state":
+            continue
+        target = processed_path("bls_unemployment", f"{area_type}/{area_code}.csv")
+        ensure_dir(target.parent)
+        write_csv(rows[["series_id", "measure", "date", "value"]].sort_values(["measure", "date"]), target, "bls_unemployment")
+    write_csv(catalog, processed_path("bls_unemployment", "catalog.csv"), "bls_unemployment")
 
 
 def refresh(allow_network: bool = True) -> Dict[str, str]:
+    return for_each_state("bls_unemployment", lambda state: _refresh_state(state, allow_network))
+
+
+def _refresh_state(state: str, allow_network: bool) -> Dict[str, str]:
     dataset_id = "bls_unemployment"
-    series_id = os.getenv("BLS_SERIES_ID", "LAUST120000000000003")
+    series_id = f"LAUST{state_fips(state)}0000000000003"
+    if state == DEFAULT_STATE:
+        series_id = os.getenv("BLS_SERIES_ID", series_id)
     start_year = os.getenv("BLS_START_YEAR")
     end_year = os.getenv("BLS_END_YEAR")
     today = date.today()
-    start_year = start_year or str(today.year - 2)
-    end_year = end_year or str(today.year)
+    start_year = int(start_year or today.year - 2)
+    end_year = int(end_year or today.year)
+    measures = [item.strip() for item in os.getenv("BLS_LAUS_MEASURES", "03").split(",") if item.strip()]
 
     raw_dir = ensure_dir(raw_path(dataset_id, "").parent)
     processed_file = processed_path(dataset_id, "unemployment.csv")
     ensure_dir(processed_file.parent)
 
+    error = None
     if allow_network and not os.getenv("FORCE_OFFLINE"):
         try:
-            payload = {
-                "seriesid": [series_id],
-                "startyear": start_year,
-                "endyear": end_year,
-            }
-            api_key = os.getenv("BLS_API_KEY")
-            if api_key:
-                payload["registrationkey"] = api_key
-            response = requests.post(BLS_URL, json=payload, timeout=30)
-            response.raise_for_status()
+            api_key = os.getenv("BLS_API_KEY", "")
+            catalog = series_catalog(measures, state)
+            series_ids = [series_id] + [item for item in catalog["series_id"] if item != series_id]
+            max_series, max_years = batch_limits(bool(api_key))
+            batches = plan_batches(series_ids, start_year, end_year, max_series, max_years)
+            limiter = RateLimiter(float(os.getenv("BLS_RATE_PER_SECOND", "2")))
+            workers = max(1, int(os.getenv("BLS_MAX_WORKERS", "4")))
+            with requests.Session() as session, ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(lambda batch: _fetch_batch(batch, api_key, session, limiter), batches))
+            if not any(result.changed for result, _ in results) and published_path(dataset_id, "catalog.csv").exists():
+                save_after_commit(result for result, _ in results)
+                return unchanged_result(dataset_id)
             raw_file = raw_path(dataset_id, "bls.json")
-            raw_file.write_text(response.text)
-            df = _process_bls_json(response.json())
-            if not df.empty:
-                df.to_csv(processed_file, index=False)
+            ensure_dir(raw_file.parent)
+            raw_file.write_text(json.dumps([body for _, body in results]))
+            df = apply_schema(pd.concat([_process_bls_json(body) for _, body in results], ignore_index=True), dataset_id, STORED_MEASURE)
+            df = df.drop_duplicates(["series_id", "date"]).sort_values(["series_id", "date"])
+            statewide = df[df["series_id"] == series_id]
+            if not statewide.empty:
+                write_csv(statewide, processed_file, dataset_id)
+                _write_partitions(df, catalog)
                 write_table(df, dataset_id)
                 update_dataset_refresh(dataset_id, today.isoformat())
+                save_after_commit(result for result, _ in results)
                 return {"dataset_id": dataset_id, "status": "downloaded", "rows": str(len(df))}
-        except Exception:
-            pass
-
-    fixture = fixture_path(dataset_id, "unemployment.csv")
-    if fixture:
-        processed_file.write_text(fixture.read_text())
-        raw_file = raw_path(dataset_id, "fixture.csv")
-        ensure_dir(raw_file.parent)
-        raw_file.write_text(fixture.read_text())
-        try:
-            df = pd.read_csv(processed_file)
-            write_table(df, dataset_id)
-        except Exception:
-            pass
-        update_dataset_refresh(dataset_id, today.isoformat())
-        return {"dataset_id": dataset_id, "status": "cached", "rows": "fixture"}
-
-    return {"dataset_id": dataset_id, "status": "failed", "rows": "0"}
+        except Exception as exc:
+            error = str(exc)
+
+    cached = refresh_from_fixture(dataset_id, "unemployment.csv", today.isoformat(), error)
+    if cached is not None:
+        return cached
+
+    return failed_result(dataset_id, error)
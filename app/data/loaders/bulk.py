@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import requests
+
+from app.data.geography import active_states, state_fips, state_scope
+from app.data.loaders.base import (
+    ensure_dir,
+    failed_result,
+    processed_path,
+    published_path,
+    raw_path,
+    refresh_from_fixture,
+    unchanged_result,
+)
+from app.data.registry import update_dataset_refresh
+from app.data.schemas import write_csv
+from app.data.sqlite import write_table
+from app.data.staging import after_commit
+
+DOWNLOAD_CHUNK_BYTES = 1 << 20
+
+
+@dataclass(frozen=True)
+class BulkSource:
+    dataset_id: str
+    value_col: str
+    url_env: str
+    columns: FrozenSet[str]
+    prepare: Callable[[pd.DataFrame, FrozenSet[str]], pd.DataFrame]
+    default_url: Optional[str] = None
+    member_suffix: str = ".csv"
+
+
+def chunk_rows() -> int:
+    return max(1_000, int(os.getenv("BULK_CHUNK_ROWS", "100000")))
+
+
+def county_fips(values: pd.Series, width: int = 5) -> pd.Series:
+    digits = values.astype(str).str.replace(r"\.0$", "", regex=True).str.strip()
+    return digits.str.zfill(width)
+
+
+def numeric(values: pd.Series) -> pd.Series:
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+    return pd.to_numeric(values.astype(str).str.replace(",", "", regex=False), errors="coerce")
+
+
+def _download(url: str, target: Path) -> str:
+    digest = hashlib.sha256()
+    with requests.get(url, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        with target.open("wb") as handle:
+            for block in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                digest.update(block)
+                handle.write(block)
+    return digest.hexdigest()
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for block in iter(lambda: handle.read(DOWNLOAD_CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@contextmanager
+def _open_text(path: Path, member_suffix: str) -> Iterator[io.TextIOBase]:
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            members = [name for name in archive.namelist() if name.lower().endswith(member_suffix)]
+            if not members:
+                raise ValueError(f"No {member_suffix} member in {path.name}")
+            member = max(members, key=lambda name: archive.getinfo(name).file_size)
+            with archive.open(member) as raw:
+                yield io.TextIOWrapper(raw, encoding="utf-8-sig", errors="replace")
+        return
+    with path.open("r", encoding="utf-8-sig", errors="replace", newline="") as handle:
+        yield handle
+
+
+def aggregate_file(
+    path: Path,
+    source: BulkSource,
+    states: Optional[Iterable[str]] = None,
+    chunksize: Optional[int] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    wanted = frozenset(states or [state_fips()])
+    sums: Dict[Tuple[str, int], np.ndarray] = {}
+    with _open_text(path, source.member_suffix) as handle:
+        reader = pd.read_csv(
+            handle,
+            chunksize=chunksize or chunk_rows(),
+            usecols=lambda column: column.strip().lower() in source.columns,
+            dtype=str,
+            low_memory=True,
+        )
+        for chunk in reader:
+            chunk.columns = [column.strip().lower() for column in chunk.columns]
+            prepared = source.prepare(chunk, wanted)
+            prepared = prepared.dropna(subset=["value", "year"])
+            if prepared.empty:
+                continue
+            prepared = prepared.assign(
+                weight=prepared["weight"].fillna(1.0),
+                weighted=prepared["value"] * prepared["weight"].fillna(1.0),
+            )
+            grouped = prepared.groupby(["county_fips", "year"])[["weighted", "weight"]].sum()
+            for key, row in zip(grouped.index, grouped.to_numpy()):
+                sums[key] = sums.get(key, np.zeros(2)) + row
+
+    if not sums:
+        return pd.DataFrame(), pd.DataFrame()
+    totals = pd.DataFrame(
+        [(fips, int(year), weighted, weight) for (fips, year), (weighted, weight) in sums.items()],
+        columns=["county_fips", "year", "weighted", "weight"],
+    )
+    totals["state_fips"] = totals["county_fips"].str[:2]
+    state = totals.groupby(["state_fips", "year"], as_index=False)[["weighted", "weight"]].sum()
+    state[source.value_col] = (state["weighted"] / state["weight"]).round(4)
+    counties = totals[totals["county_fips"].str.len() == 5].copy()
+    counties[source.value_col] = (counties["weighted"] / counties["weight"]).round(4)
+    return (
+        state[["state_fips", "year", source.value_col]].sort_values(["state_fips", "year"]).reset_index(drop=True),
+        counties[["state_fips", "county_fips", "year", source.value_col]]
+        .sort_values(["county_fips", "year"])
+        .reset_index(drop=True),
+    )
+
+
+def _write_state(source: BulkSource, state_df: pd.DataFrame, county_df: pd.DataFrame) -> int:
+    fips = state_fips()
+    state_rows = state_df[state_df["state_fips"] == fips].drop(columns="state_fips") if not state_df.empty else state_df
+    if state_rows.empty:
+        return 0
+    processed_file = processed_path(source.dataset_id, "metrics.csv")
+    ensure_dir(processed_file.parent)
+    write_csv(state_rows, processed_file, source.dataset_id)
+    county_rows = county_df[county_df["state_fips"] == fips] if not county_df.empty else county_df
+    if not county_rows.empty:
+        write_csv(county_rows.drop(columns="state_fips"), processed_path(source.dataset_id, "counties.csv"), source.dataset_id)
+    return len(state_rows)
+
+
+def refresh_bulk(source: BulkSource, allow_network: bool = True) -> Dict[str, str]:
+    dataset_id = source.dataset_id
+    today = date.today()
+    states = active_states()
+    url = os.getenv(source.url_env, source.default_url or "")
+    local = Path(url) if url and not url.startswith(("http://", "https://")) else None
+    state_record = raw_path(dataset_id, "download.json")
+    error = None
+
+    if url and (local is not None or (allow_network and not os.getenv("FORCE_OFFLINE"))):
+        ensure_dir(state_record.parent)
+        try:
+            with tempfile.TemporaryDirectory(dir=state_record.parent) as workdir:
+                if local is not None:
+                    download, digest = local, _file_digest(local)
+                else:
+                    download = Path(workdir) / "download"
+                    digest = _download(url, download)
+                previous = json.loads(state_record.read_text()) if state_record.exists() else {}
+                if previous.get("sha256") == digest and previous.get("states") == states and all(
+                    published_path(dataset_id, "metrics.csv", state).exists() for state in states
+                ):
+                    return unchanged_result(dataset_id)
+                state_df, county_df = aggregate_file(download, source, [state_fips(state) for state in states])
+            if state_df.empty:
+                raise ValueError("No rows for the configured states found in download.")
+            written = {}
+            for state in states:
+                with state_scope(state):
+                    written[state] = _write_state(source, state_df, county_df)
+            write_table(state_df, dataset_id)
+            record = json.dumps({"url": url, "sha256": digest, "states": states, "fetched": today.isoformat()})
+            after_commit(lambda: state_record.write_text(record))
+            update_dataset_refresh(dataset_id, today.isoformat())
+            result = {"dataset_id": dataset_id, "status": "downloaded", "rows": str(sum(written.values()))}
+            missing = [state for state, rows in written.items() if not rows]
+            if missing:
+                result["error"] = f"No rows for {', '.join(missing)}."
+            return result
+        except Exception as exc:
+            error = str(exc)
+    elif not url:
+        error = f"Set {source.url_env} to the national download URL or a local file."
+
+    cached = refresh_from_fixture(dataset_id, "metrics.csv", today.isoformat(), error)
+    if cached is not None:
+        return cached
+
+    return failed_result(dataset_id, error)
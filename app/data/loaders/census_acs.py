@@ -1,50 +1,67 @@
 from __future__ import annotations
 
+import json
 import os
-from datetime import date
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 import requests
 
-from app.data.loaders.base import ensure_dir, fixture_path, processed_path, raw_path
-from app.data.sqlite import write_table
+from app.data.geography import state_fips
+from app.data.loaders.base import (
+    ensure_dir,
+    failed_result,
+    for_each_state,
+    processed_path,
+    published_path,
+    raw_path,
+    refresh_from_fixture,
+    unchanged_result,
+)
+from app.data.loaders.fetch import FetchResult, RateLimiter, fetch, save_after_commit
 from app.data.registry import update_dataset_refresh
+from app.data.schemas import STORED_MEASURE, read_typed, write_csv
+from app.data.sqlite import replace_partition
+from app.data.staging import after_commit
 
 CENSUS_BASE = "https://api.census.gov/data"
 
 
+ACS_COLUMNS = {
+    "B19013_001E": "median_household_income",
+    "B25064_001E": "median_gross_rent",
+    "B17001_002E": "poverty_count",
+    "B17001_001E": "population",
+    "B01001_001E": "total_population",
+    "B25001_001E": "housing_units",
+    "B25002_003E": "vacant_units",
+    "B25077_001E": "median_home_value",
+}
+
+
 def _process_acs_json(data: list) -> pd.DataFrame:
     headers = data[0]
-    rows = data[1:]
-    df = pd.DataFrame(rows, columns=headers)
-    df = df.rename(columns={
-        "B19013_001E": "median_household_income",
-        "B25064_001E": "median_gross_rent",
-        "B17001_002E": "poverty_count",
-        "B17001_001E": "population",
-        "B01001_001E": "total_population",
-        "B25001_001E": "housing_units",
-        "B25002_003E": "vacant_units",
-        "B25077_001E": "median_home_value",
-        "NAME": "county_name",
-        "state": "state_fips",
-        "county": "county_fips",
+    if len(data) < 2:
+        return pd.DataFrame()
+    cells = np.array(data[1:], dtype=object)
+    index = {name: position for position, name in enumerate(headers)}
+    positions = [index[variable] for variable in ACS_COLUMNS]
+    values = pd.to_numeric(pd.Series(cells[:, positions].ravel()), errors="coerce")
+    measures = dict(zip(ACS_COLUMNS.values(), values.to_numpy(dtype=np.float64).reshape(len(cells), -1).T))
+    df = pd.DataFrame({
+        "county_fips": pd.Categorical(cells[:, index["state"]].astype(str) + cells[:, index["county"]].astype(str)),
+        "county_name": pd.Categorical(cells[:, index["NAME"]].astype(str)),
+        **measures,
     })
-    df["median_household_income"] = pd.to_numeric(df["median_household_income"], errors="coerce")
-    df["median_gross_rent"] = pd.to_numeric(df["median_gross_rent"], errors="coerce")
-    df["poverty_count"] = pd.to_numeric(df["poverty_count"], errors="coerce")
-    df["population"] = pd.to_numeric(df["population"], errors="coerce")
-    df["total_population"] = pd.to_numeric(df["total_population"], errors="coerce")
-    df["housing_units"] = pd.to_numeric(df["housing_units"], errors="coerce")
-    df["vacant_units"] = pd.to_numeric(df["vacant_units"], errors="coerce")
-    df["median_home_value"] = pd.to_numeric(df["median_home_value"], errors="coerce")
     df["poverty_rate"] = (df["poverty_count"] / df["population"]).round(4)
     df["vacancy_rate"] = (df["vacant_units"] / df["housing_units"]).round(4)
     df["rent_to_income"] = (
         (df["median_gross_rent"] * 12) / df["median_household_income"]
     ).round(4)
-    df["county_fips"] = df["state_fips"] + df["county_fips"]
     return df[[
         "county_fips",
         "county_name",
@@ -61,74 +78,155 @@ def _process_acs_json(data: list) -> pd.DataFrame:
     ]]
 
 
+VARIABLES = [
+    "NAME",
+    "B19013_001E",
+    "B25064_001E",
+    "B17001_002E",
+    "B17001_001E",
+    "B01001_001E",
+    "B25001_001E",
+    "B25002_003E",
+    "B25077_001E",
+]
+
+
+def acs_years() -> List[str]:
+    years_env = os.getenv("ACS_YEARS")
+    if not years_env:
+        return [os.getenv("ACS_YEAR", "2022")]
+    years = []
+    for item in (part.strip() for part in years_env.split(",")):
+        if "-" in item:
+            first, last = (int(bound) for bound in item.split("-", 1))
+            years.extend(str(year) for year in range(first, last + 1))
+        elif item:
+            years.append(item)
+    return sorted(set(years))
+
+
+def year_filename(year: str) -> str:
+    return f"years/{year}.csv"
+
+
+def _marker_path(year: str) -> Path:
+    return raw_path("census_acs_fl_county", f"years/{year}.json")
+
+
+def _read_marker(year: str) -> Dict[str, str]:
+    path = _marker_path(year)
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def is_final(year: str) -> bool:
+    return bool(_read_marker(year).get("final")) and published_path("census_acs_fl_county", year_filename(year)).exists()
+
+
+def _next_marker(year: str, sha256: str, today: date) -> Dict[str, object]:
+    marker = _read_marker(year)
+    if marker.get("sha256") != sha256:
+        marker = {"sha256": sha256, "first_seen": today.isoformat()}
+    grace = timedelta(days=int(os.getenv("ACS_FINAL_AFTER_DAYS", "90")))
+    released = date(int(year) + 2, 1, 1) <= today
+    marker["final"] = released and date.fromisoformat(marker["first_seen"]) + grace <= today
+    return marker
+
+
+def _write_marker(path: Path, marker: Dict[str, object]) -> None:
+    ensure_dir(path.parent)
+    path.write_text(json.dumps(marker, indent=2))
+
+
+def _record_years(results: Dict[str, FetchResult], today: date) -> None:
+    markers = {_marker_path(year): _next_marker(year, result.sha256, today) for year, result in results.items()}
+    save_after_commit(results.values())
+    after_commit(lambda: [_write_marker(path, marker) for path, marker in markers.items()])
+
+
+def _fetch_year(year: str, state: str, api_key: Optional[str], session, limiter: RateLimiter) -> FetchResult:
+    params = {
+        "get": ",".join(VARIABLES),
+        "for": "county:*",
+        "in": f"state:{state_fips(state)}",
+    }
+    if api_key:
+        params["key"] = api_key
+    url = f"{CENSUS_BASE}/{year}/acs/acs5"
+    return fetch("GET", url, params=params, timeout=30, session=session, limiter=limiter)
+
+
+def _published_year(year: str) -> pd.DataFrame:
+    path = published_path("census_acs_fl_county", year_filename(year))
+    return read_typed(path, "census_acs_fl_county", STORED_MEASURE) if path.exists() else pd.DataFrame()
+
+
 def refresh(allow_network: bool = True) -> Dict[str, str]:
+    return for_each_state("census_acs_fl_county", lambda state: _refresh_state(state, allow_network))
+
+
+def _refresh_state(state: str, allow_network: bool) -> Dict[str, str]:
     dataset_id = "census_acs_fl_county"
-    years_env = os.getenv("ACS_YEARS")
-    if years_env:
-        years = [year.strip() for year in years_env.split(",") if year.strip()]
-    else:
-        years = [os.getenv("ACS_YEAR", "2022")]
+    years = acs_years()
     api_key = os.getenv("CENSUS_API_KEY")
     today = date.today()
 
     processed_file = processed_path(dataset_id, "acs_county.csv")
     ensure_dir(processed_file.parent)
 
+    error = None
     if allow_network and not os.getenv("FORCE_OFFLINE"):
         try:
-            variables = [
-                "NAME",
-                "B19013_001E",
-                "B25064_001E",
-                "B17001_002E",
-                "B17001_001E",
-                "B01001_001E",
-                "B25001_001E",
-                "B25002_003E",
-                "B25077_001E",
-            ]
-            frames = []
-            raw_payload = {}
+            pending = [year for year in years if not is_final(year)]
+            limiter = RateLimiter(float(os.getenv("ACS_RATE_PER_SECOND", "5")))
+            workers = max(1, int(os.getenv("ACS_MAX_WORKERS", "4")))
+            results: Dict[str, FetchResult] = {}
+            if pending:
+                with requests.Session() as session, ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = {
+                        year: pool.submit(_fetch_year, year, state, api_key, session, limiter)
+                        for year in pending
+                    }
+                    for year, future in futures.items():
+                        try:
+                            results[year] = future.result()
+                        except Exception:
+                            continue
+                if not results:
+                    raise RuntimeError("No ACS year could be fetched.")
+            changed = {
+                year: result for year, result in results.items()
+                if result.changed or not published_path(dataset_id, year_filename(year)).exists()
+            }
+            if not changed and published_path(dataset_id, "acs_county.csv").exists():
+                _record_years(results, today)
+                return unchanged_result(dataset_id)
+            frames = {}
+            for year, result in changed.items():
+                df = _process_acs_json(result.json())
+                if df.empty:
+                    continue
+                df["year"] = int(year)
+                year_file = processed_path(dataset_id, year_filename(year))
+                ensure_dir(year_file.parent)
+                df = write_csv(df, year_file, dataset_id)
+                replace_partition(df, dataset_id, "year", int(year))
+                frames[year] = df
             for year in years:
-                params = {
-                    "get": ",".join(variables),
-                    "for": "county:*",
-                    "in": "state:12",
-                }
-                if api_key:
-                    params["key"] = api_key
-                url = f"{CENSUS_BASE}/{year}/acs/acs5"
-                response = requests.get(url, params=params, timeout=30)
-                response.raise_for_status()
-                raw_payload[year] = response.json()
-                df = _process_acs_json(raw_payload[year])
-                if not df.empty:
-                    df["year"] = int(year)
-                    frames.append(df)
+                if year not in frames:
+                    published = _published_year(year)
+                    if not published.empty:
+                        frames[year] = published
             if frames:
-                combined = pd.concat(frames, ignore_index=True)
-                raw_file = raw_path(dataset_id, "acs.json")
-                ensure_dir(raw_file.parent)
-                raw_file.write_text(pd.Series(raw_payload).to_json())
-                combined.to_csv(processed_file, index=False)
-                write_table(combined, dataset_id)
+                combined = pd.concat([frames[year] for year in sorted(frames)], ignore_index=True)
+                combined = write_csv(combined, processed_file, dataset_id)
                 update_dataset_refresh(dataset_id, today.isoformat())
+                _record_years(results, today)
                 return {"dataset_id": dataset_id, "status": "downloaded", "rows": str(len(combined))}
-        except Exception:
-            pass
-
-    fixture = fixture_path(dataset_id, "acs_county.csv")
-    if fixture:
-        processed_file.write_text(fixture.read_text())
-        raw_file = raw_path(dataset_id, "fixture.csv")
-        ensure_dir(raw_file.parent)
-        raw_file.write_text(fixture.read_text())
-        try:
-            df = pd.read_csv(processed_file)
-            write_table(df, dataset_id)
-        except Exception:
-            pass
-        update_dataset_refresh(dataset_id, today.isoformat())
-        return {"dataset_id": dataset_id, "status": "cached", "rows": "fixture"}
-
-    return {"dataset_id": dataset_id, "status": "failed", "rows": "0"}
+        except Exception as exc:
+            error = str(exc)
+
+    cached = refresh_from_fixture(dataset_id, "acs_county.csv", today.isoformat(), error)
+    if cached is not None:
+        return cached
+
+    return failed_result(dataset_id, error)
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import os
+from typing import Dict, FrozenSet
+
+import numpy as np
+import pandas as pd
+
+from app.data.loaders.bulk import BulkSource, county_fips, numeric, refresh_bulk
+
+PLACES_URL = "https://data.cdc.gov/api/views/swc5-untb/rows.csv?accessType=DOWNLOAD"
+NRI_URL = "https://hazards.fema.gov/nri/Content/StaticDocuments/DataDownload//NRI_Table_Counties/NRI_Table_Counties.zip"
+
+
+def _frame(fips: pd.Series, year, value: pd.Series, weight) -> pd.DataFrame:
+    return pd.DataFrame({
+        "county_fips": fips.to_numpy(),
+        "year": numeric(year).to_numpy() if isinstance(year, pd.Series) else np.full(len(value), float(year)),
+        "value": value.to_numpy(),
+        "weight": numeric(weight).to_numpy() if isinstance(weight, pd.Series) else np.full(len(value), float(weight)),
+    })
+
+
+def _prepare_places(chunk: pd.DataFrame, states: FrozenSet[str]) -> pd.DataFrame:
+    measure = os.getenv("CDC_PLACES_MEASURE", "DIABETES")
+    rows = chunk[
+        county_fips(chunk["locationid"]).str[:2].isin(states)
+        & (chunk["measureid"] == measure)
+        & (chunk["datavaluetypeid"] == "CrdPrv")
+    ]
+    return _frame(county_fips(rows["locationid"]), rows["year"], numeric(rows["data_value"]), rows["totalpopulation"])
+
+
+def _prepare_nri(chunk: pd.DataFrame, states: FrozenSet[str]) -> pd.DataFrame:
+    rows = chunk[county_fips(chunk["statefips"], 2).isin(states)]
+    year = os.getenv("FEMA_NRI_YEAR", "2023")
+    return _frame(county_fips(rows["stcofips"]), year, numeric(rows["risk_score"]), rows["population"])
+
+
+def _prepare_hpms(chunk: pd.DataFrame, states: FrozenSet[str]) -> pd.DataFrame:
+    state = county_fips(chunk["state_code"], 2)
+    rows = chunk[state.isin(states)]
+    fips = state[rows.index] + county_fips(rows["county_code"], 3)
+    return _frame(fips, rows["year_record"], numeric(rows["psr"]) * 20.0, rows["section_length"])
+
+
+def _prepare_bdc(chunk: pd.DataFrame, states: FrozenSet[str]) -> pd.DataFrame:
+    fips = county_fips(chunk["geography_id"])
+    rows = chunk[
+        (chunk["geography_type"].str.lower() == "county")
+        & (chunk["biz_res"] == "R")
+        & (chunk["technology"] == "Any Technology")
+        & fips.str[:2].isin(states)
+    ]
+    year = os.getenv("FCC_BDC_YEAR", "2023")
+    return _frame(county_fips(rows["geography_id"]), year, numeric(rows["speed_25_3"]) * 100.0, rows["total_units"])
+
+
+def _rate(values: pd.Series) -> pd.Series:
+    text = values.astype(str).str.upper().str.replace(r"^(GE|GT|LE|LT)", "", regex=True)
+    bounds = text.str.extract(r"^(\d+(?:\.\d+)?)(?:-(\d+(?:\.\d+)?))?$").astype(float)
+    return bounds.mean(axis=1, skipna=True)
+
+
+def _prepare_ccd(chunk: pd.DataFrame, states: FrozenSet[str]) -> pd.DataFrame:
+    state = county_fips(chunk["fipst"], 2)
+    rows = chunk[state.isin(states)]
+    fips = state[rows.index]
+    year = rows["school_year"].astype(str).str[-4:]
+    return _frame(fips, year, _rate(rows["all_rate"]), rows["all_cohort"])
+
+
+SOURCES: Dict[str, BulkSource] = {
+    source.dataset_id: source
+    for source in (
+        BulkSource(
+            dataset_id="cdc_places",
+            value_col="prevalence_rate",
+            url_env="CDC_PLACES_URL",
+            default_url=PLACES_URL,
+            columns=frozenset({"year", "locationid", "measureid", "datavaluetypeid", "data_value", "totalpopulation"}),
+            prepare=_prepare_places,
+        ),
+        BulkSource(
+            dataset_id="fema_nri",
+            value_col="risk_index",
+            url_env="FEMA_NRI_URL",
+            default_url=NRI_URL,
+            columns=frozenset({"statefips", "stcofips", "risk_score", "population"}),
+            prepare=_prepare_nri,
+        ),
+        BulkSource(
+            dataset_id="fhwa_hpms",
+            value_col="condition_index",
+            url_env="FHWA_HPMS_URL",
+            columns=frozenset({"state_code", "county_code", "year_record", "psr", "section_length"}),
+            prepare=_prepare_hpms,
+        ),
+        BulkSource(
+            dataset_id="fcc_bdc",
+            value_col="served_pct",
+            url_env="FCC_BDC_URL",
+            columns=frozenset({"geography_type", "geography_id", "biz_res", "technology", "speed_25_3", "total_units"}),
+            prepare=_prepare_bdc,
+        ),
+        BulkSource(
+            dataset_id="nces_ccd_grad",
+            value_col="graduation_rate",
+            url_env="NCES_CCD_URL",
+            columns=frozenset({"school_year", "fipst", "all_rate", "all_cohort"}),
+            prepare=_prepare_ccd,
+        ),
+    )
+}
+
+
+def refresh_places(allow_network: bool = True) -> Dict[str, str]:
+    return refresh_bulk(SOURCES["cdc_places"], allow_network)
+
+
+def refresh_nri(allow_network: bool = True) -> Dict[str, str]:
+    return refresh_bulk(SOURCES["fema_nri"], allow_network)
+
+
+def refresh_hpms(allow_network: bool = True) -> Dict[str, str]:
+    return refresh_bulk(SOURCES["fhwa_hpms"], allow_network)
+
+
+def refresh_bdc(allow_network: bool = True) -> Dict[str, str]:
+    return refresh_bulk(SOURCES["fcc_bdc"], allow_network)
+
+
+def refresh_ccd(allow_network: bool = True) -> Dict[str, str]:
+    return refresh_bulk(SOURCES["nces_ccd_grad"], allow_network)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Collection, Dict, Iterable, Optional
+
+import requests
+
+from app.data.loaders.base import DATA_DIR
+from app.data.staging import after_commit, current_stage
+
+HTTP_CACHE_DIR = DATA_DIR / "raw" / "_http"
+SECRET_PARAMS = {"key", "api_key", "registrationkey"}
+
+_state_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class FetchResult:
+    content: bytes
+    changed: bool
+    status_code: int
+    sha256: str
+    key: str = ""
+    entry: Optional[Dict[str, str]] = field(default=None, repr=False)
+    cache_dir: Optional[Path] = None
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def save(self) -> None:
+        if self.entry is not None and self.cache_dir is not None:
+            _save_entry(self.cache_dir, self.key, self.entry, self.content)
+
+
+def save_after_commit(results: Iterable[FetchResult]) -> None:
+    pending = [result for result in results if result.entry is not None]
+    if pending:
+        after_commit(lambda: [result.save() for result in pending])
+
+
+class RateLimiter:
+    def __init__(self, per_second: float) -> None:
+        self.interval = 1.0 / per_second if per_second > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def _strip_secrets(values: Optional[Dict[str, Any]], exclude: Collection[str] = ()) -> Dict[str, Any]:
+    return {key: value for key, value in (values or {}).items() if key not in SECRET_PARAMS and key not in exclude}
+
+
+def request_key(
+    method: str,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    body: Optional[Dict[str, Any]] = None,
+    exclude: Collection[str] = (),
+) -> str:
+    canonical = json.dumps(
+        {"method": method.upper(), "url": url, "params": _strip_secrets(params, exclude), "body": _strip_secrets(body)},
+        sort_keys=True,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+def _state_path(cache_dir: Path) -> Path:
+    return cache_dir / "state.json"
+
+
+def _load_state(cache_dir: Path) -> Dict[str, Dict[str, str]]:
+    path = _state_path(cache_dir)
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text())
+    except ValueError:
+        return {}
+
+
+def _save_entry(cache_dir: Path, key: str, entry: Dict[str, str], content: bytes) -> None:
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    body_path = cache_dir / f"{key}.body"
+    tmp_body = body_path.with_name(f"{body_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_body.write_bytes(content)
+    os.replace(tmp_body, body_path)
+    with _state_lock:
+        state = _load_state(cache_dir)
+        state[key] = entry
+        tmp_state = _state_path(cache_dir).with_name(f"state.json.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_state.write_text(json.dumps(state, indent=2, sort_keys=True))
+        os.replace(tmp_state, _state_path(cache_dir))
+
+
+def fetch(
+    method: str,
+    url: str,
+    *,
+    params: Optional[Dict[str, Any]] = None,
+    json_body: Optional[Dict[str, Any]] = None,
+    timeout: float = 30,
+    session: Any = None,
+    cache_dir: Optional[Path] = None,
+    limiter: Optional[RateLimiter] = None,
+    fingerprint: Optional[Callable[[bytes], bytes]] = None,
+    key_exclude: Collection[str] = (),
+) -> FetchResult:
+    cache_dir = cache_dir or HTTP_CACHE_DIR
+    key = request_key(method, url, params, json_body, key_exclude)
+    entry = _load_state(cache_dir).get(key)
+    body_path = cache_dir / f"{key}.body"
+    cached = body_path.read_bytes() if entry and body_path.exists() else None
+
+    headers = {}
+    if cached is not None:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    if limiter is not None:
+        limiter.wait()
+    response = (session or requests).request(
+        method,
+        url,
+        params=params,
+        json=json_body,
+        headers=headers,
+        timeout=timeout,
+    )
+    if response.status_code == 304 and cached is not None:
+        return FetchResult(content=cached, changed=False, status_code=304, sha256=entry["sha256"])
+    response.raise_for_status()
+
+    content = response.content
+    digest = hashlib.sha256(fingerprint(content) if fingerprint else content).hexdigest()
+    changed = cached is None or entry.get("sha256") != digest
+    result = FetchResult(
+        content=content,
+        changed=changed,
+        status_code=response.status_code,
+        sha256=digest,
+        key=key,
+        entry={
+            "url": url,
+            "etag": response.headers.get("ETag", ""),
+            "last_modified": response.headers.get("Last-Modified", ""),
+            "sha256": digest,
+            "fetched_at": datetime.utcnow().isoformat() + "Z",
+        },
+        cache_dir=cache_dir,
+    )
+    if current_stage() is None:
+        result.save()
+    return result
@@ -1,84 +1,204 @@
 from __future__ import annotations
 
+import contextvars
+import json
 import os
-from datetime import date
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Collection, Dict, Optional, Tuple
 
 import pandas as pd
 import requests
 
-from app.data.loaders.base import ensure_dir, fixture_path, processed_path, raw_path
+from app.data.geography import DEFAULT_STATE, state_name
+from app.data.loaders.base import (
+    DATA_DIR,
+    ensure_dir,
+    failed_result,
+    for_each_state,
+    processed_path,
+    published_path,
+    raw_path,
+    refresh_from_fixture,
+    unchanged_result,
+)
+from app.data.loaders.fetch import FetchResult, RateLimiter, fetch, save_after_commit
 from app.data.registry import update_dataset_refresh
+from app.data.schemas import STORED_MEASURE, apply_schema, read_typed, write_csv
 from app.data.sqlite import write_table
 
 FRED_BASE = "https://api.stlouisfed.org/fred/series/observations"
+CATALOG_PATH = DATA_DIR / "catalogs" / "fred_series.csv"
 
 SERIES = {
-    "FLNGSP": "Florida Real GDP (millions of chained dollars)",
-    "FLUR": "Florida Unemployment Rate",
+    "{state}NGSP": "{name} Real GDP (millions of chained dollars)",
+    "{state}UR": "{name} Unemployment Rate",
 }
 
 
-def _fetch_series(series_id: str, api_key: str | None) -> List[dict]:
+def load_catalog(
+    path: Optional[Path] = None,
+    state: str = DEFAULT_STATE,
+    series: Optional[Collection[str]] = None,
+) -> Dict[str, str]:
+    path = path or Path(os.getenv("FRED_CATALOG", str(CATALOG_PATH)))
+    if path.exists():
+        catalog = pd.read_csv(path, dtype=str).dropna(subset=["series_id"])
+        if "state" not in catalog.columns:
+            catalog["state"] = DEFAULT_STATE
+        catalog["state"] = catalog["state"].fillna(DEFAULT_STATE).str.strip().str.upper()
+        catalog["series_name"] = catalog["series_name"].fillna(catalog["series_id"])
+        catalog = catalog[catalog["state"].isin(["*", state])]
+        entries = zip(catalog["series_id"].str.strip(), catalog["series_name"].str.strip())
+    else:
+        entries = SERIES.items()
+    return {
+        series_id.format(state=state): series_name.format(state=state, name=state_name(state))
+        for series_id, series_name in entries
+        if series is None or series_id in series
+    }
+
+
+def series_filename(series_id: str) -> str:
+    return f"series/{series_id}.csv"
+
+
+def _published_series(series_id: str) -> pd.DataFrame:
+    path = published_path("fred_macro", series_filename(series_id))
+    if not path.exists():
+        return apply_schema(pd.DataFrame({"date": pd.Series(dtype=str), "value": pd.Series(dtype=float)}), "fred_macro", STORED_MEASURE)
+    return read_typed(path, "fred_macro", STORED_MEASURE)
+
+
+def _fetch_series(
+    series_id: str,
+    api_key: str | None,
+    observation_start: Optional[str] = None,
+    session=None,
+    limiter: Optional[RateLimiter] = None,
+) -> FetchResult:
     params = {
         "series_id": series_id,
         "file_type": "json",
     }
+    if observation_start:
+        params["observation_start"] = observation_start
     if api_key:
         params["api_key"] = api_key
-    response = requests.get(FRED_BASE, params=params, timeout=30)
-    response.raise_for_status()
-    return response.json().get("observations", [])
+    return fetch(
+        "GET",
+        FRED_BASE,
+        params=params,
+        timeout=30,
+        session=session,
+        limiter=limiter,
+        key_exclude=("observation_start",),
+    )
+
 
+def merge_observations(history: pd.DataFrame, observations: list) -> pd.DataFrame:
+    kept_observations = [obs for obs in observations if obs.get("value") not in (".", None)]
+    fresh = apply_schema(pd.DataFrame({
+        "date": [obs.get("date") for obs in kept_observations],
+        "value": [float(obs["value"]) for obs in kept_observations],
+    }), "fred_macro", STORED_MEASURE)
+    if fresh.empty:
+        return history.reset_index(drop=True)
+    if history.empty:
+        return fresh.drop_duplicates("date", keep="last").sort_values("date").reset_index(drop=True)
+    kept = history[history["date"] < fresh["date"].min()]
+    merged = pd.concat([kept, fresh], ignore_index=True).drop_duplicates("date", keep="last")
+    return merged.sort_values("date").reset_index(drop=True)
 
-def refresh(allow_network: bool = True) -> Dict[str, str]:
+
+def _refresh_series(
+    series_id: str,
+    api_key: Optional[str],
+    session,
+    limiter: RateLimiter,
+) -> Tuple[pd.DataFrame, bool, Optional[list], Optional[FetchResult]]:
+    history = _published_series(series_id)
+    start = None
+    if not history.empty:
+        revision_days = int(os.getenv("FRED_REVISION_DAYS", "730"))
+        start = (history["date"].iloc[-1].date() - timedelta(days=revision_days)).isoformat()
+    try:
+        result = _fetch_series(series_id, api_key, start, session, limiter)
+        observations = result.json().get("observations", [])
+    except Exception:
+        return history, False, None, None
+    merged = merge_observations(history, observations)
+    return merged, not merged.equals(history.reset_index(drop=True)), observations, result
+
+
+def refresh(allow_network: bool = True, series: Optional[Collection[str]] = None) -> Dict[str, str]:
+    return for_each_state("fred_macro", lambda state: _refresh_state(state, allow_network, series))
+
+
+def _refresh_state(state: str, allow_network: bool, series: Optional[Collection[str]] = None) -> Dict[str, str]:
     dataset_id = "fred_macro"
     api_key = os.getenv("FRED_API_KEY")
     today = date.today()
     processed_file = processed_path(dataset_id, "fred_macro.csv")
     ensure_dir(processed_file.parent)
 
+    error = None
     if allow_network and not os.getenv("FORCE_OFFLINE"):
         try:
-            rows = []
-            raw_payload = {}
-            for series_id, series_name in SERIES.items():
-                observations = _fetch_series(series_id, api_key)
-                raw_payload[series_id] = observations
-                for obs in observations[-24:]:
-                    value = obs.get("value")
-                    if value in (".", None):
-                        continue
-                    rows.append({
-                        "series_id": series_id,
-                        "series_name": series_name,
-                        "date": obs.get("date"),
-                        "value": float(value),
-                    })
+            catalog = load_catalog(state=state)
+            due = catalog if series is None else load_catalog(state=state, series=series)
+            limiter = RateLimiter(float(os.getenv("FRED_RATE_PER_SECOND", "2")))
+            workers = max(1, int(os.getenv("FRED_MAX_WORKERS", "4")))
+            with requests.Session() as session, ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    series_id: pool.submit(
+                        contextvars.copy_context().run, _refresh_series, series_id, api_key, session, limiter
+                    )
+                    for series_id in due
+                }
+                results = {
+                    series_id: futures[series_id].result() if series_id in futures
+                    else (_published_series(series_id), False, None, None)
+                    for series_id in catalog
+                }
+            fetched = [result for _, _, _, result in results.values() if result is not None]
+            if due and not fetched:
+                raise RuntimeError("No FRED series could be fetched.")
+            changed = [series_id for series_id, (_, series_changed, _, _) in results.items() if series_changed]
+            if not changed and published_path(dataset_id, "fred_macro.csv").exists():
+                save_after_commit(fetched)
+                return unchanged_result(dataset_id)
             raw_file = raw_path(dataset_id, "fred.json")
             ensure_dir(raw_file.parent)
-            raw_file.write_text(pd.Series(raw_payload).to_json())
-            df = pd.DataFrame(rows)
+            raw_file.write_text(json.dumps({
+                series_id: observations
+                for series_id, (_, _, observations, _) in results.items()
+                if observations is not None
+            }))
+            for series_id in changed:
+                series_file = processed_path(dataset_id, series_filename(series_id))
+                ensure_dir(series_file.parent)
+                write_csv(results[series_id][0], series_file, dataset_id)
+            df = pd.concat(
+                [
+                    frame.assign(series_id=series_id, series_name=catalog[series_id])
+                    for series_id, (frame, _, _, _) in results.items()
+                    if not frame.empty
+                ],
+                ignore_index=True,
+            )[["series_id", "series_name", "date", "value"]]
             if not df.empty:
-                df.to_csv(processed_file, index=False)
+                df = write_csv(df, processed_file, dataset_id)
                 write_table(df, dataset_id)
                 update_dataset_refresh(dataset_id, today.isoformat())
+                save_after_commit(fetched)
                 return {"dataset_id": dataset_id, "status": "downloaded", "rows": str(len(df))}
-        except Exception:
-            pass
-
-    fixture = fixture_path(dataset_id, "fred_macro.csv")
-    if fixture:
-        processed_file.write_text(fixture.read_text())
-        raw_file = raw_path(dataset_id, "fixture.csv")
-        ensure_dir(raw_file.parent)
-        raw_file.write_text(fixture.read_text())
-        try:
-            df = pd.read_csv(processed_file)
-            write_table(df, dataset_id)
-        except Exception:
-            pass
-        update_dataset_refresh(dataset_id, today.isoformat())
-        return {"dataset_id": dataset_id, "status": "cached", "rows": "fixture"}
-
-    return {"dataset_id": dataset_id, "status": "failed", "rows": "0"}
+        except Exception as exc:
+            error = str(exc)
+
+    cached = refresh_from_fixture(dataset_id, "fred_macro.csv", today.isoformat(), error)
+    if cached is not None:
+        return cached
+
+    return failed_result(dataset_id, error)
@@ -1,17 +1,46 @@
 from __future__ import annotations
 
-from typing import List
+import uuid
+from typing import Callable, List, Optional
 
+from app.data.aggregates import build_all
 from app.data.loaders import LOADERS
+from app.data.loaders.base import DATA_DIR
+from app.data.lock import refresh_lock
+from app.data.snapshots import Snapshot, default_store
+from app.data.staging import Stage, discard_stage, has_changes, run_commit_hooks, staged
 
 
-def refresh_all(allow_network: bool = True) -> List[dict]:
+def refresh_all(
+    allow_network: bool = True,
+    precompute: Optional[Callable[[Snapshot, List[str]], object]] = None,
+) -> List[dict]:
     results = []
-    for loader in LOADERS:
-        results.append(loader(allow_network=allow_network))
+    stage = Stage(root=DATA_DIR / "staging" / f"sync-{uuid.uuid4().hex}")
+    try:
+        with refresh_lock() as acquired:
+            if not acquired:
+                raise RuntimeError("Another refresh holds the refresh lock.")
+            with staged(stage):
+                for loader in LOADERS.values():
+                    results.append(loader(allow_network=allow_network))
+            if has_changes(stage):
+                changed = sorted(stage.registry_updates)
+
+                def finalize(snapshot: Snapshot) -> None:
+                    build_all(snapshot.processed_dir, changed or None)
+                    if precompute is not None:
+                        precompute(snapshot, changed)
+
+                default_store().commit(stage.root, stage.registry_updates, finalize)
+            run_commit_hooks(stage)
+    finally:
+        discard_stage(stage)
     return results
 
 
 if __name__ == "__main__":
-    for result in refresh_all(allow_network=True):
+    from app.services.hierarchy import precompute_snapshot
+
+    for result in refresh_all(allow_network=True, precompute=precompute_snapshot):
         print(result)
@@ -6,6 +6,11 @@ from datetime import date
 from pathlib import Path
 from typing import Dict, List
 
+from app.data.aggregates import load_derived
+from app.data.schemas import memory_report
+from app.data.snapshots import current_processed_dir, current_snapshot
+from app.data.staging import current_stage
+
 
 @dataclass(frozen=True)
 class DatasetDefinition:
@@ -135,6 +140,8 @@ DATASETS: Dict[str, DatasetDefinition] = {
 ROOT_DIR = Path(__file__).resolve().parents[2]
 REGISTRY_STATE_PATH = ROOT_DIR / "data" / "registry_state.json"
 
+_data_generation = 0
+
 
 def _default_state() -> Dict[str, Dict[str, str]]:
     today = date.today().isoformat()
@@ -148,6 +155,9 @@ def _default_state() -> Dict[str, Dict[str, str]]:
 
 
 def _load_state() -> Dict[str, Dict[str, str]]:
+    snapshot = current_snapshot()
+    if snapshot is not None and snapshot.registry_path.exists():
+        return json.loads(snapshot.registry_path.read_text())
     if not REGISTRY_STATE_PATH.exists():
         state = _default_state()
         REGISTRY_STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
@@ -161,8 +171,24 @@ def _save_state(state: Dict[str, Dict[str, str]]) -> None:
     REGISTRY_STATE_PATH.write_text(json.dumps(state, indent=2))
 
 
-def list_datasets() -> List[Dict[str, str]]:
+def dataset_memory() -> Dict[str, Dict[str, int]]:
+    report = load_derived("dataset_memory.csv")
+    if report.empty:
+        report = memory_report(current_processed_dir())
+    return {
+        row["dataset_id"]: {
+            "files": int(row["files"]),
+            "rows": int(row["rows"]),
+            "memory_bytes": int(row["memory_bytes"]),
+            "untyped_memory_bytes": int(row["untyped_memory_bytes"]),
+        }
+        for row in report.to_dict("records")
+    }
+
+
+def list_datasets() -> List[Dict[str, object]]:
     state = _load_state()
+    memory = dataset_memory()
     datasets = []
     for dataset_id, definition in DATASETS.items():
         dataset_state = state.get(dataset_id, {})
@@ -170,18 +196,43 @@ def list_datasets() -> List[Dict[str, str]]:
             **asdict(definition),
             "retrieval_date": dataset_state.get("retrieval_date", "unknown"),
             "last_refresh": dataset_state.get("last_refresh", "unknown"),
+            "memory": memory.get(dataset_id),
         })
     return datasets
 
 
 def update_dataset_refresh(dataset_id: str, retrieval_date: str) -> None:
+    stage = current_stage()
+    if stage is not None:
+        stage.registry_updates[dataset_id] = retrieval_date
+        return
+    apply_refresh_updates({dataset_id: retrieval_date})
+
+
+def apply_refresh_updates(updates: Dict[str, str]) -> None:
+    if not updates:
+        return
     state = _load_state()
-    state.setdefault(dataset_id, {})
-    state[dataset_id]["retrieval_date"] = retrieval_date
-    state[dataset_id]["last_refresh"] = date.today().isoformat()
+    for dataset_id, retrieval_date in updates.items():
+        state.setdefault(dataset_id, {})
+        state[dataset_id]["retrieval_date"] = retrieval_date
+        state[dataset_id]["last_refresh"] = date.today().isoformat()
     _save_state(state)
 
 
+def bump_data_version() -> None:
+    global _data_generation
+    _data_generation += 1
+
+
+def data_version() -> str:
+    snapshot = current_snapshot()
+    if snapshot is not None:
+        return f"snapshot-{snapshot.snapshot_id}"
+    modified = REGISTRY_STATE_PATH.stat().st_mtime_ns if REGISTRY_STATE_PATH.exists() else 0
+    return f"{_data_generation}-{modified}"
+
+
 def get_dataset_metadata(dataset_id: str) -> Dict[str, str]:
     definition = DATASETS[dataset_id]
     state = _load_state().get(dataset_id, {})
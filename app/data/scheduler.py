@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, time as clock_time, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from app.data.jobs import RefreshJob, RefreshJobs
+from app.data.loaders.base import DATA_DIR
+from app.data.loaders.fred import CATALOG_PATH, SERIES
+
+STATE_PATH = DATA_DIR / "scheduler_state.json"
+PERIOD_DAYS = {"D": 1, "W": 7, "BW": 14, "M": 30, "Q": 91, "S": 182, "SA": 182, "A": 365}
+FRED_DATASET = "fred_macro"
+SUCCESS_STATUSES = {"downloaded", "unchanged"}
+
+
+@dataclass(frozen=True)
+class Cadence:
+    dataset_id: str
+    source: str
+    period_days: Optional[int]
+
+
+def fred_series_periods(path: Optional[Path] = None) -> Dict[str, int]:
+    path = path or Path(os.getenv("FRED_CATALOG", str(CATALOG_PATH)))
+    if not path.exists():
+        return {series_id: PERIOD_DAYS["M"] for series_id in SERIES}
+    catalog = pd.read_csv(path, dtype=str).dropna(subset=["series_id"])
+    if "frequency" not in catalog.columns:
+        catalog["frequency"] = "M"
+    periods = {}
+    for series_id, frequency in zip(catalog["series_id"].str.strip(), catalog["frequency"].fillna("M").str.strip().str.upper()):
+        if frequency not in PERIOD_DAYS:
+            raise ValueError(f"Unknown FRED frequency {frequency!r} for {series_id}.")
+        periods[series_id] = min(PERIOD_DAYS[frequency], periods.get(series_id, PERIOD_DAYS[frequency]))
+    return periods
+
+
+def cadences() -> Dict[str, Cadence]:
+    return {
+        cadence.dataset_id: cadence
+        for cadence in (
+            Cadence("bls_unemployment", "bls", PERIOD_DAYS["M"]),
+            Cadence("census_acs_fl_county", "census", PERIOD_DAYS["A"]),
+            Cadence(FRED_DATASET, "fred", None),
+            Cadence("cdc_places", "cdc", PERIOD_DAYS["A"]),
+            Cadence("fema_nri", "fema", PERIOD_DAYS["A"]),
+            Cadence("fhwa_hpms", "fhwa", PERIOD_DAYS["A"]),
+            Cadence("fcc_bdc", "fcc", PERIOD_DAYS["S"]),
+            Cadence("nces_ccd_grad", "nces", PERIOD_DAYS["A"]),
+        )
+    }
+
+
+def _minutes(name: str, default: str) -> timedelta:
+    return timedelta(minutes=float(os.getenv(name, default)))
+
+
+def _hours(name: str, default: str) -> timedelta:
+    return timedelta(hours=float(os.getenv(name, default)))
+
+
+def _checks_per_period() -> float:
+    return max(1.0, float(os.getenv("SCHEDULER_CHECKS_PER_PERIOD", "4")))
+
+
+def offpeak_window(now: datetime) -> Tuple[datetime, datetime]:
+    start_text, end_text = os.getenv("SCHEDULER_WINDOW", "01:00-05:00").split("-", 1)
+    start_at = clock_time.fromisoformat(start_text.strip())
+    end_at = clock_time.fromisoformat(end_text.strip())
+    for offset in (-1, 0, 1):
+        day = now.date() + timedelta(days=offset)
+        start = datetime.combine(day, start_at)
+        end = datetime.combine(day if end_at > start_at else day + timedelta(days=1), end_at)
+        if now < end:
+            return start, end
+    raise ValueError("SCHEDULER_WINDOW is empty.")
+
+
+def _parse(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+class RefreshScheduler:
+    def __init__(
+        self,
+        jobs: RefreshJobs,
+        state_path: Optional[Path] = None,
+        rng: Optional[random.Random] = None,
+        clock: Callable[[], datetime] = datetime.now,
+    ) -> None:
+        self.jobs = jobs
+        self.state_path = state_path or STATE_PATH
+        self.rng = rng or random.Random()
+        self.clock = clock
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def load_state(self) -> dict:
+        state = json.loads(self.state_path.read_text()) if self.state_path.exists() else {}
+        state.setdefault("datasets", {})
+        state.setdefault("sources", {})
+        return state
+
+    def _save_state(self, state: dict) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state, indent=2))
+        os.replace(tmp, self.state_path)
+
+    def planned_window(self, now: datetime, state: dict) -> Tuple[datetime, datetime]:
+        start, end = offpeak_window(now)
+        if state.get("window") != start.isoformat():
+            jitter = min(_minutes("SCHEDULER_JITTER_MINUTES", "45"), end - start)
+            state["window"] = start.isoformat()
+            state["window_start"] = (start + jitter * self.rng.random()).isoformat()
+        return _parse(state["window_start"]), end
+
+    def due_series(self, now: datetime, state: dict) -> List[str]:
+        checks = _checks_per_period()
+        tracked = state.get("series", {})
+        due = []
+        for series_id, period_days in fred_series_periods().items():
+            last_success = _parse(tracked.get(series_id, {}).get("last_success"))
+            if last_success is None or now >= last_success + timedelta(days=period_days / checks):
+                due.append(series_id)
+        return due
+
+    def due(self, now: datetime, state: dict) -> List[str]:
+        checks = _checks_per_period()
+        due = []
+        for dataset_id, cadence in cadences().items():
+            if dataset_id not in self.jobs.loaders:
+                continue
+            breaker = state["sources"].get(cadence.source, {})
+            if _parse(breaker.get("open_until")) and now < _parse(breaker["open_until"]):
+                continue
+            entry = state["datasets"].get(dataset_id, {})
+            if _parse(entry.get("retry_at")) and now < _parse(entry["retry_at"]):
+                continue
+            if cadence.period_days is None:
+                if self.due_series(now, state):
+                    due.append(dataset_id)
+                continue
+            last_success = _parse(entry.get("last_success"))
+            interval = timedelta(days=cadence.period_days / checks)
+            if entry.get("failures") or last_success is None or now >= last_success + interval:
+                due.append(dataset_id)
+        return due
+
+    def _record(self, job: RefreshJob, now: datetime, state: dict) -> None:
+        known = cadences()
+        threshold = int(os.getenv("SCHEDULER_BREAKER_FAILURES", "3"))
+        for progress in job.datasets:
+            entry = state["datasets"].setdefault(progress.dataset_id, {})
+            cadence = known.get(progress.dataset_id)
+            breaker = state["sources"].setdefault(cadence.source if cadence else progress.dataset_id, {})
+            entry["last_attempt"] = now.isoformat()
+            entry["last_status"] = progress.status
+            if progress.status in SUCCESS_STATUSES and job.status != "failed":
+                entry.update(last_success=now.isoformat(), failures=0, retry_at=None, last_error=None)
+                breaker.update(failures=0, open_until=None)
+                for series_id in job.options.get(progress.dataset_id, {}).get("series", []):
+                    state.setdefault("series", {})[series_id] = {"last_success": now.isoformat()}
+                continue
+            entry["failures"] = entry.get("failures", 0) + 1
+            entry["last_error"] = progress.error or job.error
+            delay = min(
+                _minutes("SCHEDULER_BACKOFF_MINUTES", "15") * 2 ** (entry["failures"] - 1),
+                _hours("SCHEDULER_BACKOFF_MAX_HOURS", "24"),
+            )
+            entry["retry_at"] = (now + delay * (1 + 0.25 * self.rng.random())).isoformat()
+            breaker["failures"] = breaker.get("failures", 0) + 1
+            if breaker["failures"] >= threshold:
+                breaker["open_until"] = (now + _hours("SCHEDULER_BREAKER_COOLDOWN_HOURS", "12")).isoformat()
+
+    def tick(self, now: Optional[datetime] = None, force: bool = False) -> Optional[RefreshJob]:
+        now = now or self.clock()
+        state = self.load_state()
+        start, end = self.planned_window(now, state)
+        self._save_state(state)
+        if not force and not start <= now < end:
+            return None
+        due = self.due(now, state)
+        if not due:
+            return None
+        options = {FRED_DATASET: {"series": self.due_series(now, state)}} if FRED_DATASET in due else {}
+        job, created = self.jobs.submit(allow_network=True, dataset_ids=due, options=options)
+        if not created:
+            return None
+        while job.active:
+            time.sleep(0.2)
+        if job.status == "locked":
+            return job
+        state = self.load_state()
+        self._record(job, now, state)
+        state["last_run"] = {"at": now.isoformat(), "job_id": job.job_id, "status": job.status, "changed": job.changed}
+        self._save_state(state)
+        return job
+
+    def run_forever(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as exc:
+                state = self.load_state()
+                state["last_error"] = str(exc)
+                self._save_state(state)
+            self._stop.wait(float(os.getenv("SCHEDULER_POLL_SECONDS", "300")))
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="refresh-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def scheduler_enabled() -> bool:
+    return os.getenv("SCHEDULER_ENABLED", "").lower() in {"1", "true", "yes"}
+
+
+def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Scheduled refresh of public datasets.")
+    parser.add_argument("--once", action="store_true", help="Run a single scheduling pass and exit.")
+    parser.add_argument("--force", action="store_true", help="Ignore the off-peak window for this pass.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    from app.services.hierarchy import precompute_snapshot
+
+    args = _parse_args()
+    scheduler = RefreshScheduler(RefreshJobs(precompute=precompute_snapshot))
+    if args.once:
+        result = scheduler.tick(force=args.force)
+        print(result.to_dict() if result else "Nothing due.")
+    else:
+        scheduler.run_forever()
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+import pandas as pd
+
+CATEGORY = "category"
+MEASURE = "float32"
+STORED_MEASURE = "float64"
+YEAR = "int16"
+DATE = "datetime64[ns]"
+
+
+@dataclass(frozen=True)
+class Schema:
+    dtypes: Dict[str, str]
+    date_format: str = "%Y-%m-%d"
+    measure: str = MEASURE
+
+
+BULK_SCHEMA = Schema({"state_fips": CATEGORY, "county_fips": CATEGORY, "year": YEAR})
+
+SCHEMAS: Dict[str, Schema] = {
+    "bls_unemployment": Schema(
+        {
+            "series_id": CATEGORY,
+            "measure": CATEGORY,
+            "area_type": CATEGORY,
+            "area_code": CATEGORY,
+            "area_name": CATEGORY,
+            "date": DATE,
+            "value": MEASURE,
+        },
+        date_format="%Y-%m",
+    ),
+    "fred_macro": Schema({"series_id": CATEGORY, "series_name": CATEGORY, "date": DATE, "value": MEASURE}),
+    "census_acs_fl_county": Schema(
+        {"state_fips": CATEGORY, "county_fips": CATEGORY, "county_name": CATEGORY, "year": YEAR}
+    ),
+}
+
+
+def schema_for(dataset_id: str, measure: Optional[str] = None) -> Schema:
+    schema = SCHEMAS.get(dataset_id, BULK_SCHEMA)
+    if measure is None or measure == schema.measure:
+        return schema
+    dtypes = {column: measure if dtype == schema.measure else dtype for column, dtype in schema.dtypes.items()}
+    return replace(schema, dtypes=dtypes, measure=measure)
+
+
+def _cast(values: pd.Series, dtype: str, schema: Schema) -> pd.Series:
+    if dtype == DATE:
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values
+        return pd.to_datetime(values.astype(str), format=schema.date_format)
+    if dtype == CATEGORY:
+        return values if isinstance(values.dtype, pd.CategoricalDtype) else values.astype(CATEGORY)
+    numeric = pd.to_numeric(values, errors="coerce")
+    if dtype == YEAR and numeric.isna().any():
+        return numeric.astype(schema.measure)
+    return numeric.astype(dtype)
+
+
+def apply_schema(df: pd.DataFrame, dataset_id: str, measure: Optional[str] = None) -> pd.DataFrame:
+    schema = schema_for(dataset_id, measure)
+    columns = {}
+    for column in df.columns:
+        dtype = schema.dtypes.get(column)
+        if dtype is None and pd.api.types.is_numeric_dtype(df[column]) and not pd.api.types.is_bool_dtype(df[column]):
+            dtype = schema.measure
+        columns[column] = df[column] if dtype is None else _cast(df[column], dtype, schema)
+    return pd.DataFrame(columns, index=df.index)
+
+
+def _text_columns(dataset_id: str) -> Dict[str, type]:
+    return {column: str for column, dtype in schema_for(dataset_id).dtypes.items() if dtype in (CATEGORY, DATE)}
+
+
+def read_typed(path: Path, dataset_id: str, measure: Optional[str] = None, nrows: Optional[int] = None) -> pd.DataFrame:
+    return apply_schema(pd.read_csv(path, dtype=_text_columns(dataset_id), nrows=nrows), dataset_id, measure)
+
+
+def widen(values: pd.Series) -> pd.Series:
+    numeric = pd.to_numeric(values, errors="coerce")
+    if numeric.dtype != MEASURE:
+        return numeric
+    return numeric.astype(str).astype(STORED_MEASURE)
+
+
+def write_csv(df: pd.DataFrame, path: Path, dataset_id: str) -> pd.DataFrame:
+    stored = apply_schema(df, dataset_id, STORED_MEASURE)
+    stored.to_csv(path, index=False, date_format=schema_for(dataset_id).date_format)
+    return stored
+
+
+def memory_sample_rows() -> int:
+    return max(1, int(os.getenv("MEMORY_SAMPLE_ROWS", "10000")))
+
+
+def _count_rows(path: Path) -> int:
+    with path.open("rb") as handle:
+        lines = sum(chunk.count(b"\n") for chunk in iter(lambda: handle.read(1 << 20), b""))
+    return max(0, lines - 1)
+
+
+def _file_memory(path: Path, dataset_id: str, sample_rows: int) -> Tuple[int, int, int]:
+    rows = _count_rows(path)
+    if rows == 0:
+        return 0, 0, 0
+    typed = read_typed(path, dataset_id, nrows=sample_rows)
+    untyped = pd.read_csv(path, nrows=sample_rows)
+    scale = rows / max(len(typed), 1)
+    return (
+        rows,
+        int(typed.memory_usage(deep=True).sum() * scale),
+        int(untyped.memory_usage(deep=True).sum() * scale),
+    )
+
+
+def memory_report(processed_dir: Path, datasets: Optional[Set[str]] = None) -> pd.DataFrame:
+    rows = []
+    sample_rows = memory_sample_rows()
+    if not processed_dir.exists():
+        return pd.DataFrame(columns=["dataset_id", "files", "rows", "memory_bytes", "untyped_memory_bytes"])
+    for dataset_dir in sorted(path for path in processed_dir.iterdir() if path.is_dir()):
+        if dataset_dir.name.startswith("_") or dataset_dir.name == "states":
+            continue
+        if datasets is not None and dataset_dir.name not in datasets:
+            continue
+        files = sorted(dataset_dir.rglob("*.csv"))
+        sizes = [_file_memory(path, dataset_dir.name, sample_rows) for path in files]
+        rows.append({
+            "dataset_id": dataset_dir.name,
+            "files": len(files),
+            "rows": sum(size[0] for size in sizes),
+            "memory_bytes": sum(size[1] for size in sizes),
+            "untyped_memory_bytes": sum(size[2] for size in sizes),
+        })
+    return pd.DataFrame(rows, columns=["dataset_id", "files", "rows", "memory_bytes", "untyped_memory_bytes"])
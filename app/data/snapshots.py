@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from app.data.geography import state_partition
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+DATA_DIR = ROOT_DIR / "data"
+SNAPSHOT_DIR = DATA_DIR / "snapshots"
+POINTER_NAME = "CURRENT"
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    snapshot_id: int
+    path: Path
+
+    @property
+    def processed_dir(self) -> Path:
+        return self.path / "processed"
+
+    @property
+    def registry_path(self) -> Path:
+        return self.path / "registry_state.json"
+
+
+def snapshot_retention() -> int:
+    return max(1, int(os.getenv("SNAPSHOT_RETAIN", "3")))
+
+
+def _link_or_copy(source: str, target: str) -> str:
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+    return target
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_text(text)
+    os.replace(tmp_path, path)
+
+
+class SnapshotStore:
+    def __init__(
+        self,
+        root: Optional[Path] = None,
+        legacy_processed: Optional[Path] = None,
+        legacy_registry: Optional[Path] = None,
+    ) -> None:
+        self.root = root or SNAPSHOT_DIR
+        self.legacy_processed = legacy_processed or DATA_DIR / "processed"
+        self.legacy_registry = legacy_registry or DATA_DIR / "registry_state.json"
+        self._lock = threading.Lock()
+
+    @property
+    def pointer(self) -> Path:
+        return self.root / POINTER_NAME
+
+    def ids(self) -> List[int]:
+        if not self.root.exists():
+            return []
+        return sorted(int(path.name) for path in self.root.iterdir() if path.is_dir() and path.name.isdigit())
+
+    def get(self, snapshot_id: int) -> Optional[Snapshot]:
+        path = self.root / str(snapshot_id)
+        return Snapshot(snapshot_id, path) if path.is_dir() else None
+
+    def current(self) -> Optional[Snapshot]:
+        try:
+            snapshot_id = int(self.pointer.read_text().strip())
+        except (OSError, ValueError):
+            return None
+        return self.get(snapshot_id)
+
+    def commit(
+        self,
+        staged_root: Optional[Path],
+        registry_updates: Dict[str, str],
+        finalize: Optional[Callable[[Snapshot], object]] = None,
+    ) -> Snapshot:
+        with self._lock:
+            base = self.current()
+            snapshot_id = max(self.ids() + [base.snapshot_id if base else 0]) + 1
+            building = self.root / f".building-{snapshot_id}"
+            shutil.rmtree(building, ignore_errors=True)
+            building.mkdir(parents=True)
+
+            base_processed = base.processed_dir if base else self.legacy_processed
+            if base_processed.exists():
+                shutil.copytree(base_processed, building / "processed", copy_function=_link_or_copy)
+            else:
+                (building / "processed").mkdir()
+            if staged_root is not None and staged_root.exists():
+                for source in sorted(path for path in staged_root.rglob("*") if path.is_file()):
+                    target = building / "processed" / source.relative_to(staged_root)
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    os.replace(source, target)
+            if finalize is not None:
+                finalize(Snapshot(snapshot_id, building))
+
+            base_registry = base.registry_path if base else self.legacy_registry
+            state = json.loads(base_registry.read_text()) if base_registry.exists() else {}
+            for dataset_id, retrieval_date in registry_updates.items():
+                state.setdefault(dataset_id, {})
+                state[dataset_id]["retrieval_date"] = retrieval_date
+                state[dataset_id]["last_refresh"] = date.today().isoformat()
+            (building / "registry_state.json").write_text(json.dumps(state, indent=2))
+            (building / "snapshot.json").write_text(json.dumps({
+                "snapshot_id": snapshot_id,
+                "parent_id": base.snapshot_id if base else None,
+                "updated_datasets": sorted(registry_updates),
+            }, indent=2))
+
+            final = self.root / str(snapshot_id)
+            os.replace(building, final)
+            _write_atomic(self.pointer, str(snapshot_id))
+            self.prune()
+            return Snapshot(snapshot_id, final)
+
+    def prune(self, keep: Optional[int] = None) -> List[int]:
+        keep = keep or snapshot_retention()
+        removed = []
+        with _pins_lock:
+            current = self.current()
+            for snapshot_id in self.ids()[:-keep]:
+                path = self.root / str(snapshot_id)
+                if (current is not None and snapshot_id == current.snapshot_id) or _pins.get(path):
+                    continue
+                os.replace(path, self.root / f".pruned-{snapshot_id}")
+                removed.append(snapshot_id)
+        for path in self.root.glob(".pruned-*"):
+            shutil.rmtree(path, ignore_errors=True)
+        return removed
+
+
+_store: Optional[SnapshotStore] = None
+_pinned: contextvars.ContextVar[Optional[Snapshot]] = contextvars.ContextVar("pinned_snapshot", default=None)
+_pins: Dict[Path, int] = {}
+_pins_lock = threading.Lock()
+
+
+def default_store() -> SnapshotStore:
+    global _store
+    if _store is None:
+        _store = SnapshotStore()
+    return _store
+
+
+def current_snapshot() -> Optional[Snapshot]:
+    return _pinned.get() or default_store().current()
+
+
+def current_snapshot_id() -> int:
+    snapshot = current_snapshot()
+    return snapshot.snapshot_id if snapshot else 0
+
+
+def current_processed_dir() -> Path:
+    snapshot = current_snapshot()
+    return state_partition(snapshot.processed_dir if snapshot else default_store().legacy_processed)
+
+
+@contextmanager
+def pinned_snapshot(snapshot: Optional[Snapshot] = None) -> Iterator[Optional[Snapshot]]:
+    with _pins_lock:
+        snapshot = snapshot or current_snapshot()
+        if snapshot is not None:
+            _pins[snapshot.path] = _pins.get(snapshot.path, 0) + 1
+    token = _pinned.set(snapshot)
+    try:
+        yield snapshot
+    finally:
+        _pinned.reset(token)
+        if snapshot is not None:
+            with _pins_lock:
+                _pins[snapshot.path] -= 1
+                if not _pins[snapshot.path]:
+                    del _pins[snapshot.path]
@@ -1,17 +1,56 @@
 from __future__ import annotations
 
 import sqlite3
+from functools import partial
 from pathlib import Path
 from typing import Optional
 
 import pandas as pd
 
+from app.data.staging import after_commit
+
 ROOT_DIR = Path(__file__).resolve().parents[2]
 DB_PATH = ROOT_DIR / "data" / "app.db"
 
 
 def write_table(df: pd.DataFrame, table_name: str, db_path: Optional[Path] = None) -> None:
+    after_commit(partial(_write_table, df, table_name, db_path))
+
+
+def replace_partition(
+    df: pd.DataFrame,
+    table_name: str,
+    column: str,
+    value: object,
+    db_path: Optional[Path] = None,
+) -> None:
+    after_commit(partial(_replace_partition, df, table_name, column, value, db_path))
+
+
+def _write_table(df: pd.DataFrame, table_name: str, db_path: Optional[Path] = None) -> None:
     path = db_path or DB_PATH
     path.parent.mkdir(parents=True, exist_ok=True)
     with sqlite3.connect(path) as conn:
         df.to_sql(table_name, conn, if_exists="replace", index=False)
+
+
+def _replace_partition(
+    df: pd.DataFrame,
+    table_name: str,
+    column: str,
+    value: object,
+    db_path: Optional[Path] = None,
+) -> None:
+    path = db_path or DB_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with sqlite3.connect(path) as conn:
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+        ).fetchone()
+        if exists:
+            columns = {row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+            if column not in columns or columns != set(df.columns):
+                conn.execute(f'DROP TABLE "{table_name}"')
+            else:
+                conn.execute(f'DELETE FROM "{table_name}" WHERE "{column}" = ?', (value,))
+        df.to_sql(table_name, conn, if_exists="append", index=False)
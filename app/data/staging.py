@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import contextvars
+import shutil
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+@dataclass
+class Stage:
+    root: Path
+    registry_updates: Dict[str, str] = field(default_factory=dict)
+    on_commit: List[Callable[[], None]] = field(default_factory=list)
+
+
+_stage: contextvars.ContextVar[Optional[Stage]] = contextvars.ContextVar("refresh_stage", default=None)
+
+
+def current_stage() -> Optional[Stage]:
+    return _stage.get()
+
+
+@contextmanager
+def staged(stage: Stage) -> Iterator[Stage]:
+    token = _stage.set(stage)
+    try:
+        yield stage
+    finally:
+        _stage.reset(token)
+
+
+def after_commit(callback: Callable[[], None]) -> None:
+    stage = current_stage()
+    if stage is None:
+        callback()
+    else:
+        stage.on_commit.append(callback)
+
+
+def run_commit_hooks(stage: Stage) -> None:
+    hooks, stage.on_commit = stage.on_commit, []
+    for callback in hooks:
+        callback()
+
+
+def has_changes(stage: Stage) -> bool:
+    if stage.registry_updates:
+        return True
+    return stage.root.exists() and any(path.is_file() for path in stage.root.rglob("*"))
+
+
+def discard_stage(stage: Stage) -> None:
+    shutil.rmtree(stage.root, ignore_errors=True)
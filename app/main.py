@@ -1,21 +1,80 @@
 from __future__ import annotations
 
+import asyncio
+import json
 import os
+from contextlib import asynccontextmanager
+from datetime import date
+from typing import AsyncIterator, Callable, Literal, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from pydantic import ValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.core.citations import validate_response_citations
-from app.data.refresh import refresh_all
-from app.data.registry import list_datasets
-from app.models import AdviceRequest, AdviceResponse, MemoRequest, MemoResponse
-from app.services.advisor import generate_advice
+from app.core.executor import (
+    ClientDisconnected,
+    Job,
+    PoolSaturated,
+    cancellation_requested,
+    get_pool,
+    shutdown_pool,
+)
+from app.core.response_cache import (
+    CachedResponse,
+    ResponseCache,
+    cache_size,
+    cached_response,
+    etag_matches,
+    not_modified,
+    strong_etag,
+    versioned_key,
+)
+from app.core.singleflight import SingleFlight, request_key
+from app.core.threads import configure_thread_budget
+from app.core.values import values_version
+from app.data.geography import DEFAULT_STATE, request_state, state_scope
+from app.data.jobs import RefreshJob, RefreshJobs
+from app.data.registry import bump_data_version, data_version, list_datasets
+from app.data.scheduler import RefreshScheduler, scheduler_enabled
+from app.data.snapshots import current_processed_dir
+from app.models import AdviceRequest, AdviceResponse, Geography, MemoRequest, MemoResponse
+from app.services.advisor import events_from_response, generate_advice, iter_advice_events
+from app.services.hierarchy import precompute_snapshot
 from app.services.memo import save_memo
+from app.services.series import SPECS, aligned_payload, series_payload
 from app.web import get_static_dir
 
-app = FastAPI(title="Florida Policy Advisor", version="0.1.0")
+configure_thread_budget()
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    scheduler = None
+    if scheduler_enabled():
+        scheduler = RefreshScheduler(refresh_jobs)
+        scheduler.start()
+    yield
+    if scheduler is not None:
+        scheduler.stop()
+    shutdown_pool()
+
+
+app = FastAPI(title="Florida Policy Advisor", version="0.1.0", lifespan=lifespan)
+advice_flights = SingleFlight()
+STREAM_MEDIA_TYPES = {"sse": "text/event-stream", "ndjson": "application/x-ndjson"}
+response_cache = ResponseCache(cache_size())
+refresh_jobs = RefreshJobs(precompute=precompute_snapshot)
+
+
+def _invalidate_after_refresh(_job: RefreshJob) -> None:
+    bump_data_version()
+    response_cache.clear()
+
+
+refresh_jobs.on_commit(_invalidate_after_refresh)
 
 allowed_origins = [origin.strip() for origin in os.getenv("CORS_ORIGINS", "http://localhost:5173").split(",")]
 app.add_middleware(
@@ -32,35 +91,255 @@ async def health() -> dict:
 
 
 @app.get("/api/datasets")
-async def datasets() -> dict:
-    return {"datasets": list_datasets()}
+async def datasets(if_none_match: Optional[str] = Header(default=None)) -> Response:
+    key = versioned_key("datasets", data_version(), app.version)
+    etag = strong_etag(key)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    entry = response_cache.get(key)
+    if entry is None:
+        body = json.dumps({"datasets": list_datasets()}).encode("utf-8")
+        entry = CachedResponse(etag=etag, body=body)
+        response_cache.put(key, entry)
+    return cached_response(entry)
 
 
-@app.post("/api/refresh")
-async def refresh() -> dict:
-    results = refresh_all(allow_network=True)
-    return {"status": "completed", "results": results}
+@app.post("/api/refresh", status_code=202)
+async def refresh() -> JSONResponse:
+    job, created = refresh_jobs.submit(allow_network=True)
+    return JSONResponse(
+        status_code=202,
+        content={
+            "job_id": job.job_id,
+            "status": job.status,
+            "deduplicated": not created,
+            "status_url": f"/api/refresh/{job.job_id}",
+        },
+    )
 
 
-@app.post("/api/advice", response_model=AdviceResponse)
-async def advice(request: AdviceRequest) -> AdviceResponse:
-    response = generate_advice(request)
+@app.get("/api/refresh/{job_id}")
+async def refresh_status(job_id: str) -> dict:
+    job = refresh_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown refresh job.")
+    return job.to_dict()
+
+
+def _series_geography(level: str, value: str, state: Optional[str]) -> Geography:
     try:
-        validate_response_citations(response)
-    except ValueError as exc:
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
+        geography = Geography(level=level, value=value, state=state)
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors(include_url=False, include_context=False)) from exc
+    _require_state_data(geography)
+    return geography
+
+
+def _cached_json(if_none_match: Optional[str], parts: list, build: Callable[[], dict]) -> Response:
+    key = versioned_key("series", data_version(), app.version, json.dumps(parts, default=str))
+    etag = strong_etag(key)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    entry = response_cache.get(key)
+    if entry is None:
+        entry = CachedResponse(etag=etag, body=json.dumps(build()).encode("utf-8"))
+        response_cache.put(key, entry)
+    return cached_response(entry)
+
+
+@app.get("/api/series")
+def series_aligned(
+    metrics: str = Query(..., description="Comma-separated metric ids"),
+    level: Literal["state", "county"] = "state",
+    value: str = "Florida",
+    state: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    max_points: Optional[int] = Query(default=None, ge=3),
+    if_none_match: Optional[str] = Header(default=None),
+) -> Response:
+    metric_ids = [metric_id.strip() for metric_id in metrics.split(",") if metric_id.strip()]
+    unknown = [metric_id for metric_id in metric_ids if metric_id not in SPECS]
+    if not metric_ids or unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown metric: {', '.join(unknown) or metrics}")
+    geography = _series_geography(level, value, state)
+    return _cached_json(
+        if_none_match,
+        [metric_ids, geography.model_dump(), start, end, max_points],
+        lambda: aligned_payload(metric_ids, geography, start and start.isoformat(), end and end.isoformat(), max_points),
+    )
+
+
+@app.get("/api/series/{metric_id}")
+def series(
+    metric_id: str,
+    level: Literal["state", "county"] = "state",
+    value: str = "Florida",
+    state: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    offset: int = Query(default=0, ge=0),
+    limit: Optional[int] = Query(default=None, ge=1),
+    max_points: Optional[int] = Query(default=None, ge=3),
+    if_none_match: Optional[str] = Header(default=None),
+) -> Response:
+    if metric_id not in SPECS:
+        raise HTTPException(status_code=404, detail=f"Unknown metric: {metric_id}")
+    geography = _series_geography(level, value, state)
+    return _cached_json(
+        if_none_match,
+        [metric_id, geography.model_dump(), start, end, offset, limit, max_points],
+        lambda: series_payload(
+            metric_id,
+            geography,
+            start and start.isoformat(),
+            end and end.isoformat(),
+            offset,
+            limit,
+            max_points,
+        ),
+    )
+
+
+def _require_state_data(geography: Geography) -> None:
+    state = request_state(geography)
+    if state == DEFAULT_STATE:
+        return
+    with state_scope(state):
+        if not current_processed_dir().exists():
+            raise HTTPException(status_code=404, detail=f"No data for {state}; add it to STATES and refresh.")
+
+
+def _validated_advice(request: AdviceRequest) -> AdviceResponse:
+    response = generate_advice(request)
+    validate_response_citations(response)
     return response
 
 
-@app.post("/api/memo", response_model=MemoResponse)
-async def memo(request: MemoRequest) -> MemoResponse:
+def _write_memo(request: MemoRequest) -> MemoResponse:
     advice = request.advice or generate_advice(request.inputs)
+    validate_response_citations(advice)
+    memo_path, memo_markdown = save_memo(request.inputs, advice)
+    return MemoResponse(memo_path=memo_path, memo_markdown=memo_markdown)
+
+
+async def _offload(is_disconnected, fn, *args):
     try:
-        validate_response_citations(advice)
+        return await get_pool().run(fn, *args, is_disconnected=is_disconnected)
+    except PoolSaturated as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
     except ValueError as exc:
         raise HTTPException(status_code=500, detail=str(exc)) from exc
-    memo_path, memo_markdown = save_memo(request.inputs, advice)
-    return MemoResponse(memo_path=memo_path, memo_markdown=memo_markdown)
+
+
+@app.post("/api/advice", response_model=AdviceResponse)
+async def advice(
+    request: AdviceRequest,
+    http_request: Request,
+    if_none_match: Optional[str] = Header(default=None),
+) -> Response:
+    _require_state_data(request.geography)
+    key = request_key(request, data_version(), values_version(), app.version)
+    etag = strong_etag(key)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    entry = response_cache.get(key)
+    if entry is None:
+        try:
+            response = await advice_flights.do(
+                key,
+                lambda abandoned: _offload(abandoned, _validated_advice, request),
+                http_request.is_disconnected,
+            )
+        except ClientDisconnected:
+            return Response(status_code=499)
+        entry = CachedResponse(etag=etag, body=response.model_dump_json().encode("utf-8"))
+        response_cache.put(key, entry)
+    return cached_response(entry)
+
+
+def _format_event(name: str, payload: dict, stream_format: str) -> bytes:
+    if stream_format == "ndjson":
+        return (json.dumps({"event": name, "data": payload}) + "\n").encode("utf-8")
+    return f"event: {name}\ndata: {json.dumps(payload)}\n\n".encode("utf-8")
+
+
+async def _stream_advice(
+    job: Job,
+    queue: Optional[asyncio.Queue],
+    stream_format: str,
+) -> AsyncIterator[bytes]:
+    try:
+        if queue is None:
+            for name, payload in events_from_response(await job.result):
+                yield _format_event(name, payload, stream_format)
+            return
+        while (event := await queue.get()) is not None:
+            yield _format_event(*event, stream_format)
+        await job.result
+    except Exception as exc:
+        yield _format_event("error", {"detail": str(exc)}, stream_format)
+    finally:
+        if not job.result.done():
+            job.cancel()
+
+
+@app.post("/api/advice/stream")
+async def advice_stream(
+    request: AdviceRequest,
+    stream_format: Literal["sse", "ndjson"] = Query(default="sse", alias="format"),
+) -> StreamingResponse:
+    media_type = STREAM_MEDIA_TYPES[stream_format]
+    _require_state_data(request.geography)
+    key = request_key(request, data_version(), values_version(), app.version)
+    entry = response_cache.get(key)
+    if entry is not None:
+        events = events_from_response(AdviceResponse.model_validate_json(entry.body))
+        return StreamingResponse(
+            (_format_event(name, payload, stream_format) for name, payload in events),
+            media_type=media_type,
+        )
+
+    loop = asyncio.get_running_loop()
+    queue: Optional[asyncio.Queue] = asyncio.Queue()
+
+    def produce() -> None:
+        try:
+            for event in iter_advice_events(request):
+                if cancellation_requested():
+                    return
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    pool = get_pool()
+    try:
+        if pool.kind == "process":
+            queue = None
+            job = pool.start(_validated_advice, request)
+        else:
+            job = pool.start(produce)
+    except PoolSaturated as exc:
+        raise HTTPException(
+            status_code=503,
+            detail=str(exc),
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+    return StreamingResponse(_stream_advice(job, queue, stream_format), media_type=media_type)
+
+
+@app.post("/api/memo", response_model=MemoResponse)
+async def memo(request: MemoRequest, http_request: Request) -> MemoResponse:
+    if request.advice is None:
+        _require_state_data(request.inputs.geography)
+    try:
+        return await _offload(http_request.is_disconnected, _write_memo, request)
+    except ClientDisconnected:
+        return Response(status_code=499)
 
 
 static_dir = get_static_dir()
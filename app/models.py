@@ -2,12 +2,25 @@ from __future__ import annotations
 
 from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from app.data.geography import resolve_state
 
 
 class Geography(BaseModel):
     level: Literal["state", "county"]
     value: str = Field(..., description="State name or county FIPS/name")
+    state: Optional[str] = Field(None, description="State postal code, name or FIPS; defaults to the state in value, else Florida")
+
+    @field_validator("state")
+    @classmethod
+    def _known_state(cls, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return None
+        state = resolve_state(value)
+        if state is None:
+            raise ValueError(f"Unknown state: {value}")
+        return state
 
 
 class AdviceRequest(BaseModel):
@@ -56,6 +69,10 @@ class ForecastItem(BaseModel):
     citations: List[str]
     status: str = "available"
     method_note: Optional[str] = None
+    lower_80: Optional[float] = None
+    upper_80: Optional[float] = None
+    lower_95: Optional[float] = None
+    upper_95: Optional[float] = None
 
 
 class PolicyBundle(BaseModel):
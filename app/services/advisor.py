@@ -1,31 +1,122 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import pandas as pd
+from pydantic import BaseModel
 
+from app.core.citations import (
+    validate_citation_references,
+    validate_evidence_item,
+    validate_forecast_item,
+    validate_option,
+    validate_risk,
+    validate_summary,
+)
+from app.data.aggregates import county_peers, county_ranks, load_derived, series_changes
+from app.data.geography import (
+    DEFAULT_STATE,
+    FL_COUNTIES,
+    current_state,
+    request_state,
+    resolve_county_fips,
+    state_name,
+    state_scope,
+)
 from app.data.registry import get_dataset_metadata
+from app.data.schemas import read_typed
+from app.data.snapshots import current_processed_dir, current_snapshot, pinned_snapshot
 from app.models import AdviceRequest, AdviceResponse, Citation, EvidenceItem, ForecastItem
-from app.services.forecast import generate_outlook
+from app.services.forecast import iter_outlook, summarize_outlook
 from app.services.policy_engine import rank_policies
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
 DATA_DIR = ROOT_DIR / "data"
 
+COMPARISONS = {
+    "rent_to_income": "Rent burden",
+    "median_household_income": "Median household income",
+    "poverty_rate": "Poverty rate",
+}
+
 
 def _load_processed(dataset_id: str, filename: str) -> pd.DataFrame:
-    processed_path = DATA_DIR / "processed" / dataset_id / filename
+    processed_path = current_processed_dir() / dataset_id / filename
     if not processed_path.exists():
         fixture_path = DATA_DIR / "fixtures" / dataset_id / filename
+        if current_state() != DEFAULT_STATE:
+            return pd.DataFrame()
+        if fixture_path.exists() and current_snapshot() is not None:
+            return read_typed(fixture_path, dataset_id)
         if fixture_path.exists():
             processed_path.parent.mkdir(parents=True, exist_ok=True)
             processed_path.write_text(fixture_path.read_text())
     if processed_path.exists():
-        return pd.read_csv(processed_path)
+        return read_typed(processed_path, dataset_id)
     return pd.DataFrame()
 
 
+def _load_bls_county(fips: str) -> pd.DataFrame:
+    path = current_processed_dir() / "bls_unemployment" / "county" / f"{fips}.csv"
+    if not path.exists():
+        return pd.DataFrame()
+    county = read_typed(path, "bls_unemployment")
+    return county[county["measure"] == "unemployment_rate"]
+
+
+def _series_latest(
+    source: str,
+    load: Callable[[], pd.DataFrame],
+    series_id: Optional[str] = None,
+) -> Optional[pd.Series]:
+    latest = load_derived("series_latest.csv")
+    rows = latest[latest["source"] == source] if not latest.empty else latest
+    if rows.empty:
+        rows = series_changes(load(), source)
+    if series_id is not None and not rows.empty:
+        rows = rows[rows["series_id"] == series_id]
+    if rows.empty:
+        return None
+    return rows.sort_values("latest_date").iloc[-1]
+
+
+def _county_label(fips: str) -> str:
+    acs = _load_processed("census_acs_fl_county", "acs_county.csv")
+    if not acs.empty:
+        match = acs[acs["county_fips"].astype(str).str.zfill(5) == fips]
+        if not match.empty:
+            return str(match["county_name"].iloc[-1]).split(",")[0]
+    if current_state() == DEFAULT_STATE and fips in FL_COUNTIES:
+        return f"{FL_COUNTIES[fips]} County"
+    return f"County {fips}"
+
+
+def _bls_latest(geography) -> Tuple[str, Optional[pd.Series]]:
+    fips = resolve_county_fips(geography.value) if geography.level == "county" else None
+    if fips is not None:
+        latest = _series_latest(
+            f"bls_unemployment/county/{fips}.csv",
+            lambda: _load_bls_county(fips),
+            f"LAUCN{fips}0000000003",
+        )
+        if latest is not None:
+            return _county_label(fips), latest
+    latest = _series_latest(
+        "bls_unemployment/unemployment.csv",
+        lambda: _load_processed("bls_unemployment", "unemployment.csv"),
+    )
+    return state_name(), latest
+
+
+def _fred_latest(series_id: str) -> Optional[pd.Series]:
+    return _series_latest(
+        "fred_macro/fred_macro.csv",
+        lambda: _load_processed("fred_macro", "fred_macro.csv"),
+        series_id,
+    )
+
+
 def _citation_for(dataset_id: str) -> Citation:
     metadata = get_dataset_metadata(dataset_id)
     return Citation(
@@ -41,6 +132,71 @@ def _format_currency(value: float) -> str:
     return f"${value:,.0f}"
 
 
+def _format_indicator(indicator: str, value: float) -> str:
+    if indicator.startswith("median_"):
+        return _format_currency(value)
+    return f"{value * 100:.1f}%"
+
+
+def _ordinal(value: int) -> str:
+    suffix = "th" if 10 <= value % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(value % 10, "th")
+    return f"{value}{suffix}"
+
+
+def _derived_or_build(name: str, acs: pd.DataFrame, build: Callable[[pd.DataFrame], pd.DataFrame]) -> pd.DataFrame:
+    table = load_derived(name)
+    return table if not table.empty else build(acs)
+
+
+def build_comparisons(acs: pd.DataFrame, row: pd.Series) -> List[EvidenceItem]:
+    fips = str(row.get("county_fips", ""))
+    if not fips.isdigit():
+        return []
+    ranks = _derived_or_build("county_ranks.csv", acs, county_ranks)
+    county = ranks[ranks["county_fips"] == fips].set_index("indicator") if not ranks.empty else ranks
+    if county.empty:
+        return []
+    items: List[EvidenceItem] = []
+    for indicator, label in COMPARISONS.items():
+        if indicator not in county.index:
+            continue
+        entry = county.loc[indicator]
+        claim = (
+            f"{label} in {row['county_name']} is in the {_ordinal(min(int(entry['percentile']), 99))} percentile "
+            f"of {state_name()} counties (rank {int(entry['rank'])} of {int(entry['count'])})."
+        )
+        items.append(EvidenceItem(
+            label=f"{label} percentile",
+            claim=claim,
+            citations=["census_acs_fl_county"],
+        ))
+
+    peers = _derived_or_build("county_peers.csv", acs, county_peers)
+    peers = peers[peers["county_fips"] == fips].sort_values("peer_rank") if not peers.empty else peers
+    if peers.empty:
+        return items
+    names = ", ".join(name.split(",")[0] for name in peers["peer_name"])
+    comparisons = []
+    for indicator, label in COMPARISONS.items():
+        peer_values = ranks[(ranks["indicator"] == indicator) & ranks["county_fips"].isin(peers["peer_fips"])]["value"]
+        if indicator in county.index and not peer_values.empty:
+            comparisons.append(
+                f"{label.lower()} {_format_indicator(indicator, county.loc[indicator, 'value'])} "
+                f"vs. {_format_indicator(indicator, peer_values.mean())}"
+            )
+    if comparisons:
+        claim = (
+            f"Compared with the average of its {len(peers)} most similar {state_name()} counties ({names}), "
+            f"{row['county_name']} has {'; '.join(comparisons)}."
+        )
+        items.append(EvidenceItem(
+            label="Peer counties",
+            claim=claim,
+            citations=["census_acs_fl_county"],
+        ))
+    return items
+
+
 def _select_acs_row(acs: pd.DataFrame, geography) -> pd.Series | None:
     if acs.empty:
         return None
@@ -48,19 +204,26 @@ def _select_acs_row(acs: pd.DataFrame, geography) -> pd.Series | None:
         acs = acs.sort_values("year")
         latest_year = acs["year"].iloc[-1]
         acs = acs[acs["year"] == latest_year]
+    acs = acs.assign(county_fips=acs["county_fips"].astype(str).str.zfill(5))
     if geography.level == "county":
         if geography.value.isdigit():
-            match = acs[acs["county_fips"] == geography.value]
+            match = acs[acs["county_fips"] == geography.value.zfill(5)]
             if not match.empty:
                 return match.iloc[0]
         match = acs[acs["county_name"].str.contains(geography.value, case=False, na=False)]
         if not match.empty:
             return match.iloc[0]
+    averages = load_derived("state_averages.csv")
+    if not averages.empty:
+        averaged = averages.sort_values("year").iloc[-1].to_dict()
+        averaged["county_name"] = f"{state_name()} (avg)"
+        averaged["county_fips"] = "state"
+        return pd.Series(averaged)
     numeric_cols = acs.select_dtypes(include="number").columns
     if not numeric_cols.empty:
         averages = acs[numeric_cols].mean()
         averaged = averages.to_dict()
-        averaged["county_name"] = "Florida (avg)"
+        averaged["county_name"] = f"{state_name()} (avg)"
         averaged["county_fips"] = "state"
         return pd.Series(averaged)
     return None
@@ -75,30 +238,26 @@ def build_evidence(request: AdviceRequest) -> List[EvidenceItem]:
         issue_area = "general"
 
     if include_all or issue_area in ("labor_market", "general"):
-        bls = _load_processed("bls_unemployment", "unemployment.csv")
-        if not bls.empty:
-            latest = bls.sort_values("date").iloc[-1]
+        area, latest = _bls_latest(geography)
+        if latest is not None:
             claim = (
-                f"Florida unemployment rate was {latest['value']:.1f}% in {latest['date']}."
+                f"{area} unemployment rate was {latest['latest_value']:.1f}% in {latest['latest_date']}."
             )
             evidence.append(EvidenceItem(
                 label="Unemployment rate",
                 claim=claim,
                 citations=["bls_unemployment"],
             ))
-        fred = _load_processed("fred_macro", "fred_macro.csv")
-        if not fred.empty:
-            series = fred[fred["series_id"] == "FLNGSP"]
-            if not series.empty:
-                latest = series.sort_values("date").iloc[-1]
-                claim = (
-                    f"Florida real GDP was {latest['value']:,.0f} in {latest['date']}."
-                )
-                evidence.append(EvidenceItem(
-                    label="State output",
-                    claim=claim,
-                    citations=["fred_macro"],
-                ))
+        latest = _fred_latest(f"{current_state()}NGSP")
+        if latest is not None:
+            claim = (
+                f"{state_name()} real GDP was {latest['latest_value']:,.0f} in {latest['latest_date']}."
+            )
+            evidence.append(EvidenceItem(
+                label="State output",
+                claim=claim,
+                citations=["fred_macro"],
+            ))
 
     if include_all or issue_area in ("housing", "general"):
         acs = _load_processed("census_acs_fl_county", "acs_county.csv")
@@ -159,34 +318,29 @@ def build_evidence(request: AdviceRequest) -> List[EvidenceItem]:
                     claim=claim,
                     citations=["census_acs_fl_county"],
                 ))
+            evidence.extend(build_comparisons(acs, row))
 
     if include_all or issue_area in ("fiscal",):
-        fred = _load_processed("fred_macro", "fred_macro.csv")
-        if not fred.empty:
-            series = fred[fred["series_id"] == "FLUR"]
-            if not series.empty:
-                latest = series.sort_values("date").iloc[-1]
-                claim = (
-                    f"FRED reports Florida unemployment rate at {latest['value']:.1f}% in {latest['date']}."
-                )
-                evidence.append(EvidenceItem(
-                    label="Labor market baseline",
-                    claim=claim,
-                    citations=["fred_macro"],
-                ))
-            gdp = fred[fred["series_id"] == "FLNGSP"].sort_values("date")
-            if len(gdp) >= 2:
-                latest = gdp.iloc[-1]
-                prior = gdp.iloc[-2]
-                growth = ((latest["value"] - prior["value"]) / prior["value"]) * 100
-                claim = (
-                    f"Real GDP increased by {growth:.1f}% between {prior['date']} and {latest['date']}."
-                )
-                evidence.append(EvidenceItem(
-                    label="GDP growth",
-                    claim=claim,
-                    citations=["fred_macro"],
-                ))
+        latest = _fred_latest(f"{current_state()}UR")
+        if latest is not None:
+            claim = (
+                f"FRED reports {state_name()} unemployment rate at {latest['latest_value']:.1f}% in {latest['latest_date']}."
+            )
+            evidence.append(EvidenceItem(
+                label="Labor market baseline",
+                claim=claim,
+                citations=["fred_macro"],
+            ))
+        gdp = _fred_latest(f"{current_state()}NGSP")
+        if gdp is not None and pd.notna(gdp["pct_change"]):
+            claim = (
+                f"Real GDP increased by {gdp['pct_change']:.1f}% between {gdp['prior_date']} and {gdp['latest_date']}."
+            )
+            evidence.append(EvidenceItem(
+                label="GDP growth",
+                claim=claim,
+                citations=["fred_macro"],
+            ))
 
     return evidence
 
@@ -219,20 +373,90 @@ def build_citations(evidence: List[EvidenceItem], outlook: List[ForecastItem]) -
 
 
 def generate_advice(request: AdviceRequest) -> AdviceResponse:
+    with pinned_snapshot(), state_scope(request_state(request.geography)):
+        return _generate_advice(request)
+
+
+def _generate_advice(request: AdviceRequest) -> AdviceResponse:
+    fields: Dict[str, Any] = {"evidence": [], "outlook": []}
+    for name, payload in _advice_sections(request):
+        if name == "evidence":
+            fields["evidence"].append(payload)
+        elif name == "forecast":
+            fields["outlook"].append(payload)
+        else:
+            fields.update(payload)
+    return AdviceResponse(**fields)
+
+
+AdviceEvent = Tuple[str, Dict[str, Any]]
+
+
+def iter_advice_events(request: AdviceRequest) -> Iterator[AdviceEvent]:
+    with pinned_snapshot(), state_scope(request_state(request.geography)):
+        yield from _iter_advice_events(request)
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, list):
+        return [_dump(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _dump(item) for key, item in value.items()}
+    return value
+
+
+def _iter_advice_events(request: AdviceRequest) -> Iterator[AdviceEvent]:
+    for name, payload in _advice_sections(request):
+        yield name, _dump(payload)
+    yield "done", {}
+
+
+def _advice_sections(request: AdviceRequest) -> Iterator[Tuple[str, Any]]:
+    summary = generate_summary(request.issue_area)
+    risks = generate_risks(request.issue_area)
+    validate_summary(summary)
+    for risk in risks:
+        validate_risk(risk)
+    yield "summary", {"summary": summary, "risks": risks}
+
     evidence = build_evidence(request)
-    outlook, outlook_summary, urgency, forecast_info = generate_outlook(request)
-    citations = build_citations(evidence, outlook)
+    for item in evidence:
+        validate_evidence_item(item)
+        yield "evidence", item
+
+    outlook: List[ForecastItem] = []
+    model_notes: List[str] = []
+    for item in iter_outlook(request, model_notes):
+        validate_forecast_item(item)
+        outlook.append(item)
+        yield "forecast", item
+    outlook_summary, urgency, forecast_info = summarize_outlook(request, outlook, model_notes)
+    yield "outlook", {"outlook_summary": outlook_summary, "forecast_info": forecast_info}
+
     options, bundles, objectives = rank_policies(request, outlook, urgency)
-    response = AdviceResponse(
-        summary=generate_summary(request.issue_area),
-        outlook_summary=outlook_summary,
-        outlook=outlook,
-        forecast_info=forecast_info,
-        objectives=objectives,
-        evidence=evidence,
-        options=options,
-        policy_bundles=bundles,
-        risks=generate_risks(request.issue_area),
-        citations=citations,
-    )
-    return response
+    for option in options:
+        validate_option(option)
+    yield "options", {"options": options}
+    yield "bundles", {"policy_bundles": bundles, "objectives": objectives}
+
+    citations = build_citations(evidence, outlook)
+    validate_citation_references(citations, evidence, outlook)
+    yield "citations", {"citations": citations}
+
+
+def events_from_response(response: AdviceResponse) -> Iterator[AdviceEvent]:
+    yield "summary", {"summary": response.summary, "risks": response.risks}
+    for item in response.evidence:
+        yield "evidence", item.model_dump(mode="json")
+    for item in response.outlook:
+        yield "forecast", item.model_dump(mode="json")
+    yield "outlook", {"outlook_summary": response.outlook_summary, "forecast_info": response.forecast_info}
+    yield "options", {"options": [option.model_dump(mode="json") for option in response.options]}
+    yield "bundles", {
+        "policy_bundles": [bundle.model_dump(mode="json") for bundle in response.policy_bundles],
+        "objectives": response.objectives,
+    }
+    yield "citations", {"citations": [citation.model_dump(mode="json") for citation in response.citations]}
+    yield "done", {}
@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.threads import configure_thread_budget
+from app.data.snapshots import current_processed_dir
+from app.models import Geography
+from app.services.forecast import (
+    BOOTSTRAP_SEED,
+    DATA_DIR,
+    METRICS,
+    ROOT_DIR,
+    _fit_linear,
+    _fit_torch,
+    _load_metric_series,
+    _load_processed,
+    _metric_frame,
+    _predict_linear,
+    _predict_mlp,
+    _simulate_linear,
+    _simulate_mlp,
+    torch,
+)
+
+OUTPUT_DIR = ROOT_DIR / "outputs" / "backtests"
+STATE_GEOGRAPHY = Geography(level="state", value="Florida")
+INTERVAL_LEVEL = 0.8
+INTERVAL_Z = 1.2816
+
+
+@dataclass(frozen=True)
+class Engine:
+    name: str
+    fit: Callable[[np.ndarray], object]
+    predict: Callable[[object, np.ndarray, int], List[float]]
+    simulate: Callable[[object, np.ndarray, int, np.random.Generator], Optional[np.ndarray]]
+
+
+ENGINES: Dict[str, Engine] = {
+    "torch": Engine(name="torch", fit=_fit_torch, predict=_predict_mlp, simulate=_simulate_mlp),
+    "linear": Engine(name="linear", fit=_fit_linear, predict=_predict_linear, simulate=_simulate_linear),
+}
+
+
+@dataclass(frozen=True)
+class BacktestTask:
+    metric_id: str
+    geography: str
+    engine: str
+    values: Tuple[float, ...]
+    horizons: Tuple[int, ...]
+    cutoffs: int
+    min_train: int
+
+
+@dataclass
+class BacktestResult:
+    metric_id: str
+    geography: str
+    engine: str
+    horizon: int
+    evaluations: int
+    mae: Optional[float]
+    mape: Optional[float]
+    coverage: Optional[float]
+    fit_seconds: float
+    predict_seconds: float
+    peak_python_heap_bytes: int
+    error: Optional[str] = None
+
+
+def _available_engines() -> List[str]:
+    return [name for name in ENGINES if name != "torch" or torch is not None]
+
+
+def _rolling_origins(length: int, horizon: int, cutoffs: int, min_train: int) -> List[int]:
+    last_origin = length - horizon
+    first_origin = max(min_train, last_origin - cutoffs + 1)
+    return list(range(first_origin, last_origin + 1))
+
+
+def _interval(
+    train: np.ndarray,
+    predictions: np.ndarray,
+    paths: Optional[np.ndarray],
+) -> Tuple[np.ndarray, np.ndarray]:
+    if paths is not None:
+        tail = (1 - INTERVAL_LEVEL) / 2
+        lower, upper = np.quantile(paths.astype(np.float64), [tail, 1 - tail], axis=0)
+        return lower, upper
+    diffs = np.diff(train)
+    sigma = float(diffs.std()) if len(diffs) > 1 else 0.0
+    spread = INTERVAL_Z * sigma * np.sqrt(np.arange(1, len(predictions) + 1))
+    return predictions - spread, predictions + spread
+
+
+def run_task(task: BacktestTask) -> List[BacktestResult]:
+    engine = ENGINES[task.engine]
+    values = np.asarray(task.values, dtype=np.float32)
+    results: List[BacktestResult] = []
+    for horizon in task.horizons:
+        abs_errors: List[float] = []
+        pct_errors: List[float] = []
+        covered: List[bool] = []
+        fit_seconds = 0.0
+        predict_seconds = 0.0
+        peak_heap = 0
+        error = None
+        for origin in _rolling_origins(len(values), horizon, task.cutoffs, task.min_train):
+            train = values[:origin]
+            actual = values[origin:origin + horizon].astype(np.float64)
+            tracemalloc.start()
+            try:
+                started = time.perf_counter()
+                fitted = engine.fit(train)
+                fit_seconds += time.perf_counter() - started
+                if fitted is None:
+                    continue
+                started = time.perf_counter()
+                predictions = np.asarray(engine.predict(fitted, train, horizon), dtype=np.float64)
+                predict_seconds += time.perf_counter() - started
+                paths = engine.simulate(fitted, train, horizon, np.random.default_rng(BOOTSTRAP_SEED))
+            except Exception as exc:
+                error = str(exc)
+                break
+            finally:
+                peak_heap = max(peak_heap, tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+            lower, upper = _interval(train.astype(np.float64), predictions, paths)
+            abs_errors.extend(np.abs(predictions - actual).tolist())
+            nonzero = actual != 0
+            pct_errors.extend((np.abs(predictions - actual)[nonzero] / np.abs(actual[nonzero])).tolist())
+            covered.extend(((actual >= lower) & (actual <= upper)).tolist())
+        results.append(BacktestResult(
+            metric_id=task.metric_id,
+            geography=task.geography,
+            engine=task.engine,
+            horizon=horizon,
+            evaluations=len(abs_errors) // horizon,
+            mae=float(np.mean(abs_errors)) if abs_errors else None,
+            mape=float(np.mean(pct_errors) * 100) if pct_errors else None,
+            coverage=float(np.mean(covered)) if covered else None,
+            fit_seconds=round(fit_seconds, 6),
+            predict_seconds=round(predict_seconds, 6),
+            peak_python_heap_bytes=int(peak_heap),
+            error=error,
+        ))
+    return results
+
+
+def _county_geographies(processed_dir: Path) -> List[Geography]:
+    acs = _load_processed("census_acs_fl_county", "acs_county.csv", processed_dir)
+    if acs.empty or "county_fips" not in acs.columns:
+        return []
+    fips_codes = sorted(acs["county_fips"].dropna().astype(str).unique())
+    return [Geography(level="county", value=fips) for fips in fips_codes]
+
+
+def _geography_label(geography: Geography) -> str:
+    return geography.value if geography.level == "county" else "state"
+
+
+def collect_series(processed_dir: Path, min_length: int) -> Dict[Tuple[str, str], np.ndarray]:
+    geographies = [STATE_GEOGRAPHY] + _county_geographies(processed_dir)
+    series: Dict[Tuple[str, str], np.ndarray] = {}
+    for spec in METRICS:
+        seen: set[str] = set()
+        for geography in geographies:
+            df, _ = _load_metric_series(spec, geography, processed_dir)
+            if df.empty or spec.value_col not in df.columns:
+                continue
+            values = _metric_frame(df, spec)["value"].to_numpy(dtype=np.float32)
+            if len(values) < min_length:
+                continue
+            digest = hashlib.sha256(values.tobytes()).hexdigest()
+            if digest in seen:
+                continue
+            seen.add(digest)
+            series[(spec.metric_id, _geography_label(geography))] = values
+    return series
+
+
+def synthetic_series(
+    geographies: int = 3,
+    length: int = 48,
+    seed: int = 7,
+) -> Dict[Tuple[str, str], np.ndarray]:
+    rng = np.random.default_rng(seed)
+    series: Dict[Tuple[str, str], np.ndarray] = {}
+    labels = ["state"] + [f"synthetic_{idx:03d}" for idx in range(1, geographies)]
+    steps = np.arange(length)
+    for spec in METRICS:
+        for label in labels:
+            level = rng.uniform(5, 100)
+            trend = rng.normal(0, level * 0.005)
+            season = level * 0.02 * np.sin(2 * np.pi * steps / 12)
+            noise = rng.normal(0, level * 0.01, size=length)
+            series[(spec.metric_id, label)] = (level + trend * steps + season + noise).astype(np.float32)
+    return series
+
+
+def _init_worker() -> None:
+    configure_thread_budget(1)
+
+
+def run_backtest(
+    series: Dict[Tuple[str, str], np.ndarray],
+    engines: Sequence[str],
+    horizons: Sequence[int],
+    cutoffs: int,
+    min_train: int,
+    workers: int = 1,
+) -> List[BacktestResult]:
+    tasks = [
+        BacktestTask(
+            metric_id=metric_id,
+            geography=geography,
+            engine=engine,
+            values=tuple(float(value) for value in values),
+            horizons=tuple(horizons),
+            cutoffs=cutoffs,
+            min_train=min_train,
+        )
+        for (metric_id, geography), values in series.items()
+        for engine in engines
+    ]
+    results: List[BacktestResult] = []
+    if workers <= 1:
+        for task in tasks:
+            results.extend(run_task(task))
+        return results
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        for task_results in pool.map(run_task, tasks):
+            results.extend(task_results)
+    return results
+
+
+def summarize(results: Sequence[BacktestResult]) -> Dict[str, Dict[str, Optional[float]]]:
+    frame = pd.DataFrame([asdict(result) for result in results])
+    summary: Dict[str, Dict[str, Optional[float]]] = {}
+    if frame.empty:
+        return summary
+    for engine, group in frame.groupby("engine"):
+        scored = group[group["evaluations"] > 0]
+        summary[str(engine)] = {
+            "tasks": int(len(group)),
+            "failed": int(group["error"].notna().sum()),
+            "mae": float(scored["mae"].mean()) if not scored.empty else None,
+            "mape": float(scored["mape"].mean()) if scored["mape"].notna().any() else None,
+            "coverage": float(scored["coverage"].mean()) if not scored.empty else None,
+            "fit_seconds": float(group["fit_seconds"].sum()),
+            "predict_seconds": float(group["predict_seconds"].sum()),
+            "peak_python_heap_bytes": int(group["peak_python_heap_bytes"].max()),
+        }
+    return summary
+
+
+def write_report(report: dict, output_dir: Optional[Path] = None) -> Path:
+    timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    folder = (output_dir or OUTPUT_DIR) / timestamp
+    folder.mkdir(parents=True, exist_ok=True)
+    report_path = folder / "report.json"
+    report_path.write_text(json.dumps(report, indent=2))
+    return report_path
+
+
+def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest for forecast engines.")
+    parser.add_argument("--source", choices=["processed", "fixtures", "synthetic"], default="processed")
+    parser.add_argument("--engines", default=",".join(_available_engines()))
+    parser.add_argument("--horizons", default="1,3,6")
+    parser.add_argument("--cutoffs", type=int, default=3)
+    parser.add_argument("--min-train", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--synthetic-geographies", type=int, default=3)
+    parser.add_argument("--synthetic-length", type=int, default=48)
+    parser.add_argument("--output-dir", type=Path, default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Path:
+    args = _parse_args(argv)
+    engines = [name.strip() for name in args.engines.split(",") if name.strip()]
+    unknown = [name for name in engines if name not in _available_engines()]
+    if unknown:
+        raise SystemExit(f"Unknown or unavailable engines: {', '.join(unknown)}")
+    horizons = sorted({int(value) for value in args.horizons.split(",") if value.strip()})
+    if args.source == "synthetic":
+        series = synthetic_series(args.synthetic_geographies, args.synthetic_length)
+    else:
+        source_dir = current_processed_dir() if args.source == "processed" else DATA_DIR / args.source
+        series = collect_series(source_dir, args.min_train + min(horizons))
+    results = run_backtest(series, engines, horizons, args.cutoffs, args.min_train, args.workers)
+    report = {
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+        "config": {
+            "source": args.source,
+            "engines": engines,
+            "horizons": horizons,
+            "cutoffs": args.cutoffs,
+            "min_train": args.min_train,
+            "workers": args.workers,
+            "interval_level": INTERVAL_LEVEL,
+        },
+        "series": len(series),
+        "summary": summarize(results),
+        "results": [asdict(result) for result in results],
+    }
+    report_path = write_report(report, args.output_dir)
+    print(report_path)
+    return report_path
+
+
+if __name__ == "__main__":
+    main()
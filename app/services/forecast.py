@@ -1,23 +1,64 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 import os
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 
+from app.core.executor import cancellation_requested
+from app.data.aggregates import load_derived
+from app.data.geography import (
+    DEFAULT_STATE,
+    current_state,
+    request_state,
+    resolve_county_fips,
+    state_name,
+    state_scope,
+)
+from app.data.schemas import read_typed, widen
+from app.data.snapshots import current_processed_dir
 from app.models import AdviceRequest, ForecastItem, Geography
-
-try:
-    import torch
-except ImportError:  # pragma: no cover - optional GPU dependency
+from app.services.model_store import (
+    config_digest,
+    drift_factor,
+    finetune_epochs,
+    load_checkpoint,
+    plan_update,
+    save_checkpoint,
+    warm_start_enabled,
+    watermark_metadata,
+)
+from app.services.mlp_artifacts import (
+    MLPArtifact,
+    artifact_key,
+    artifact_path,
+    find_artifact,
+    forecast_recursive,
+    from_torch,
+    save_artifact,
+)
+
+if os.getenv("FORECAST_INFERENCE", "train") == "prebuilt":
     torch = None
+else:
+    try:
+        import torch
+    except ImportError:  # pragma: no cover - optional GPU dependency
+        torch = None
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
 DATA_DIR = ROOT_DIR / "data"
 
+BOOTSTRAP_SEED = 42
+MODEL_SEED = 42
+MIN_BOOTSTRAP_RESIDUALS = 3
+COMPLETE_STOP_REASONS = frozenset({"max_epochs", "early_stop"})
+INTERVAL_LEVELS = (80, 95)
+
 HORIZON_MONTHS = {
     "near_term": 6,
     "mid_term": 24,
@@ -61,7 +102,7 @@ METRICS: List[MetricSpec] = [
         date_col="date",
         unit="%",
         preference="lower_is_better",
-        series_id="FLUR",
+        series_id="{state}UR",
     ),
     MetricSpec(
         metric_id="fiscal_real_gdp",
@@ -73,7 +114,7 @@ METRICS: List[MetricSpec] = [
         date_col="date",
         unit="USD",
         preference="higher_is_better",
-        series_id="FLNGSP",
+        series_id="{state}NGSP",
     ),
     MetricSpec(
         metric_id="housing_median_rent",
@@ -254,27 +295,104 @@ METRICS: List[MetricSpec] = [
 ]
 
 
-def _load_processed(dataset_id: str, filename: str) -> pd.DataFrame:
-    processed_path = DATA_DIR / "processed" / dataset_id / filename
+@dataclass(frozen=True)
+class TrainingBudget:
+    max_epochs: int
+    min_epochs: int
+    patience: int
+    min_delta: float
+    validation_fraction: float
+    min_validation_windows: int
+    deadline: Optional[float] = None
+
+
+@dataclass
+class FittedMLP:
+    model: object
+    artifact: MLPArtifact
+    lookback: int
+    epochs: int
+    stop_reason: str
+
+
+@dataclass(frozen=True)
+class MixedPanel:
+    dates: pd.DatetimeIndex
+    values: np.ndarray
+    feature_cols: Tuple[str, ...]
+    frequencies: Tuple[int, ...]
+    step_months: int
+
+    @property
+    def empty(self) -> bool:
+        return len(self.feature_cols) == 0
+
+    @property
+    def mask(self) -> np.ndarray:
+        return ~np.isnan(self.values)
+
+    def inputs(self, mean: np.ndarray, std: np.ndarray) -> np.ndarray:
+        scaled = np.nan_to_num((self.values - mean) / std)
+        return np.concatenate([scaled, self.mask], axis=1).astype(np.float32)
+
+    def latest(self) -> np.ndarray:
+        rows = np.arange(len(self.values))[:, np.newaxis]
+        last_seen = np.where(self.mask, rows, -1).max(axis=0)
+        latest = self.values[np.maximum(last_seen, 0), np.arange(self.values.shape[1])]
+        return np.where(last_seen >= 0, latest, np.nan)
+
+    def periods(self) -> np.ndarray:
+        return np.maximum(1, np.asarray(self.frequencies) // self.step_months)
+
+    def ages(self) -> np.ndarray:
+        rows = np.arange(len(self.values))[:, np.newaxis]
+        last_seen = np.where(self.mask, rows, -1).max(axis=0)
+        return len(self.values) - 1 - last_seen
+
+
+def training_budget(started: Optional[float] = None) -> TrainingBudget:
+    max_seconds = float(os.getenv("FORECAST_MAX_SECONDS", "30"))
+    started = time.monotonic() if started is None else started
+    return TrainingBudget(
+        max_epochs=max(1, int(os.getenv("FORECAST_MAX_EPOCHS", "500"))),
+        min_epochs=max(1, int(os.getenv("FORECAST_MIN_EPOCHS", "20"))),
+        patience=max(0, int(os.getenv("FORECAST_PATIENCE", "20"))),
+        min_delta=float(os.getenv("FORECAST_MIN_DELTA", "0.0001")),
+        validation_fraction=float(os.getenv("FORECAST_VALIDATION_FRACTION", "0.2")),
+        min_validation_windows=max(1, int(os.getenv("FORECAST_MIN_VALIDATION_WINDOWS", "2"))),
+        deadline=started + max_seconds if max_seconds > 0 else None,
+    )
+
+
+def budget_share(budget: TrainingBudget, fits: int) -> TrainingBudget:
+    if budget.deadline is None:
+        return budget
+    now = time.monotonic()
+    return replace(budget, deadline=now + max(0.0, budget.deadline - now) / max(1, fits))
+
+
+def _load_processed(dataset_id: str, filename: str, processed_dir: Optional[Path] = None) -> pd.DataFrame:
+    processed_path = (processed_dir or current_processed_dir()) / dataset_id / filename
     if processed_path.exists():
-        return pd.read_csv(processed_path)
+        return read_typed(processed_path, dataset_id)
     return pd.DataFrame()
 
 
 def _parse_dates(series: pd.Series) -> pd.Series:
+    if pd.api.types.is_numeric_dtype(series):
+        years = pd.to_numeric(series, errors="coerce").round().astype("Int64").astype(str)
+        return pd.to_datetime(years, format="%Y", errors="coerce")
     return pd.to_datetime(series, errors="coerce")
 
 
-def _to_monthly_series(df: pd.DataFrame, date_col: str, value_col: str) -> pd.DataFrame:
+def _native_series(df: pd.DataFrame, date_col: str, value_col: str) -> pd.DataFrame:
     dates = _parse_dates(df[date_col])
-    values = pd.to_numeric(df[value_col], errors="coerce")
+    values = widen(df[value_col])
     series = pd.DataFrame({"date": dates, "value": values}).dropna()
     if series.empty:
         return series
-    series = series.sort_values("date").set_index("date")
-    series = series.resample("MS").mean()
-    series["value"] = series["value"].ffill()
-    return series.reset_index()
+    series["date"] = series["date"].dt.to_period("M").dt.to_timestamp()
+    return series.groupby("date", as_index=False)["value"].mean()
 
 
 def _infer_frequency_months(dates: Iterable[pd.Timestamp]) -> int:
@@ -292,6 +410,25 @@ def _infer_frequency_months(dates: Iterable[pd.Timestamp]) -> int:
     return 12
 
 
+def _bootstrap_paths() -> int:
+    return max(1, int(os.getenv("FORECAST_BOOTSTRAP_PATHS", "500")))
+
+
+def _interval_bounds(samples: Optional[np.ndarray]) -> Dict[str, Optional[float]]:
+    bounds: Dict[str, Optional[float]] = {}
+    for level in INTERVAL_LEVELS:
+        bounds[f"lower_{level}"] = None
+        bounds[f"upper_{level}"] = None
+    if samples is None or len(samples) == 0:
+        return bounds
+    tails = [(100 - level) / 200 for level in INTERVAL_LEVELS]
+    quantiles = np.quantile(samples, [q for tail in tails for q in (tail, 1 - tail)])
+    for idx, level in enumerate(INTERVAL_LEVELS):
+        bounds[f"lower_{level}"] = float(quantiles[2 * idx])
+        bounds[f"upper_{level}"] = float(quantiles[2 * idx + 1])
+    return bounds
+
+
 def _window_data(values: np.ndarray, lookback: int) -> Tuple[np.ndarray, np.ndarray]:
     xs = []
     ys = []
@@ -301,65 +438,360 @@ def _window_data(values: np.ndarray, lookback: int) -> Tuple[np.ndarray, np.ndar
     return np.array(xs, dtype=np.float32), np.array(ys, dtype=np.float32)
 
 
-def _forecast_with_torch(values: np.ndarray, steps: int) -> Tuple[List[float], str]:
-    if torch is None:
-        raise RuntimeError("Torch is not available.")
+def _select_device():
     require_cuda = os.getenv("FORECAST_REQUIRE_CUDA") == "1"
     has_cuda = torch.cuda.is_available()
     if require_cuda and not has_cuda:
         raise RuntimeError("CUDA required but not available.")
-    device = torch.device("cuda" if has_cuda else "cpu")
-    lookback = min(6, max(2, len(values) - 1))
-    x, y = _window_data(values, lookback)
-    if len(x) == 0:
-        return [], "Insufficient data for forecasting"
+    return torch.device("cuda" if has_cuda else "cpu")
+
 
-    torch.manual_seed(42)
+def _build_mlp(inputs: int, hidden: int, outputs: int, device, seed: int = MODEL_SEED):
+    generator = torch.Generator().manual_seed(seed)
     model = torch.nn.Sequential(
-        torch.nn.Linear(lookback, 16),
+        torch.nn.Linear(inputs, hidden),
         torch.nn.ReLU(),
-        torch.nn.Linear(16, 1),
-    ).to(device)
+        torch.nn.Linear(hidden, outputs),
+    )
+    with torch.no_grad():
+        for layer in (model[0], model[2]):
+            bound = 1.0 / np.sqrt(layer.in_features)
+            layer.weight.uniform_(-bound, bound, generator=generator)
+            layer.bias.uniform_(-bound, bound, generator=generator)
+    return model.to(device)
+
+
+def _masked_mse(preds, target, mask=None):
+    if mask is None:
+        return torch.mean((preds - target) ** 2)
+    return torch.sum(mask * (preds - target) ** 2) / torch.clamp(mask.sum(), min=1.0)
+
+
+def _fit_epochs(
+    model,
+    x_tensor,
+    y_tensor,
+    budget: TrainingBudget,
+    x_val=None,
+    y_val=None,
+    mask=None,
+    val_mask=None,
+) -> Tuple[int, int, str]:
     optimizer = torch.optim.Adam(model.parameters(), lr=0.01)
-    loss_fn = torch.nn.MSELoss()
-    x_tensor = torch.tensor(x, device=device)
-    y_tensor = torch.tensor(y, device=device).unsqueeze(-1)
-
-    for _ in range(200):
+    best_loss = float("inf")
+    best_epoch = 0
+    best_state = None
+    stale = 0
+    epoch = 0
+    stop_reason = "max_epochs"
+    while epoch < budget.max_epochs:
+        epoch += 1
+        model.train()
         optimizer.zero_grad()
         preds = model(x_tensor)
-        loss = loss_fn(preds, y_tensor)
+        loss = _masked_mse(preds, y_tensor, mask)
         loss.backward()
         optimizer.step()
-
-    history = list(values.astype(np.float32))
-    predictions = []
+        if x_val is not None:
+            model.eval()
+            with torch.no_grad():
+                monitored = _masked_mse(model(x_val), y_val, val_mask).item()
+        else:
+            monitored = loss.item()
+        if monitored < best_loss - budget.min_delta * abs(best_loss if best_loss != float("inf") else monitored):
+            best_loss = monitored
+            best_epoch = epoch
+            stale = 0
+            if x_val is not None:
+                best_state = {key: value.detach().clone() for key, value in model.state_dict().items()}
+        else:
+            stale += 1
+        if budget.patience and epoch >= budget.min_epochs and stale >= budget.patience:
+            stop_reason = "early_stop"
+            break
+        if budget.deadline is not None and time.monotonic() >= budget.deadline:
+            stop_reason = "time_budget"
+            break
+        if cancellation_requested():
+            stop_reason = "cancelled"
+            break
+    if best_state is not None:
+        model.load_state_dict(best_state)
     model.eval()
-    for _ in range(steps):
-        window = np.array(history[-lookback:], dtype=np.float32)
-        window_tensor = torch.tensor(window, device=device).unsqueeze(0)
-        with torch.no_grad():
-            pred = model(window_tensor).cpu().numpy().flatten()[0]
-        history.append(pred)
-        predictions.append(float(pred))
-
-    return predictions, f"Torch MLP ({device.type})"
+    return epoch, max(1, best_epoch), stop_reason
+
+
+def _train_mlp(
+    build_model: Callable[[], object],
+    x: np.ndarray,
+    y: np.ndarray,
+    budget: TrainingBudget,
+    mask: Optional[np.ndarray] = None,
+) -> Tuple[object, int, str]:
+    model = build_model()
+    device = next(model.parameters()).device
+
+    def tensor(array, rows=slice(None)):
+        return None if array is None else torch.tensor(array[rows], device=device)
+
+    holdout = int(len(x) * budget.validation_fraction)
+    if holdout >= budget.min_validation_windows and len(x) - holdout >= budget.min_validation_windows:
+        train_rows = slice(None, -holdout)
+        val_rows = slice(-holdout, None)
+        searched, best_epoch, stop_reason = _fit_epochs(
+            model,
+            tensor(x, train_rows),
+            tensor(y, train_rows),
+            budget_share(budget, 2),
+            tensor(x, val_rows),
+            tensor(y, val_rows),
+            tensor(mask, train_rows),
+            tensor(mask, val_rows),
+        )
+        if stop_reason == "cancelled":
+            return model, searched, stop_reason
+        model = build_model()
+        refit_budget = replace(budget, max_epochs=best_epoch, patience=0)
+        refit, _, refit_reason = _fit_epochs(model, tensor(x), tensor(y), refit_budget, mask=tensor(mask))
+        if refit_reason != "max_epochs":
+            stop_reason = refit_reason
+        return model, searched + refit, stop_reason
+    epochs, _, stop_reason = _fit_epochs(model, tensor(x), tensor(y), budget, mask=tensor(mask))
+    return model, epochs, stop_reason
+
+
+def _load_weights(model, artifact: MLPArtifact) -> None:
+    device = next(model.parameters()).device
+    with torch.no_grad():
+        model[0].weight.copy_(torch.from_numpy(artifact.w1).to(device))
+        model[0].bias.copy_(torch.from_numpy(artifact.b1).to(device))
+        model[2].weight.copy_(torch.from_numpy(artifact.w2).to(device))
+        model[2].bias.copy_(torch.from_numpy(artifact.b2).to(device))
+
+
+def _masked_residual_mse(
+    artifact: MLPArtifact,
+    x: np.ndarray,
+    y: np.ndarray,
+    mask: Optional[np.ndarray] = None,
+) -> float:
+    squared = (artifact.predict(x) - y) ** 2
+    if mask is None:
+        return float(np.mean(squared))
+    return float(np.sum(squared * mask) / max(float(mask.sum()), 1.0))
+
+
+def _fit_with_store(
+    build_model: Callable[[], object],
+    prepare: Callable[
+        [Optional[MLPArtifact]],
+        Tuple[np.ndarray, np.ndarray, Optional[np.ndarray], Dict[str, object]],
+    ],
+    data: np.ndarray,
+    lookback: int,
+    config: Dict[str, object],
+    budget: TrainingBudget,
+    model_key: Optional[str] = None,
+    watermark: Optional[str] = None,
+) -> Tuple[object, MLPArtifact, int, str]:
+    digest = config_digest(config)
+    use_store = model_key is not None and warm_start_enabled()
+    checkpoint = load_checkpoint(model_key) if use_store else None
+    plan = plan_update(checkpoint, digest, data)
+    if plan == "reuse":
+        return None, checkpoint, 0, "reused"
+
+    model = None
+    if plan == "finetune":
+        x, y, mask, metadata = prepare(checkpoint)
+        new_start = max(0, int(checkpoint.metadata["n_obs"]) - lookback)
+        new_mask = None if mask is None else mask[new_start:]
+        new_mse = _masked_residual_mse(checkpoint, x[new_start:], y[new_start:], new_mask)
+        if new_mse <= drift_factor() * max(float(checkpoint.metadata["train_mse"]), 1e-8):
+            model = build_model()
+            _load_weights(model, checkpoint)
+            device = next(model.parameters()).device
+            epochs, _, fit_reason = _fit_epochs(
+                model,
+                torch.tensor(x[new_start:], device=device),
+                torch.tensor(y[new_start:], device=device),
+                replace(budget, max_epochs=finetune_epochs(), min_epochs=1),
+                mask=None if new_mask is None else torch.tensor(new_mask, device=device),
+            )
+            stop_reason = f"warm_start_{fit_reason}"
+    if model is None:
+        x, y, mask, metadata = prepare(None)
+        model, epochs, fit_reason = _train_mlp(build_model, x, y, budget, mask)
+        stop_reason = fit_reason
+
+    artifact = from_torch(model, **metadata, epochs=epochs, stop_reason=stop_reason)
+    residuals = y - artifact.predict(x)
+    if mask is not None:
+        residuals = np.where(mask > 0, residuals, np.nan).astype(np.float32)
+    artifact.residuals = residuals[:, 0] if residuals.shape[1] == 1 else residuals
+    train_mse = _masked_residual_mse(artifact, x, y, mask)
+    artifact.metadata.update(watermark_metadata(data, watermark, digest, train_mse))
+    if use_store and fit_reason in COMPLETE_STOP_REASONS:
+        save_checkpoint(model_key, artifact)
+    return model, artifact, epochs, stop_reason
+
+
+def _fit_torch(
+    values: np.ndarray,
+    budget: Optional[TrainingBudget] = None,
+    model_key: Optional[str] = None,
+    watermark: Optional[str] = None,
+) -> Optional[FittedMLP]:
+    if torch is None:
+        raise RuntimeError("Torch is not available.")
+    device = _select_device()
+    lookback = min(6, max(2, len(values) - 1))
+    x, y = _window_data(values, lookback)
+    if len(x) == 0:
+        return None
+
+    def build_model():
+        return _build_mlp(lookback, 16, 1, device)
+
+    def prepare(_checkpoint):
+        return x, y[:, np.newaxis], None, {"kind": "series", "lookback": lookback, "device": device.type}
+
+    model, artifact, epochs, stop_reason = _fit_with_store(
+        build_model,
+        prepare,
+        values,
+        lookback,
+        {"kind": "series", "lookback": lookback, "hidden": 16},
+        budget or training_budget(),
+        model_key,
+        watermark,
+    )
+    return FittedMLP(model=model, artifact=artifact, lookback=lookback, epochs=epochs, stop_reason=stop_reason)
+
+
+def _training_note(label: str, fitted: FittedMLP) -> str:
+    return f"{label} - {fitted.epochs} epochs, {fitted.stop_reason.replace('_', ' ')}"
+
+
+def _note_label(note: str) -> str:
+    return note.split(" - ", 1)[0]
+
+
+def _predict_mlp(fitted: FittedMLP, values: np.ndarray, steps: int) -> List[float]:
+    return forecast_recursive(fitted.artifact, values, steps)
+
+
+def _simulate_artifact(
+    artifact: MLPArtifact,
+    values: np.ndarray,
+    steps: int,
+    rng: np.random.Generator,
+) -> Optional[np.ndarray]:
+    residuals = artifact.residuals
+    if len(residuals) < MIN_BOOTSTRAP_RESIDUALS:
+        return None
+    lookback = int(artifact.metadata["lookback"])
+    paths = _bootstrap_paths()
+    draws = rng.choice(residuals, size=(paths, steps)).astype(np.float32)
+    windows = np.tile(values[-lookback:].astype(np.float32), (paths, 1))
+    simulated = np.empty((paths, steps), dtype=np.float32)
+    for step in range(steps):
+        simulated[:, step] = artifact.predict(windows)[:, 0] + draws[:, step]
+        windows = np.concatenate([windows[:, 1:], simulated[:, step:step + 1]], axis=1)
+    return simulated
+
+
+def _simulate_mlp(
+    fitted: FittedMLP,
+    values: np.ndarray,
+    steps: int,
+    rng: np.random.Generator,
+) -> Optional[np.ndarray]:
+    return _simulate_artifact(fitted.artifact, values, steps, rng)
+
+
+def _forecast_with_torch(
+    values: np.ndarray,
+    steps: int,
+    budget: Optional[TrainingBudget] = None,
+    model_key: Optional[str] = None,
+    watermark: Optional[str] = None,
+) -> Tuple[List[float], str, Optional[np.ndarray]]:
+    fitted = _fit_torch(values, budget, model_key, watermark)
+    if fitted is None:
+        return [], "Insufficient data for forecasting", None
+    rng = np.random.default_rng(BOOTSTRAP_SEED)
+    paths = _simulate_mlp(fitted, values, steps, rng)
+    note = _training_note(f"Torch MLP ({fitted.artifact.metadata['device']})", fitted)
+    return _predict_mlp(fitted, values, steps), note, paths
+
+
+def _forecast_with_artifact(
+    artifact: MLPArtifact,
+    values: np.ndarray,
+    steps: int,
+) -> Tuple[List[float], str, Optional[np.ndarray]]:
+    lookback = int(artifact.metadata["lookback"])
+    if len(values) < lookback:
+        return _forecast_with_linear(values, steps)
+    rng = np.random.default_rng(BOOTSTRAP_SEED)
+    paths = _simulate_artifact(artifact, values, steps, rng)
+    return forecast_recursive(artifact, values, steps), "Prebuilt MLP (numpy)", paths
+
+
+def _inference_mode() -> str:
+    return os.getenv("FORECAST_INFERENCE", "train")
+
+
+def _fit_linear(values: np.ndarray) -> np.ndarray:
+    x = np.arange(len(values))
+    return np.polyfit(x, values, 1)
 
 
-def _forecast_with_linear(values: np.ndarray, steps: int) -> Tuple[List[float], str]:
-    x = np.arange(len(values))
-    coeffs = np.polyfit(x, values, 1)
+def _predict_linear(coeffs: np.ndarray, values: np.ndarray, steps: int) -> List[float]:
     predictions = []
     for i in range(1, steps + 1):
         predictions.append(float(coeffs[0] * (len(values) + i) + coeffs[1]))
-    return predictions, "Numpy linear fallback"
-
-
-def _forecast_series(values: np.ndarray, steps: int) -> Tuple[List[float], str]:
+    return predictions
+
+
+def _simulate_linear(
+    coeffs: np.ndarray,
+    values: np.ndarray,
+    steps: int,
+    rng: np.random.Generator,
+) -> Optional[np.ndarray]:
+    residuals = values - np.polyval(coeffs, np.arange(len(values)))
+    if len(residuals) < MIN_BOOTSTRAP_RESIDUALS:
+        return None
+    point = np.asarray(_predict_linear(coeffs, values, steps), dtype=np.float32)
+    draws = rng.choice(residuals.astype(np.float32), size=(_bootstrap_paths(), steps))
+    return point[np.newaxis, :] + draws
+
+
+def _forecast_with_linear(values: np.ndarray, steps: int) -> Tuple[List[float], str, Optional[np.ndarray]]:
+    coeffs = _fit_linear(values)
+    rng = np.random.default_rng(BOOTSTRAP_SEED)
+    paths = _simulate_linear(coeffs, values, steps, rng)
+    return _predict_linear(coeffs, values, steps), "Numpy linear fallback", paths
+
+
+def _forecast_series(
+    values: np.ndarray,
+    steps: int,
+    budget: Optional[TrainingBudget] = None,
+    model_key: Optional[str] = None,
+    watermark: Optional[str] = None,
+) -> Tuple[List[float], str, Optional[np.ndarray]]:
+    if _inference_mode() == "prebuilt":
+        artifact = find_artifact(model_key) if model_key else None
+        if artifact is not None:
+            return _forecast_with_artifact(artifact, values, steps)
+        return _forecast_with_linear(values, steps)
     require_cuda = os.getenv("FORECAST_REQUIRE_CUDA") == "1"
     if torch is not None:
         try:
-            return _forecast_with_torch(values, steps)
+            return _forecast_with_torch(values, steps, budget, model_key, watermark)
         except Exception:
             if require_cuda:
                 raise
@@ -368,123 +800,249 @@ def _forecast_series(values: np.ndarray, steps: int) -> Tuple[List[float], str]:
     return _forecast_with_linear(values, steps)
 
 
-def _standardize(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
-    mean = values.mean(axis=0)
-    std = values.std(axis=0)
-    std = np.where(std < 1e-6, 1.0, std)
-    return (values - mean) / std, mean, std
-
+def _fit_multifactor(
+    panel: MixedPanel,
+    budget: Optional[TrainingBudget] = None,
+    model_key: Optional[str] = None,
+    watermark: Optional[str] = None,
+) -> Optional[FittedMLP]:
+    device = _select_device()
+    feature_cols = list(panel.feature_cols)
+    if len(panel.values) < 4 or len(feature_cols) < 3:
+        return None
+    observed = panel.mask
+
+    def build_model():
+        return _build_mlp(2 * len(feature_cols), 32, len(feature_cols), device)
+
+    def prepare(checkpoint):
+        if checkpoint is None:
+            mean = np.nanmean(panel.values, axis=0)
+            std = np.nanstd(panel.values, axis=0)
+            std = np.where(std < 1e-6, 1.0, std)
+        else:
+            mean = np.asarray(checkpoint.metadata["mean"], dtype=np.float32)
+            std = np.asarray(checkpoint.metadata["std"], dtype=np.float32)
+        x_inputs = panel.inputs(mean, std)[:-1]
+        y_scaled = np.nan_to_num((panel.values[1:] - mean) / std)
+        metadata = {
+            "kind": "multifactor",
+            "feature_cols": feature_cols,
+            "frequencies": list(panel.frequencies),
+            "step_months": panel.step_months,
+            "inputs": "masked",
+            "mean": mean.tolist(),
+            "std": std.tolist(),
+            "device": device.type,
+        }
+        return (
+            x_inputs,
+            y_scaled.astype(np.float32),
+            observed[1:].astype(np.float32),
+            metadata,
+        )
+
+    model, artifact, epochs, stop_reason = _fit_with_store(
+        build_model,
+        prepare,
+        panel.values,
+        1,
+        {
+            "kind": "multifactor",
+            "feature_cols": feature_cols,
+            "frequencies": list(panel.frequencies),
+            "step_months": panel.step_months,
+            "hidden": 32,
+            "inputs": "masked",
+            "loss": "masked",
+        },
+        budget or training_budget(),
+        model_key,
+        watermark,
+    )
+    return FittedMLP(model=model, artifact=artifact, lookback=1, epochs=epochs, stop_reason=stop_reason)
+
+
+def _residual_draws(residuals: np.ndarray, rng: np.random.Generator, size: Tuple[int, int]) -> np.ndarray:
+    draws = residuals[rng.integers(0, len(residuals), size=size)]
+    missing = np.isnan(draws)
+    if not missing.any():
+        return draws
+    for col in range(residuals.shape[1]):
+        observed = residuals[~np.isnan(residuals[:, col]), col]
+        fill = rng.choice(observed, size=int(missing[..., col].sum())) if len(observed) else 0.0
+        draws[..., col][missing[..., col]] = fill
+    return draws
+
+
+def _multifactor_forecast(
+    artifact: MLPArtifact,
+    panel: MixedPanel,
+    steps: int,
+) -> Tuple[Dict[str, List[float]], Dict[str, np.ndarray]]:
+    feature_cols = list(artifact.metadata["feature_cols"])
+    mean = np.asarray(artifact.metadata["mean"], dtype=np.float32)
+    std = np.asarray(artifact.metadata["std"], dtype=np.float32)
+    start = panel.inputs(mean, std)[-1]
+    held = np.nan_to_num((panel.latest() - mean) / std).astype(np.float32)
+    offsets = panel.ages()[np.newaxis, :] + np.arange(1, steps + 1)[:, np.newaxis]
+    due = offsets % panel.periods()[np.newaxis, :] == 0
+    width = len(feature_cols)
+
+    current, level = start, held
+    forecasts: Dict[str, List[float]] = {col: [] for col in feature_cols}
+    for step in range(steps):
+        predicted = artifact.predict(current)
+        level = np.where(due[step], predicted, level).astype(np.float32)
+        current = np.concatenate([np.where(due[step], predicted, 0.0), due[step]]).astype(np.float32)
+        for idx, col in enumerate(feature_cols):
+            forecasts[col].append(float(level[idx] * std[idx] + mean[idx]))
+
+    paths: Dict[str, np.ndarray] = {}
+    residuals = artifact.residuals
+    if len(residuals) >= MIN_BOOTSTRAP_RESIDUALS:
+        rng = np.random.default_rng(BOOTSTRAP_SEED)
+        n_paths = _bootstrap_paths()
+        draws = _residual_draws(residuals, rng, (n_paths, steps))
+        state = np.tile(start, (n_paths, 1))
+        levels = np.tile(held, (n_paths, 1))
+        simulated = np.empty((n_paths, steps, width), dtype=np.float32)
+        for step in range(steps):
+            predicted = artifact.predict(state) + draws[:, step]
+            levels = np.where(due[step], predicted, levels).astype(np.float32)
+            state = np.concatenate(
+                [np.where(due[step], predicted, 0.0), np.tile(due[step], (n_paths, 1))], axis=1
+            ).astype(np.float32)
+            simulated[:, step] = levels * std + mean
+        paths = {col: simulated[:, :, idx] for idx, col in enumerate(feature_cols)}
+    return forecasts, paths
+
+
+def _forecast_multifactor(
+    panel: MixedPanel,
+    steps: int,
+    budget: Optional[TrainingBudget] = None,
+    model_key: Optional[str] = None,
+    watermark: Optional[str] = None,
+) -> Tuple[Dict[str, List[float]], str, Dict[str, np.ndarray]]:
+    if _inference_mode() == "prebuilt":
+        artifact = find_artifact(model_key) if model_key else None
+        if (
+            artifact is None
+            or list(artifact.metadata["feature_cols"]) != list(panel.feature_cols)
+            or artifact.metadata.get("step_months") != panel.step_months
+            or artifact.metadata.get("inputs") != "masked"
+        ):
+            return {}, "No prebuilt multifactor model", {}
+        forecasts, paths = _multifactor_forecast(artifact, panel, steps)
+        return forecasts, "Prebuilt multifactor MLP (numpy)", paths
 
-def _forecast_multifactor(df: pd.DataFrame, steps: int) -> Tuple[Dict[str, List[float]], str]:
     require_cuda = os.getenv("FORECAST_REQUIRE_CUDA") == "1"
     if torch is None:
         if require_cuda:
             raise RuntimeError("CUDA required but torch is not installed.")
-        return {}, "Torch not available for multifactor model"
-
-    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    if require_cuda and device.type != "cuda":
-        raise RuntimeError("CUDA required but not available.")
-
-    feature_cols = [col for col in df.columns if col != "date"]
-    data = df[feature_cols].to_numpy(dtype=np.float32)
-    if len(data) < 4 or len(feature_cols) < 3:
-        return {}, "Insufficient data for multifactor model"
+        return {}, "Torch not available for multifactor model", {}
 
-    x_raw = data[:-1]
-    y_raw = data[1:]
-    x_scaled, mean, std = _standardize(x_raw)
-    y_scaled = (y_raw - mean) / std
+    fitted = _fit_multifactor(panel, budget, model_key, watermark)
+    if fitted is None:
+        return {}, "Insufficient data for multifactor model", {}
+    forecasts, paths = _multifactor_forecast(fitted.artifact, panel, steps)
+    label = f"Multifactor MLP ({fitted.artifact.metadata['device']})"
+    return forecasts, _training_note(label, fitted), paths
 
-    torch.manual_seed(42)
-    x_tensor = torch.tensor(x_scaled, device=device)
-    y_tensor = torch.tensor(y_scaled, device=device)
 
-    model = torch.nn.Sequential(
-        torch.nn.Linear(len(feature_cols), 32),
-        torch.nn.ReLU(),
-        torch.nn.Linear(32, len(feature_cols)),
-    ).to(device)
-    optimizer = torch.optim.Adam(model.parameters(), lr=0.01)
-    loss_fn = torch.nn.MSELoss()
-
-    for _ in range(250):
-        optimizer.zero_grad()
-        preds = model(x_tensor)
-        loss = loss_fn(preds, y_tensor)
-        loss.backward()
-        optimizer.step()
-
-    current = data[-1].astype(np.float32)
-    forecasts: Dict[str, List[float]] = {col: [] for col in feature_cols}
-    model.eval()
-    for _ in range(steps):
-        current_scaled = (current - mean) / std
-        input_tensor = torch.tensor(current_scaled, device=device).unsqueeze(0)
-        with torch.no_grad():
-            next_scaled = model(input_tensor).cpu().numpy().flatten()
-        next_values = next_scaled * std + mean
-        for idx, col in enumerate(feature_cols):
-            forecasts[col].append(float(next_values[idx]))
-        current = next_values.astype(np.float32)
-
-    return forecasts, f"Multifactor MLP ({device.type})"
-
-
-def _select_acs_geography(df: pd.DataFrame, geography: Geography) -> pd.DataFrame:
+def _select_acs_geography(
+    df: pd.DataFrame,
+    geography: Geography,
+    processed_dir: Optional[Path] = None,
+) -> pd.DataFrame:
     if df.empty:
         return df
+    df = df.assign(county_fips=df["county_fips"].astype(str).str.zfill(5))
     if geography.level == "county":
         if geography.value.isdigit():
-            match = df[df["county_fips"] == geography.value]
+            match = df[df["county_fips"] == geography.value.zfill(5)]
             if not match.empty:
                 return match
         match = df[df["county_name"].str.contains(geography.value, case=False, na=False)]
         if not match.empty:
             return match
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
-    if "year" in numeric_cols:
-        numeric_cols = numeric_cols.drop("year")
-    grouped = df.groupby("year")[numeric_cols].mean().reset_index()
-    grouped["county_name"] = "Florida (avg)"
+    grouped = load_derived("state_averages.csv", processed_dir)
+    if grouped.empty:
+        numeric_cols = df.select_dtypes(include=[np.number]).columns
+        if "year" in numeric_cols:
+            numeric_cols = numeric_cols.drop("year")
+        grouped = df.groupby("year")[numeric_cols].mean().reset_index()
+    grouped["county_name"] = f"{state_name()} (avg)"
     grouped["county_fips"] = "state"
     return grouped
 
 
-def _load_metric_series(spec: MetricSpec, geography: Geography) -> Tuple[pd.DataFrame, List[str]]:
+def _load_bls_county(geography: Geography, processed_dir: Path) -> pd.DataFrame:
+    if geography.level != "county":
+        return pd.DataFrame()
+    fips = resolve_county_fips(geography.value)
+    path = processed_dir / "bls_unemployment" / "county" / f"{fips}.csv"
+    if fips is None or not path.exists():
+        return pd.DataFrame()
+    df = read_typed(path, "bls_unemployment")
+    return df[df["measure"] == "unemployment_rate"]
+
+
+def _load_metric_series(
+    spec: MetricSpec,
+    geography: Geography,
+    processed_dir: Optional[Path] = None,
+) -> Tuple[pd.DataFrame, List[str]]:
+    processed_dir = processed_dir or current_processed_dir()
+    series_id = spec.series_id.format(state=current_state()) if spec.series_id else None
     if spec.dataset_id == "bls_unemployment":
-        df = _load_processed("bls_unemployment", "unemployment.csv")
-        if spec.series_id:
-            df = df[df["series_id"] == spec.series_id]
+        county = _load_bls_county(geography, processed_dir)
+        if not county.empty:
+            return county, ["bls_unemployment"]
+        df = _load_processed("bls_unemployment", "unemployment.csv", processed_dir)
+        if series_id and not df.empty:
+            df = df[df["series_id"] == series_id]
         elif "series_id" in df.columns and not df.empty:
             df = df[df["series_id"] == df["series_id"].iloc[0]]
         return df, ["bls_unemployment"]
 
     if spec.dataset_id == "fred_macro":
-        df = _load_processed("fred_macro", "fred_macro.csv")
-        if spec.series_id:
-            df = df[df["series_id"] == spec.series_id]
+        series_file = processed_dir / "fred_macro" / "series" / f"{series_id}.csv"
+        if series_id and series_file.exists():
+            return read_typed(series_file, "fred_macro").assign(series_id=series_id), ["fred_macro"]
+        df = _load_processed("fred_macro", "fred_macro.csv", processed_dir)
+        if series_id and not df.empty:
+            df = df[df["series_id"] == series_id]
         return df, ["fred_macro"]
 
     if spec.dataset_id == "census_acs_fl_county":
-        df = _load_processed("census_acs_fl_county", "acs_county.csv")
+        df = _load_processed("census_acs_fl_county", "acs_county.csv", processed_dir)
         if "year" not in df.columns:
             return pd.DataFrame(), ["census_acs_fl_county"]
-        df = _select_acs_geography(df, geography)
+        df = _select_acs_geography(df, geography, processed_dir)
         return df, ["census_acs_fl_county"]
 
-    generic_by_metric = DATA_DIR / "processed" / spec.dataset_id / f"{spec.metric_id}.csv"
+    generic_by_metric = processed_dir / spec.dataset_id / f"{spec.metric_id}.csv"
     if generic_by_metric.exists():
-        return pd.read_csv(generic_by_metric), [spec.dataset_id]
-    generic = DATA_DIR / "processed" / spec.dataset_id / "metrics.csv"
+        return read_typed(generic_by_metric, spec.dataset_id), [spec.dataset_id]
+    generic = processed_dir / spec.dataset_id / "metrics.csv"
     if generic.exists():
-        return pd.read_csv(generic), [spec.dataset_id]
+        return read_typed(generic, spec.dataset_id), [spec.dataset_id]
 
     return pd.DataFrame(), []
 
 
-def _build_feature_table(request: AdviceRequest) -> Tuple[pd.DataFrame, Dict[str, MetricSpec], Dict[str, List[str]]]:
-    frames: List[pd.DataFrame] = []
+def _metric_frame(df: pd.DataFrame, spec: MetricSpec) -> pd.DataFrame:
+    dates = _parse_dates(df[spec.date_col])
+    values = widen(df[spec.value_col])
+    series = pd.DataFrame({"date": dates, "value": values}).dropna()
+    return series.sort_values("date")
+
+
+def _build_feature_panel(request: AdviceRequest) -> Tuple[MixedPanel, Dict[str, MetricSpec], Dict[str, List[str]]]:
+    native: Dict[str, pd.DataFrame] = {}
+    frequencies: Dict[str, int] = {}
     specs: Dict[str, MetricSpec] = {}
     citations: Dict[str, List[str]] = {}
 
@@ -492,39 +1050,61 @@ def _build_feature_table(request: AdviceRequest) -> Tuple[pd.DataFrame, Dict[str
         df, metric_citations = _load_metric_series(spec, request.geography)
         if df.empty or spec.value_col not in df.columns:
             continue
-        monthly = _to_monthly_series(df, spec.date_col, spec.value_col)
-        if monthly.empty or len(monthly) < 3:
+        series = _native_series(df, spec.date_col, spec.value_col)
+        if len(series) < 3:
             continue
-        series = monthly.rename(columns={"value": spec.metric_id})
-        frames.append(series)
+        native[spec.metric_id] = series
+        frequencies[spec.metric_id] = _infer_frequency_months(series["date"])
         specs[spec.metric_id] = spec
         citations[spec.metric_id] = metric_citations
 
-    if not frames:
-        return pd.DataFrame(), {}, {}
-
-    combined = frames[0]
-    for frame in frames[1:]:
-        combined = combined.merge(frame, on="date", how="outer")
-
-    combined = combined.sort_values("date").set_index("date")
-    valid_cols = [
-        col for col in combined.columns
-        if combined[col].notna().sum() >= 3
-    ]
-    combined = combined[valid_cols].ffill()
-    combined = combined.dropna(axis=0, how="any")
-    combined = combined.reset_index()
-    specs = {metric_id: spec for metric_id, spec in specs.items() if metric_id in valid_cols}
-    citations = {metric_id: cites for metric_id, cites in citations.items() if metric_id in valid_cols}
-    return combined, specs, citations
-
-
-def _classify_direction(predicted: Optional[float], baseline: Optional[float], preference: str) -> str:
+    if not native:
+        empty = MixedPanel(pd.DatetimeIndex([]), np.empty((0, 0), dtype=np.float32), (), (), 1)
+        return empty, {}, {}
+
+    step_months = min(frequencies.values())
+    first = min(series["date"].iloc[0] for series in native.values())
+    origin = first.year * 12 + first.month - 1
+    positions = {
+        metric_id: ((series["date"].dt.year * 12 + series["date"].dt.month - 1 - origin) // step_months).to_numpy()
+        for metric_id, series in native.items()
+    }
+    rows = max(int(pos.max()) for pos in positions.values()) + 1
+    feature_cols = tuple(native)
+    values = np.full((rows, len(feature_cols)), np.nan, dtype=np.float32)
+    for col, metric_id in enumerate(feature_cols):
+        binned = pd.Series(native[metric_id]["value"].to_numpy()).groupby(positions[metric_id]).mean()
+        values[binned.index.to_numpy(), col] = binned.to_numpy(dtype=np.float32)
+
+    panel = MixedPanel(
+        dates=pd.date_range(pd.Timestamp(first.year, first.month, 1), periods=rows, freq=f"{step_months}MS"),
+        values=values,
+        feature_cols=feature_cols,
+        frequencies=tuple(frequencies[metric_id] for metric_id in feature_cols),
+        step_months=step_months,
+    )
+    return panel, specs, citations
+
+
+def _classify_direction(
+    predicted: Optional[float],
+    baseline: Optional[float],
+    preference: str,
+    interval: Optional[Tuple[Optional[float], Optional[float]]] = None,
+) -> str:
     if predicted is None or baseline is None:
         return "unclear"
     delta = predicted - baseline
-    if abs(delta) <= (abs(baseline) * 0.02 + 1e-6):
+    use_interval = (
+        interval is not None
+        and None not in interval
+        and os.getenv("FORECAST_DIRECTION_MODE", "interval") == "interval"
+    )
+    if use_interval:
+        lower, upper = interval
+        if lower <= baseline <= upper:
+            return "stable"
+    elif abs(delta) <= (abs(baseline) * 0.02 + 1e-6):
         return "stable"
     if preference == "higher_is_better":
         return "improving" if delta > 0 else "worsening"
@@ -569,49 +1149,139 @@ def _compute_urgency(items: List[ForecastItem]) -> float:
     return min(1.0, float(np.mean(scores)))
 
 
-def generate_outlook(request: AdviceRequest) -> Tuple[List[ForecastItem], str, float, str]:
+def _hierarchical_forecast(
+    spec: MetricSpec,
+    geography: Geography,
+    series: pd.DataFrame,
+    horizon_months: int,
+) -> Optional[Tuple[float, str, None, Dict[str, Optional[float]]]]:
+    if os.getenv("FORECAST_USE_HIERARCHY") != "1" or spec.dataset_id != "census_acs_fl_county":
+        return None
+    from app.services.hierarchy import lookup_county_forecast
+
+    step = max(1, int(round(horizon_months / 12)))
+    row = lookup_county_forecast(spec.metric_id, geography, step)
+    if row is None or row["metadata"]["watermark_year"] != int(series["date"].iloc[-1].year):
+        return None
+    bounds = {
+        f"{side}_{level}": float(row[f"{side}_{level}"]) if pd.notna(row.get(f"{side}_{level}")) else None
+        for level in INTERVAL_LEVELS
+        for side in ("lower", "upper")
+    }
+    return float(row["forecast"]), f"Hierarchical {row['metadata']['method']}", None, bounds
+
+
+def _geography_key(geography: Geography) -> str:
+    key = "state" if geography.level == "state" else f"county_{geography.value}"
+    state = request_state(geography)
+    return key if state == DEFAULT_STATE else f"{state}_{key}"
+
+
+def export_models(
+    geographies: Iterable[Geography],
+    model_dir: Optional[Path] = None,
+    processed_dir: Optional[Path] = None,
+) -> List[Path]:
+    if torch is None:
+        raise RuntimeError("Torch is required to export models.")
+    written: List[Path] = []
+    for geography in geographies:
+        geo_key = _geography_key(geography)
+        request = AdviceRequest(
+            issue_area="all",
+            geography=geography,
+            time_horizon="near_term",
+            budget_sensitivity=0.5,
+            policy_lens="market",
+        )
+        panel, specs, _ = _build_feature_panel(request)
+        if not panel.empty and len(specs) >= 3:
+            fitted = _fit_multifactor(panel)
+            if fitted is not None:
+                path = artifact_path(artifact_key("multifactor", geo_key), model_dir)
+                written.append(save_artifact(fitted.artifact, path))
+        for spec in METRICS:
+            df, _ = _load_metric_series(spec, geography, processed_dir)
+            if df.empty or spec.value_col not in df.columns:
+                continue
+            series = _metric_frame(df, spec)
+            if len(series) < 3:
+                continue
+            fitted = _fit_torch(series["value"].to_numpy(dtype=np.float32))
+            if fitted is None:
+                continue
+            path = artifact_path(artifact_key(spec.metric_id, geo_key), model_dir)
+            written.append(save_artifact(fitted.artifact, path))
+    return written
+
+
+def iter_outlook(request: AdviceRequest, model_notes: List[str]) -> Iterator[ForecastItem]:
     horizon_months = HORIZON_MONTHS.get(request.time_horizon, 12)
-    items: List[ForecastItem] = []
-    model_notes: List[str] = []
     included_metrics: set[str] = set()
 
-    feature_table, specs, citations_map = _build_feature_table(request)
+    budget = training_budget()
+    panel, specs, citations_map = _build_feature_panel(request)
     multifactor_predictions: Dict[str, List[float]] = {}
+    multifactor_paths: Dict[str, np.ndarray] = {}
     multifactor_note = ""
-    if not feature_table.empty and len(feature_table) >= 4 and len(specs) >= 3:
-        multifactor_predictions, multifactor_note = _forecast_multifactor(feature_table, horizon_months)
+    if not panel.empty and len(panel.values) >= 4 and len(specs) >= 3:
+        multifactor_predictions, multifactor_note, multifactor_paths = _forecast_multifactor(
+            panel,
+            max(1, int(round(horizon_months / panel.step_months))),
+            budget_share(budget, len(METRICS) + 1),
+            artifact_key("multifactor", _geography_key(request.geography)),
+            str(panel.dates[-1].date()),
+        )
         if multifactor_predictions:
-            model_notes.append(multifactor_note)
+            model_notes.append(_note_label(multifactor_note))
 
-    for spec in METRICS:
+    for index, spec in enumerate(METRICS):
         df, citations = _load_metric_series(spec, request.geography)
         if df.empty or spec.value_col not in df.columns:
             continue
-        dates = _parse_dates(df[spec.date_col])
-        values = pd.to_numeric(df[spec.value_col], errors="coerce")
-        series = pd.DataFrame({"date": dates, "value": values}).dropna()
-        series = series.sort_values("date")
+        series = _metric_frame(df, spec)
         if len(series) < 3:
             continue
         baseline_value = float(series["value"].iloc[-1])
+        hierarchical_bounds: Dict[str, Optional[float]] = {}
         if spec.metric_id in multifactor_predictions:
             predictions = multifactor_predictions[spec.metric_id]
             predicted_value = predictions[-1]
+            paths = multifactor_paths.get(spec.metric_id)
             model_note = multifactor_note
             metric_citations = citations_map.get(spec.metric_id, citations)
+        elif (hierarchical := _hierarchical_forecast(spec, request.geography, series, horizon_months)) is not None:
+            predicted_value, model_note, paths, hierarchical_bounds = hierarchical
+            metric_citations = citations
+            if _note_label(model_note) not in model_notes:
+                model_notes.append(_note_label(model_note))
         else:
             freq_months = _infer_frequency_months(series["date"])
             steps = max(1, int(round(horizon_months / freq_months)))
-            predictions, model_note = _forecast_series(series["value"].to_numpy(dtype=np.float32), steps)
+            predictions, model_note, paths = _forecast_series(
+                series["value"].to_numpy(dtype=np.float32),
+                steps,
+                budget_share(budget, len(METRICS) - index),
+                artifact_key(spec.metric_id, _geography_key(request.geography)),
+                str(series["date"].iloc[-1].date()),
+            )
             if not predictions:
                 continue
             predicted_value = predictions[-1]
             metric_citations = citations
-            if model_note not in model_notes:
-                model_notes.append(model_note)
-
-        direction = _classify_direction(predicted_value, baseline_value, spec.preference)
-        items.append(ForecastItem(
+            if _note_label(model_note) not in model_notes:
+                model_notes.append(_note_label(model_note))
+
+        bounds = _interval_bounds(paths[:, -1] if paths is not None else None)
+        if hierarchical_bounds:
+            bounds.update(hierarchical_bounds)
+        direction = _classify_direction(
+            predicted_value,
+            baseline_value,
+            spec.preference,
+            (bounds["lower_80"], bounds["upper_80"]),
+        )
+        yield ForecastItem(
             metric_id=spec.metric_id,
             sector=spec.sector,
             metric=spec.metric,
@@ -623,14 +1293,15 @@ def generate_outlook(request: AdviceRequest) -> Tuple[List[ForecastItem], str, f
             citations=metric_citations,
             status="available",
             method_note=model_note,
-        ))
+            **bounds,
+        )
         included_metrics.add(spec.metric_id)
 
     if request.issue_area == "all":
         for spec in METRICS:
             if spec.metric_id in included_metrics:
                 continue
-            items.append(ForecastItem(
+            yield ForecastItem(
                 metric_id=spec.metric_id,
                 sector=spec.sector,
                 metric=spec.metric,
@@ -642,12 +1313,26 @@ def generate_outlook(request: AdviceRequest) -> Tuple[List[ForecastItem], str, f
                 citations=[],
                 status="missing",
                 method_note="No data available for this metric yet.",
-            ))
+            )
 
+
+def summarize_outlook(
+    request: AdviceRequest,
+    items: List[ForecastItem],
+    model_notes: List[str],
+) -> Tuple[str, float, str]:
     summary = _build_outlook_summary(items, request.issue_area)
     if request.issue_area == "all":
         urgency = _compute_urgency(items)
     else:
         urgency = _compute_urgency([item for item in items if item.sector == request.issue_area])
     forecast_info = " / ".join(model_notes) if model_notes else "No forecast model available"
+    return summary, urgency, forecast_info
+
+
+def generate_outlook(request: AdviceRequest) -> Tuple[List[ForecastItem], str, float, str]:
+    model_notes: List[str] = []
+    with state_scope(request_state(request.geography)):
+        items = list(iter_outlook(request, model_notes))
+        summary, urgency, forecast_info = summarize_outlook(request, items, model_notes)
     return items, summary, urgency, forecast_info
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.data.geography import active_states, current_state, state_name, state_partition, state_scope
+from app.data.schemas import widen
+from app.data.snapshots import Snapshot, current_snapshot_id, pinned_snapshot
+from app.models import Geography
+from app.services.forecast import (
+    BOOTSTRAP_SEED,
+    DATA_DIR,
+    HORIZON_MONTHS,
+    INTERVAL_LEVELS,
+    METRICS,
+    MIN_BOOTSTRAP_RESIDUALS,
+    MetricSpec,
+    TrainingBudget,
+    _bootstrap_paths,
+    _build_mlp,
+    _load_processed,
+    _select_device,
+    _train_mlp,
+    from_torch,
+    torch,
+    training_budget,
+)
+
+ACS_DATASET = "census_acs_fl_county"
+FORECAST_DIR = DATA_DIR / "forecasts" / "hierarchical"
+STATE_KEY = "state"
+MAX_STEPS = max(1, max(HORIZON_MONTHS.values()) // 12)
+
+
+def _county_panel(acs: pd.DataFrame, value_col: str) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    frame = acs[["county_fips", "county_name", "year", value_col]].copy()
+    frame["county_fips"] = frame["county_fips"].astype(str).str.zfill(5)
+    frame[value_col] = widen(frame[value_col])
+    panel = frame.pivot_table(index="county_fips", columns="year", values=value_col, aggfunc="mean")
+    panel = panel.dropna(axis=0, how="any").sort_index(axis=1)
+    names = frame.drop_duplicates("county_fips").set_index("county_fips")["county_name"].to_dict()
+    return panel, names
+
+
+def _scale_rows(panel: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    mean = panel.mean(axis=1, keepdims=True)
+    std = panel.std(axis=1, keepdims=True)
+    std = np.where(std < 1e-6, 1.0, std)
+    return (panel - mean) / std, mean, std
+
+
+def _fit_pooled_mlp(scaled: np.ndarray, budget: Optional[TrainingBudget]):
+    lookback = min(6, max(2, scaled.shape[1] - 1))
+    windows = sliding_window_view(scaled, lookback + 1, axis=1)
+    x = np.ascontiguousarray(windows[..., :-1].reshape(-1, lookback), dtype=np.float32)
+    y = np.ascontiguousarray(windows[..., -1].reshape(-1, 1), dtype=np.float32)
+    device = _select_device()
+    model, epochs, stop_reason = _train_mlp(
+        lambda: _build_mlp(lookback, 16, 1, device),
+        x,
+        y,
+        budget or training_budget(),
+    )
+    artifact = from_torch(model, kind="hierarchical", lookback=lookback, epochs=epochs, stop_reason=stop_reason)
+    artifact.residuals = (y - artifact.predict(x))[:, 0]
+    return artifact, f"Pooled MLP ({device.type}) - {epochs} epochs, {stop_reason.replace('_', ' ')}"
+
+
+def _recursive(predict, start: np.ndarray, steps: int, noise: Optional[np.ndarray] = None) -> np.ndarray:
+    windows = start.astype(np.float32)
+    outputs = np.empty(start.shape[:-1] + (steps,), dtype=np.float32)
+    flat_shape = (-1, windows.shape[-1])
+    for step in range(steps):
+        preds = predict(windows.reshape(flat_shape))[:, 0].reshape(windows.shape[:-1])
+        if noise is not None:
+            preds = preds + noise[..., step]
+        outputs[..., step] = preds
+        windows = np.concatenate([windows[..., 1:], preds[..., np.newaxis]], axis=-1)
+    return outputs
+
+
+def _forecast_scaled(
+    scaled: np.ndarray,
+    steps: int,
+    budget: Optional[TrainingBudget],
+) -> Tuple[np.ndarray, Optional[np.ndarray], str]:
+    rng = np.random.default_rng(BOOTSTRAP_SEED)
+    n_paths = _bootstrap_paths()
+    if torch is not None and scaled.shape[1] >= 3:
+        artifact, note = _fit_pooled_mlp(scaled, budget)
+        lookback = int(artifact.metadata["lookback"])
+        start = scaled[:, -lookback:]
+        point = _recursive(artifact.predict, start, steps)
+        residuals = artifact.residuals
+        paths = None
+        if len(residuals) >= MIN_BOOTSTRAP_RESIDUALS:
+            noise = rng.choice(residuals, size=(n_paths, scaled.shape[0], steps)).astype(np.float32)
+            tiled = np.broadcast_to(start, (n_paths,) + start.shape)
+            paths = _recursive(artifact.predict, tiled, steps, noise)
+        return point, paths, note
+
+    t = np.arange(scaled.shape[1])
+    coeffs = np.polyfit(t, scaled.T, 1)
+    future = np.arange(scaled.shape[1] + 1, scaled.shape[1] + steps + 1)
+    point = (coeffs[0][:, np.newaxis] * future + coeffs[1][:, np.newaxis]).astype(np.float32)
+    residuals = (scaled - (coeffs[0][:, np.newaxis] * t + coeffs[1][:, np.newaxis])).ravel()
+    paths = None
+    if len(residuals) >= MIN_BOOTSTRAP_RESIDUALS:
+        paths = point[np.newaxis] + rng.choice(residuals, size=(n_paths,) + point.shape).astype(np.float32)
+    return point, paths, "Batched linear fits (numpy)"
+
+
+def forecast_metric(
+    spec: MetricSpec,
+    acs: pd.DataFrame,
+    steps: int = MAX_STEPS,
+    budget: Optional[TrainingBudget] = None,
+) -> Tuple[pd.DataFrame, Dict[str, object]]:
+    panel, names = _county_panel(acs, spec.value_col)
+    if panel.empty or panel.shape[1] < 3:
+        return pd.DataFrame(), {}
+    values = panel.to_numpy(dtype=np.float32)
+    state_row = values.mean(axis=0, keepdims=True)
+    stacked = np.vstack([values, state_row])
+    scaled, mean, std = _scale_rows(stacked)
+    point_scaled, paths_scaled, note = _forecast_scaled(scaled, steps, budget)
+
+    point = point_scaled * std + mean
+    county_point = point[:-1]
+    state_point = point[-1]
+    ratio = state_point / np.where(np.abs(county_point.mean(axis=0)) < 1e-9, 1.0, county_point.mean(axis=0))
+    reconciled = np.vstack([county_point * ratio, state_point])
+
+    bounds: Dict[str, np.ndarray] = {}
+    if paths_scaled is not None:
+        paths = paths_scaled * std[np.newaxis] + mean[np.newaxis]
+        for level in INTERVAL_LEVELS:
+            tail = (100 - level) / 200
+            lower, upper = np.quantile(paths, [tail, 1 - tail], axis=0)
+            scale = np.vstack([np.broadcast_to(ratio, county_point.shape), np.ones((1, steps))])
+            bounds[f"lower_{level}"] = lower * scale
+            bounds[f"upper_{level}"] = upper * scale
+
+    keys = list(panel.index) + [STATE_KEY]
+    last_year = int(panel.columns[-1])
+    snapshot_id = current_snapshot_id()
+    rows = []
+    for row_idx, key in enumerate(keys):
+        for step in range(steps):
+            row = {
+                "metric_id": spec.metric_id,
+                "geography": key,
+                "county_name": names.get(key, f"{state_name()} (avg)"),
+                "year": last_year + step + 1,
+                "step": step + 1,
+                "base_forecast": float(point[row_idx, step]),
+                "forecast": float(reconciled[row_idx, step]),
+                "snapshot_id": snapshot_id,
+            }
+            for name, array in bounds.items():
+                row[name] = float(array[row_idx, step])
+            rows.append(row)
+    metadata = {
+        "metric_id": spec.metric_id,
+        "state": current_state(),
+        "watermark_year": last_year,
+        "counties": len(panel.index),
+        "steps": steps,
+        "method": note,
+        "reconciliation": "top-down proportional to state average",
+        "snapshot_id": snapshot_id,
+        "generated_at": datetime.utcnow().isoformat() + "Z",
+    }
+    return pd.DataFrame(rows), metadata
+
+
+def _replace(path: Path, write: Callable[[Path], object]) -> None:
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def build_hierarchical_forecasts(
+    processed_dir: Optional[Path] = None,
+    output_dir: Optional[Path] = None,
+    steps: int = MAX_STEPS,
+) -> List[Path]:
+    acs = _load_processed(ACS_DATASET, "acs_county.csv", processed_dir)
+    if acs.empty or "year" not in acs.columns:
+        return []
+    output_dir = output_dir or state_partition(FORECAST_DIR)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written: List[Path] = []
+    for spec in METRICS:
+        if spec.dataset_id != ACS_DATASET or spec.value_col not in acs.columns:
+            continue
+        frame, metadata = forecast_metric(spec, acs, steps)
+        if frame.empty:
+            continue
+        csv_path = output_dir / f"{spec.metric_id}.csv"
+        _replace(csv_path, lambda path: frame.to_csv(path, index=False))
+        _replace(output_dir / f"{spec.metric_id}.json", lambda path: path.write_text(json.dumps(metadata, indent=2)))
+        written.append(csv_path)
+    return written
+
+
+def rebuild_for_datasets(datasets: Iterable[str]) -> List[Path]:
+    if ACS_DATASET not in set(datasets):
+        return []
+    written: List[Path] = []
+    for state in active_states():
+        with state_scope(state):
+            written += build_hierarchical_forecasts()
+    return written
+
+
+def precompute_snapshot(snapshot: Snapshot, datasets: Iterable[str]) -> List[Path]:
+    with pinned_snapshot(snapshot):
+        return rebuild_for_datasets(datasets)
+
+
+def lookup_county_forecast(
+    metric_id: str,
+    geography: Geography,
+    step: int,
+    output_dir: Optional[Path] = None,
+) -> Optional[Dict[str, object]]:
+    output_dir = output_dir or state_partition(FORECAST_DIR)
+    csv_path = output_dir / f"{metric_id}.csv"
+    meta_path = output_dir / f"{metric_id}.json"
+    if not csv_path.exists() or not meta_path.exists():
+        return None
+    metadata = json.loads(meta_path.read_text())
+    if metadata.get("snapshot_id") != current_snapshot_id():
+        return None
+    frame = pd.read_csv(csv_path, dtype={"geography": str})
+    frame = frame[(frame["step"] == step) & (frame["snapshot_id"] == metadata["snapshot_id"])]
+    if geography.level == "county":
+        match = frame[frame["geography"] == geography.value]
+        if match.empty:
+            match = frame[frame["county_name"].str.contains(geography.value, case=False, na=False)]
+            match = match[match["geography"] != STATE_KEY]
+    else:
+        match = frame[frame["geography"] == STATE_KEY]
+    if match.empty:
+        return None
+    row = match.iloc[0].to_dict()
+    row["metadata"] = metadata
+    return row
+
+
+if __name__ == "__main__":
+    for path in rebuild_for_datasets([ACS_DATASET]):
+        print(path)
@@ -5,6 +5,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Tuple
 
+from app.data.geography import request_state, state_name
 from app.models import AdviceRequest, AdviceResponse
 
 ROOT_DIR = Path(__file__).resolve().parents[2]
@@ -21,7 +22,7 @@ def _format_budget(budget_sensitivity: float) -> str:
 
 def _format_geography(geography) -> str:
     if geography.level == "state":
-        return "State of Florida"
+        return f"State of {state_name(request_state(geography))}"
     return geography.value
 
 
@@ -98,9 +99,12 @@ def render_memo(request: AdviceRequest, advice: AdviceResponse) -> str:
                     f"No data available yet.{suffix}"
                 )
             else:
+                interval = ""
+                if item.lower_80 is not None and item.upper_80 is not None:
+                    interval = f", 80% interval {item.lower_80:.2f} to {item.upper_80:.2f}"
                 memo_lines.append(
                     f"- {item.metric} ({item.sector}, {item.horizon}): "
-                    f"{item.predicted_value:.2f}{unit} ({item.direction}). {citations}"
+                    f"{item.predicted_value:.2f}{unit} ({item.direction}{interval}). {citations}"
                 )
     if advice.forecast_info:
         memo_lines.append("")
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+MODEL_DIR = ROOT_DIR / "data" / "models"
+
+
+@dataclass
+class MLPArtifact:
+    w1: np.ndarray
+    b1: np.ndarray
+    w2: np.ndarray
+    b2: np.ndarray
+    residuals: np.ndarray
+    metadata: Dict[str, object] = field(default_factory=dict)
+
+    def predict(self, inputs: np.ndarray) -> np.ndarray:
+        batch = np.asarray(inputs, dtype=np.float32)
+        squeeze = batch.ndim == 1
+        if squeeze:
+            batch = batch[np.newaxis, :]
+        hidden = np.maximum(batch @ self.w1.T + self.b1, 0.0)
+        outputs = hidden @ self.w2.T + self.b2
+        return outputs[0] if squeeze else outputs
+
+
+def from_torch(model, residuals: Optional[np.ndarray] = None, **metadata) -> MLPArtifact:
+    first, _, second = list(model)
+    return MLPArtifact(
+        w1=first.weight.detach().cpu().numpy().astype(np.float32),
+        b1=first.bias.detach().cpu().numpy().astype(np.float32),
+        w2=second.weight.detach().cpu().numpy().astype(np.float32),
+        b2=second.bias.detach().cpu().numpy().astype(np.float32),
+        residuals=np.asarray(residuals if residuals is not None else [], dtype=np.float32),
+        metadata=metadata,
+    )
+
+
+def save_artifact(artifact: MLPArtifact, path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("wb") as handle:
+        np.savez_compressed(
+            handle,
+            w1=artifact.w1,
+            b1=artifact.b1,
+            w2=artifact.w2,
+            b2=artifact.b2,
+            residuals=artifact.residuals,
+            metadata=np.array(json.dumps(artifact.metadata)),
+        )
+    return path
+
+
+def load_artifact(path: Path) -> MLPArtifact:
+    with np.load(path, allow_pickle=False) as payload:
+        return MLPArtifact(
+            w1=payload["w1"],
+            b1=payload["b1"],
+            w2=payload["w2"],
+            b2=payload["b2"],
+            residuals=payload["residuals"],
+            metadata=json.loads(str(payload["metadata"])),
+        )
+
+
+def artifact_key(*parts: str) -> str:
+    return "__".join(re.sub(r"[^a-z0-9]+", "_", part.lower()).strip("_") for part in parts)
+
+
+def artifact_path(key: str, model_dir: Optional[Path] = None) -> Path:
+    return (model_dir or MODEL_DIR) / f"{key}.npz"
+
+
+def find_artifact(key: str, model_dir: Optional[Path] = None) -> Optional[MLPArtifact]:
+    path = artifact_path(key, model_dir)
+    if not path.exists():
+        return None
+    return load_artifact(path)
+
+
+def forecast_recursive(artifact: MLPArtifact, values: np.ndarray, steps: int) -> List[float]:
+    lookback = int(artifact.metadata["lookback"])
+    window = np.asarray(values[-lookback:], dtype=np.float32).copy()
+    predictions: List[float] = []
+    for _ in range(steps):
+        pred = artifact.predict(window)[0]
+        window = np.append(window[1:], pred)
+        predictions.append(float(pred))
+    return predictions
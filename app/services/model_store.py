@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.services.mlp_artifacts import MODEL_DIR, MLPArtifact, load_artifact, save_artifact
+
+WARM_DIR = MODEL_DIR / "warm"
+MODEL_VERSION = 1
+
+
+def warm_start_enabled() -> bool:
+    return os.getenv("FORECAST_WARM_START") == "1"
+
+
+def finetune_epochs() -> int:
+    return max(1, int(os.getenv("FORECAST_FINETUNE_EPOCHS", "25")))
+
+
+def drift_factor() -> float:
+    return float(os.getenv("FORECAST_DRIFT_FACTOR", "4.0"))
+
+
+def config_digest(config: Dict[str, object]) -> str:
+    payload = json.dumps({"version": MODEL_VERSION, **config}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def data_fingerprint(data: np.ndarray) -> str:
+    return hashlib.sha256(np.ascontiguousarray(data, dtype=np.float32).tobytes()).hexdigest()[:16]
+
+
+def checkpoint_path(key: str, store_dir: Optional[Path] = None) -> Path:
+    return (store_dir or WARM_DIR) / f"{key}.npz"
+
+
+def load_checkpoint(key: str, store_dir: Optional[Path] = None) -> Optional[MLPArtifact]:
+    path = checkpoint_path(key, store_dir)
+    if not path.exists():
+        return None
+    try:
+        return load_artifact(path)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_checkpoint(key: str, artifact: MLPArtifact, store_dir: Optional[Path] = None) -> Path:
+    path = checkpoint_path(key, store_dir)
+    tmp_path = path.with_name(f".{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+    save_artifact(artifact, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def plan_update(checkpoint: Optional[MLPArtifact], digest: str, data: np.ndarray) -> str:
+    if checkpoint is None:
+        return "retrain"
+    metadata = checkpoint.metadata
+    if metadata.get("config") != digest:
+        return "retrain"
+    trained_rows = int(metadata.get("n_obs", 0))
+    if trained_rows <= 0 or len(data) < trained_rows:
+        return "retrain"
+    if data_fingerprint(data[:trained_rows]) != metadata.get("prefix_hash"):
+        return "retrain"
+    new_rows = len(data) - trained_rows
+    if new_rows == 0:
+        return "reuse"
+    if new_rows > max(1, trained_rows // 2):
+        return "retrain"
+    return "finetune"
+
+
+def watermark_metadata(data: np.ndarray, watermark: Optional[str], digest: str, train_mse: float) -> Dict[str, object]:
+    return {
+        "config": digest,
+        "n_obs": int(len(data)),
+        "prefix_hash": data_fingerprint(data),
+        "watermark": watermark,
+        "train_mse": float(train_mse),
+    }
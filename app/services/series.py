@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.data.geography import request_state, state_scope
+from app.data.snapshots import pinned_snapshot
+from app.models import Geography
+from app.services.forecast import METRICS, MetricSpec, _load_metric_series, _metric_frame
+
+SPECS: Dict[str, MetricSpec] = {spec.metric_id: spec for spec in METRICS}
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    size = len(x)
+    if threshold >= size or size <= 2:
+        return np.arange(size)
+    if threshold < 3:
+        return np.array([0, size - 1])[:threshold]
+    every = (size - 2) / (threshold - 2)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, size - 1
+    anchor = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, size)
+        if end >= next_end:
+            avg_x, avg_y = x[-1], y[-1]
+        else:
+            avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs(
+            (x[anchor] - avg_x) * (y[start:end] - y[anchor])
+            - (x[anchor] - x[start:end]) * (avg_y - y[anchor])
+        )
+        anchor = start + int(area.argmax())
+        selected[bucket + 1] = anchor
+    return selected
+
+
+def load_frame(
+    spec: MetricSpec,
+    geography: Geography,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> Tuple[pd.DataFrame, List[str]]:
+    with pinned_snapshot(), state_scope(request_state(geography)):
+        df, citations = _load_metric_series(spec, geography)
+    if df.empty or spec.date_col not in df.columns or spec.value_col not in df.columns:
+        return pd.DataFrame({"date": pd.Series(dtype="datetime64[ns]"), "value": pd.Series(dtype=float)}), citations
+    frame = _metric_frame(df, spec).groupby("date", as_index=False)["value"].mean()
+    if start:
+        frame = frame[frame["date"] >= pd.Timestamp(start)]
+    if end:
+        frame = frame[frame["date"] <= pd.Timestamp(end)]
+    return frame.reset_index(drop=True), citations
+
+
+def downsample(frame: pd.DataFrame, max_points: Optional[int]) -> pd.DataFrame:
+    if not max_points or len(frame) <= max_points:
+        return frame
+    x = frame["date"].to_numpy(dtype="datetime64[s]").astype(np.float64)
+    keep = lttb(x, frame["value"].to_numpy(dtype=np.float64), max_points)
+    return frame.iloc[keep].reset_index(drop=True)
+
+
+def _dates(values) -> List[str]:
+    return pd.DatetimeIndex(values).strftime("%Y-%m-%d").tolist()
+
+
+def series_payload(
+    metric_id: str,
+    geography: Geography,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    max_points: Optional[int] = None,
+) -> Dict:
+    spec = SPECS[metric_id]
+    frame, citations = load_frame(spec, geography, start, end)
+    total = len(frame)
+    sampled = downsample(frame, max_points)
+    page = sampled.iloc[offset:offset + limit if limit is not None else None]
+    return {
+        "metric_id": metric_id,
+        "metric": spec.metric,
+        "unit": spec.unit,
+        "citations": citations,
+        "total_points": total,
+        "returned_points": len(sampled),
+        "downsampled": len(sampled) < total,
+        "offset": offset,
+        "limit": limit,
+        "next_offset": offset + len(page) if offset + len(page) < len(sampled) else None,
+        "dates": _dates(page["date"]),
+        "values": page["value"].round(6).tolist(),
+    }
+
+
+def aligned_payload(
+    metric_ids: Sequence[str],
+    geography: Geography,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    max_points: Optional[int] = None,
+) -> Dict:
+    specs = [SPECS[metric_id] for metric_id in metric_ids]
+    frames = {}
+    citations: List[str] = []
+    for spec in specs:
+        frame, cited = load_frame(spec, geography, start, end)
+        frames[spec.metric_id] = frame.set_index("date")["value"]
+        citations += [citation for citation in cited if citation not in citations]
+    table = pd.DataFrame(frames, columns=list(frames)).sort_index()
+    total = len(table)
+    if max_points and total > max_points:
+        spread = (table.max() - table.min()).replace(0, 1.0)
+        signal = ((table - table.min()) / spread).mean(axis=1).fillna(0.0)
+        keep = downsample(pd.DataFrame({"date": table.index, "value": signal.to_numpy()}), max_points)["date"]
+        table = table.loc[keep]
+    return {
+        "metric_ids": list(metric_ids),
+        "units": {spec.metric_id: spec.unit for spec in specs},
+        "citations": citations,
+        "total_points": total,
+        "downsampled": len(table) < total,
+        "dates": _dates(table.index),
+        "values": {
+            metric_id: [None if pd.isna(value) else round(float(value), 6) for value in table[metric_id]]
+            for metric_id in metric_ids
+        },
+    }
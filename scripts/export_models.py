@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.models import Geography  # noqa: E402
+from app.services.backtest import _county_geographies  # noqa: E402
+from app.services.forecast import DATA_DIR, export_models  # noqa: E402
+
+
+def main() -> None:
+    geographies = [Geography(level="state", value="Florida")]
+    geographies.extend(_county_geographies(DATA_DIR / "processed"))
+    for path in export_models(geographies):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
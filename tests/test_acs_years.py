@@ -0,0 +1,72 @@
+import json
+import threading
+from datetime import date
+
+import pandas as pd
+
+from app.data import sqlite
+from app.data.loaders import census_acs
+from app.data.loaders.fetch import FetchResult
+from app.data.staging import Stage, run_commit_hooks, staged
+
+
+def test_years_fetch_concurrently_and_final_vintages_are_skipped(tmp_path, monkeypatch):
+    published = tmp_path / "published"
+    current = date.today().year
+    requested = []
+    threads = set()
+
+    def fake_fetch(method, url, params=None, **kwargs):
+        year = url.split("/")[-3]
+        requested.append(year)
+        threads.add(threading.get_ident())
+        rows = [
+            ["NAME", "B19013_001E", "B25064_001E", "B17001_002E", "B17001_001E", "B01001_001E",
+             "B25001_001E", "B25002_003E", "B25077_001E", "state", "county"],
+            ["Alachua County, Florida", str(50000 + int(year)), "1000", "10", "100", "100", "50", "5", "200000", "12", "001"],
+        ]
+        return FetchResult(json.dumps(rows).encode(), True, 200, f"sha-{year}")
+
+    monkeypatch.setattr(census_acs, "fetch", fake_fetch)
+    monkeypatch.setattr(census_acs, "published_path", lambda dataset_id, filename: published / dataset_id / filename)
+    monkeypatch.setattr(census_acs, "raw_path", lambda dataset_id, filename: tmp_path / "raw" / filename)
+    monkeypatch.setattr(
+        census_acs,
+        "replace_partition",
+        lambda df, table, column, value: sqlite.replace_partition(df, table, column, value, tmp_path / "app.db"),
+    )
+    monkeypatch.setenv("ACS_YEARS", f"2012-2021,{current}")
+    monkeypatch.setenv("ACS_FINAL_AFTER_DAYS", "0")
+    monkeypatch.delenv("FORCE_OFFLINE", raising=False)
+
+    def run(name):
+        stage = Stage(root=tmp_path / name)
+        with staged(stage):
+            result = census_acs.refresh(allow_network=True)
+        written = sorted(str(path.relative_to(stage.root)) for path in stage.root.rglob("*.csv"))
+        for path in stage.root.rglob("*.csv"):
+            target = published / path.relative_to(stage.root)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            path.replace(target)
+        run_commit_hooks(stage)
+        return result, written
+
+    uncommitted = Stage(root=tmp_path / "uncommitted")
+    with staged(uncommitted):
+        census_acs.refresh(allow_network=True)
+    assert not (tmp_path / "raw").exists()
+    requested.clear()
+
+    result, written = run("first")
+    assert result["status"] == "downloaded" and result["rows"] == "11"
+    assert sorted(requested) == [str(year) for year in range(2012, 2022)] + [str(current)]
+    assert len(threads) > 1
+    assert "census_acs_fl_county/years/2015.csv" in written
+    combined = pd.read_csv(published / "census_acs_fl_county" / "acs_county.csv")
+    assert combined["year"].tolist() == list(range(2012, 2022)) + [current]
+
+    requested.clear()
+    result, written = run("second")
+    assert requested == [str(current)]
+    assert result["status"] == "downloaded"
+    assert written == ["census_acs_fl_county/acs_county.csv", f"census_acs_fl_county/years/{current}.csv"]
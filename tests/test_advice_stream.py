@@ -0,0 +1,46 @@
+import json
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.core.response_cache import ResponseCache
+
+PAYLOAD = {
+    "issue_area": "all",
+    "geography": {"level": "state", "value": "Florida"},
+    "time_horizon": "near_term",
+    "budget_sensitivity": 0.5,
+    "policy_lens": "market",
+}
+
+
+def test_ndjson_stream_emits_sections_in_order(monkeypatch):
+    monkeypatch.setenv("FORECAST_MAX_EPOCHS", "5")
+    monkeypatch.setattr(main, "response_cache", ResponseCache(0))
+    client = TestClient(main.app)
+    response = client.post("/api/advice/stream?format=ndjson", json=PAYLOAD)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    events = [json.loads(line) for line in response.text.splitlines()]
+    names = [event["event"] for event in events]
+    assert names[0] == "summary"
+    assert names[-2:] == ["citations", "done"]
+    assert names.index("evidence") < names.index("forecast") < names.index("options") < names.index("bundles")
+    forecasts = [event["data"] for event in events if event["event"] == "forecast"]
+    assert {item["metric_id"] for item in forecasts} >= {"labor_unemployment_bls"}
+    cited = {citation["citation_id"] for citation in events[-2]["data"]["citations"]}
+    assert all(set(item["citations"]) <= cited for item in forecasts)
+
+
+def test_sse_stream_reports_validation_errors(monkeypatch):
+    def failing_events(request):
+        yield "summary", {"summary": "ok", "risks": []}
+        raise ValueError("Numeric claim without citation in summary.")
+
+    monkeypatch.setattr(main, "iter_advice_events", failing_events)
+    monkeypatch.setattr(main, "response_cache", ResponseCache(0))
+    client = TestClient(main.app)
+    response = client.post("/api/advice/stream", json=PAYLOAD)
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.startswith("event: summary\n")
+    assert "event: error\ndata: " in response.text
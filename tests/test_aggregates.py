@@ -0,0 +1,70 @@
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from app.data import snapshots
+from app.data.aggregates import build_all, county_peers, load_derived
+from app.data.snapshots import SnapshotStore
+from app.models import AdviceRequest, Geography
+from app.services import advisor
+
+FIXTURES = snapshots.DATA_DIR / "fixtures"
+
+
+def test_commit_materializes_aggregates_used_by_evidence(tmp_path, monkeypatch):
+    processed = tmp_path / "processed"
+    for dataset_id in ("bls_unemployment", "fred_macro", "census_acs_fl_county"):
+        shutil.copytree(FIXTURES / dataset_id, processed / dataset_id)
+    store = SnapshotStore(tmp_path / "snapshots", processed, tmp_path / "missing.json")
+    monkeypatch.setattr(snapshots, "_store", store)
+
+    first = store.commit(None, {}, lambda snapshot: build_all(snapshot.processed_dir))
+    ranks = load_derived("county_ranks.csv", first.processed_dir)
+    rent = ranks[ranks["indicator"] == "median_gross_rent"]
+    assert rent["percentile"].max() == 100.0 and rent["count"].iloc[0] == len(rent)
+    latest = load_derived("series_latest.csv", first.processed_dir)
+    gdp = latest[latest["series_id"] == "FLNGSP"].iloc[0]
+    assert gdp["latest_date"] > gdp["prior_date"] and pd.notna(gdp["pct_change"])
+
+    staged = tmp_path / "stage" / "fred_macro"
+    staged.mkdir(parents=True)
+    fred = pd.read_csv(FIXTURES / "fred_macro" / "fred_macro.csv")
+    extra = fred[fred["series_id"] == "FLNGSP"].tail(1).assign(date="2099-01-01", value=2_000_000)
+    pd.concat([fred, extra]).to_csv(staged / "fred_macro.csv", index=False)
+    second = store.commit(tmp_path / "stage", {"fred_macro": "2099-01-02"}, lambda snapshot: build_all(snapshot.processed_dir))
+
+    assert load_derived("series_latest.csv", first.processed_dir).equals(latest)
+    request = AdviceRequest(
+        issue_area="fiscal",
+        geography=Geography(level="state", value="Florida"),
+        time_horizon="1y",
+        budget_sensitivity=0.5,
+        policy_lens="balanced",
+    )
+    with snapshots.pinned_snapshot() as pinned:
+        assert pinned.snapshot_id == second.snapshot_id
+        claims = [item.claim for item in advisor.build_evidence(request)]
+    assert any("2099-01-01" in claim for claim in claims)
+
+
+def test_peer_index_matches_brute_force_neighbors():
+    rng = np.random.default_rng(7)
+    acs = pd.DataFrame({
+        "county_fips": [f"12{index:03d}" for index in range(40)],
+        "county_name": [f"County {index}" for index in range(40)],
+        "year": 2023,
+        "median_household_income": rng.normal(60000, 8000, 40),
+        "poverty_rate": rng.uniform(0.08, 0.25, 40),
+        "rent_to_income": rng.uniform(0.2, 0.4, 40),
+    })
+    peers = county_peers(acs, k=5)
+    assert len(peers) == 200
+
+    features = acs[["median_household_income", "poverty_rate", "rent_to_income"]]
+    z = ((features - features.mean()) / features.std(ddof=0)).to_numpy()
+    for index, fips in enumerate(acs["county_fips"]):
+        distances = np.linalg.norm(z - z[index], axis=1)
+        distances[index] = np.inf
+        expected = acs["county_fips"].to_numpy()[np.argsort(distances)[:5]]
+        assert peers[peers["county_fips"] == fips]["peer_fips"].tolist() == expected.tolist()
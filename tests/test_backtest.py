@@ -0,0 +1,30 @@
+import json
+
+from app.services.backtest import main, run_backtest, synthetic_series
+
+
+def test_backtest_scores_every_series():
+    series = synthetic_series(geographies=2, length=24)
+    results = run_backtest(series, ["linear"], horizons=[1, 3], cutoffs=2, min_train=6, workers=2)
+    assert len(results) == len(series) * 2
+    for result in results:
+        assert result.error is None
+        assert result.evaluations == 2
+        assert result.mae is not None and result.mae >= 0
+        assert 0.0 <= result.coverage <= 1.0
+
+
+def test_backtest_cli_writes_report(tmp_path):
+    report_path = main([
+        "--source", "synthetic",
+        "--engines", "linear",
+        "--horizons", "2",
+        "--cutoffs", "1",
+        "--workers", "1",
+        "--synthetic-geographies", "1",
+        "--synthetic-length", "12",
+        "--output-dir", str(tmp_path),
+    ])
+    report = json.loads(report_path.read_text())
+    assert report["summary"]["linear"]["tasks"] == report["series"]
+    assert report["results"]
@@ -0,0 +1,59 @@
+import json
+
+import pandas as pd
+
+from app.data.loaders import bls
+from app.data.loaders.fetch import FetchResult
+from app.data.staging import Stage, staged
+from app.models import Geography
+from app.services.forecast import METRICS, _load_metric_series
+
+
+def test_catalog_covers_counties_and_packs_maximal_batches():
+    catalog = bls.series_catalog()
+    assert (catalog["area_type"] == "county").sum() == 67
+    assert "LAUCN120860000000003" in set(catalog["series_id"])
+    assert catalog["series_id"].str.len().eq(20).all()
+
+    ids = list(catalog["series_id"])
+    batches = bls.plan_batches(ids, 2000, 2025, *bls.batch_limits(has_key=True))
+    assert len(batches) == -(-len(ids) // 50) * 2
+    assert all(len(series) <= 50 and last - first < 20 for series, first, last in batches)
+    assert sorted(item for series, first, _ in batches if first == 2000 for item in series) == sorted(ids)
+
+
+def test_refresh_writes_county_partitions(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_fetch(method, url, json_body=None, **kwargs):
+        calls.append(json_body["seriesid"])
+        series = [
+            {"seriesID": series_id, "data": [
+                {"year": "2025", "period": "M01", "value": "3.5"},
+                {"year": "2025", "period": "M02", "value": "-"},
+            ]}
+            for series_id in json_body["seriesid"]
+        ]
+        body = json.dumps({"status": "REQUEST_SUCCEEDED", "Results": {"series": series}}).encode()
+        return FetchResult(content=body, changed=True, status_code=200, sha256="x")
+
+    monkeypatch.setattr(bls, "fetch", fake_fetch)
+    monkeypatch.setattr(bls, "raw_path", lambda dataset_id, filename: tmp_path / "raw" / filename)
+    monkeypatch.setattr(bls, "write_table", lambda df, dataset_id: None)
+    monkeypatch.setenv("BLS_START_YEAR", "2025")
+    monkeypatch.setenv("BLS_END_YEAR", "2025")
+    monkeypatch.delenv("FORCE_OFFLINE", raising=False)
+    monkeypatch.delenv("BLS_API_KEY", raising=False)
+
+    stage = Stage(root=tmp_path / "stage")
+    with staged(stage):
+        result = bls.refresh(allow_network=True)
+
+    assert result["status"] == "downloaded"
+    assert max(len(series) for series in calls) == 25
+    county = pd.read_csv(stage.root / "bls_unemployment" / "county" / "12086.csv")
+    assert list(county["series_id"]) == ["LAUCN120860000000003"]
+
+    spec = next(spec for spec in METRICS if spec.metric_id == "labor_unemployment_bls")
+    df, citations = _load_metric_series(spec, Geography(level="county", value="Miami-Dade"), stage.root)
+    assert citations == ["bls_unemployment"] and df["value"].tolist() == [3.5]
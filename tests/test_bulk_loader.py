@@ -0,0 +1,47 @@
+import tracemalloc
+
+import pandas as pd
+
+from app.data.loaders.bulk import aggregate_file
+from app.data.loaders.downloads import SOURCES
+
+
+def _write_places(path, rows_per_state=4000):
+    header = "Year,StateAbbr,StateDesc,LocationName,LocationID,MeasureId,DataValueTypeID,Data_Value,TotalPopulation,Geolocation\n"
+    states = [("AL", "01"), ("FL", "12"), ("GA", "13")] + [(f"X{index}", f"{20 + index}") for index in range(30)]
+    with path.open("w") as handle:
+        handle.write(header)
+        for abbr, fips in states:
+            lines = []
+            for index in range(rows_per_state):
+                county = f"{fips}{index % 67 * 2 + 1:03d}"
+                measure = "DIABETES" if index % 2 == 0 else "OBESITY"
+                year = 2021 + index % 2
+                lines.append(
+                    f"{year},{abbr},State {abbr},County {county},{county},{measure},CrdPrv,"
+                    f"{10 + index % 5},\"{1000 + index % 67:,}\",\"POINT (-81.{index:06d} 27.{index:06d})\"\n"
+                )
+            handle.write("".join(lines))
+
+
+def test_streaming_aggregation_stays_bounded(tmp_path):
+    path = tmp_path / "places.csv"
+    _write_places(path)
+    size = path.stat().st_size
+
+    tracemalloc.start()
+    state, counties = aggregate_file(path, SOURCES["cdc_places"], chunksize=5_000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert size > 10_000_000
+    assert peak < size / 4
+    assert list(state["year"]) == [2021]
+    assert set(counties["county_fips"].str[:2]) == {"12"}
+    assert counties["county_fips"].nunique() == 67
+
+    frame = pd.read_csv(path, dtype=str)
+    florida = frame[(frame["StateAbbr"] == "FL") & (frame["MeasureId"] == "DIABETES")]
+    weights = florida["TotalPopulation"].str.replace(",", "").astype(float)
+    expected = (florida["Data_Value"].astype(float) * weights).sum() / weights.sum()
+    assert abs(state["prevalence_rate"].iloc[0] - expected) < 1e-3
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.core.executor import ClientDisconnected, PoolSaturated, WorkPool, cancellation_requested
+from app.core.response_cache import ResponseCache
+from app.core.threads import thread_budget
+
+
+def test_pool_rejects_when_queue_is_full_and_cancels_on_disconnect():
+    pool = WorkPool(workers=1, max_queue=0, retry_after=7)
+    release = threading.Event()
+    observed = {}
+
+    def blocking():
+        release.wait(5)
+        observed["cancelled"] = cancellation_requested()
+        return "done"
+
+    async def scenario():
+        disconnected = asyncio.Event()
+
+        async def is_disconnected():
+            return disconnected.is_set()
+
+        first = asyncio.create_task(pool.run(blocking, is_disconnected=is_disconnected, poll_seconds=0.01))
+        await asyncio.sleep(0.05)
+        with pytest.raises(PoolSaturated) as excinfo:
+            await pool.run(lambda: None)
+        assert excinfo.value.retry_after == 7
+        disconnected.set()
+        with pytest.raises(ClientDisconnected):
+            await first
+        release.set()
+        while pool.pending:
+            await asyncio.sleep(0.01)
+        assert await pool.run(lambda: "ok") == "ok"
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert observed["cancelled"] is True
+
+
+def test_advice_returns_503_with_retry_after_when_saturated(monkeypatch):
+    pool = WorkPool(workers=1, max_queue=0, retry_after=3)
+    monkeypatch.setattr(main, "get_pool", lambda: pool)
+    monkeypatch.setattr(main, "response_cache", ResponseCache(0))
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_advice(request):
+        started.set()
+        release.wait(5)
+        raise ValueError("stopped")
+
+    monkeypatch.setattr(main, "_validated_advice", slow_advice)
+    payload = {
+        "issue_area": "labor_market",
+        "geography": {"level": "state", "value": "Florida"},
+        "time_horizon": "near_term",
+        "budget_sensitivity": 0.5,
+        "policy_lens": "market",
+    }
+    client = TestClient(main.app)
+    statuses = []
+    worker = threading.Thread(target=lambda: statuses.append(client.post("/api/advice", json=payload).status_code))
+    worker.start()
+    try:
+        assert started.wait(5)
+        response = client.post("/api/advice", json={**payload, "policy_lens": "equity"})
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "3"
+        assert client.get("/health").status_code == 200
+    finally:
+        release.set()
+        worker.join(5)
+        pool.shutdown()
+    assert statuses == [500]
+
+
+def test_thread_budget_is_split_across_server_and_advice_workers(monkeypatch):
+    monkeypatch.delenv("FORECAST_NUM_THREADS", raising=False)
+    monkeypatch.setattr("os.cpu_count", lambda: 16)
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")
+    monkeypatch.setenv("ADVICE_WORKERS", "4")
+    assert thread_budget() == 2
+    monkeypatch.setenv("ADVICE_WORKERS", "32")
+    assert thread_budget() == 1
+    monkeypatch.setenv("FORECAST_NUM_THREADS", "3")
+    assert thread_budget() == 3
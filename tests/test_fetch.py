@@ -0,0 +1,97 @@
+from app.data import snapshots
+from app.data.loaders.base import refresh_from_fixture
+from app.data.loaders.bls import _results_fingerprint
+from app.data.loaders.fetch import fetch, request_key, save_after_commit
+from app.data.snapshots import SnapshotStore
+from app.data.staging import Stage, has_changes, run_commit_hooks, staged
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(self.status_code)
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    def request(self, method, url, params=None, json=None, headers=None, timeout=None):
+        self.sent_headers.append(headers)
+        return self.responses.pop(0)
+
+
+def test_conditional_fetch_tracks_validators_and_content_hash(tmp_path):
+    session = FakeSession([
+        FakeResponse(200, b'{"a": 1}', {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2026 00:00:00 GMT"}),
+        FakeResponse(304),
+        FakeResponse(200, b'{"a": 1}', {"ETag": '"v2"'}),
+        FakeResponse(200, b'{"a": 2}'),
+    ])
+    kwargs = {"params": {"series_id": "FLUR", "api_key": "secret"}, "session": session, "cache_dir": tmp_path}
+
+    first = fetch("GET", "https://example.test/obs", **kwargs)
+    assert first.changed and first.json() == {"a": 1}
+    not_modified = fetch("GET", "https://example.test/obs", **kwargs)
+    assert session.sent_headers[1] == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2026 00:00:00 GMT",
+    }
+    assert not not_modified.changed and not_modified.content == first.content
+    identical = fetch("GET", "https://example.test/obs", **kwargs)
+    assert not identical.changed
+    assert fetch("GET", "https://example.test/obs", **kwargs).changed
+    assert request_key("GET", "u", {"api_key": "a"}) == request_key("GET", "u", {"api_key": "b"})
+    moving = ("observation_start",)
+    assert request_key("GET", "u", {"observation_start": "2024-01-01"}, exclude=moving) == request_key(
+        "GET", "u", {"observation_start": "2024-02-01"}, exclude=moving
+    )
+    assert "secret" not in (tmp_path / "state.json").read_text()
+
+
+def test_identical_fixture_does_not_stage_a_new_snapshot(tmp_path, monkeypatch):
+    store = SnapshotStore(tmp_path / "snapshots", tmp_path / "processed", tmp_path / "registry.json")
+    monkeypatch.setattr(snapshots, "_store", store)
+    monkeypatch.setattr("app.data.loaders.base.write_table", lambda df, name: None)
+    monkeypatch.setattr("app.data.loaders.base.DATA_DIR", tmp_path)
+    monkeypatch.setattr("app.data.loaders.base.fixture_path", lambda dataset_id, filename: fixture)
+    fixture = tmp_path / "fixture.csv"
+    fixture.write_text("date,value\n2024-01,3.1\n")
+
+    first = Stage(root=tmp_path / "stage1")
+    with staged(first):
+        assert refresh_from_fixture("demo", "values.csv", "2026-01-01")["status"] == "cached"
+    assert has_changes(first)
+    store.commit(first.root, first.registry_updates)
+
+    second = Stage(root=tmp_path / "stage2")
+    with staged(second):
+        assert refresh_from_fixture("demo", "values.csv", "2026-01-02")["status"] == "unchanged"
+    assert not has_changes(second)
+
+
+def test_staged_fetch_keeps_validators_pending_until_commit(tmp_path):
+    session = FakeSession([
+        FakeResponse(200, b'{"Results": {"v": 1}, "responseTime": 10}', {"ETag": '"v1"'}),
+        FakeResponse(200, b'{"Results": {"v": 1}, "responseTime": 12}', {"ETag": '"v1"'}),
+        FakeResponse(200, b'{"Results": {"v": 1}, "responseTime": 15}', {"ETag": '"v2"'}),
+    ])
+    kwargs = {"session": session, "cache_dir": tmp_path, "fingerprint": _results_fingerprint}
+    stage = Stage(root=tmp_path / "stage")
+    with staged(stage):
+        first = fetch("POST", "https://example.test/bls", **kwargs)
+        retried = fetch("POST", "https://example.test/bls", **kwargs)
+        save_after_commit([retried])
+    assert first.changed and retried.changed
+    assert session.sent_headers[1] == {} and not (tmp_path / "state.json").exists()
+
+    run_commit_hooks(stage)
+    after = fetch("POST", "https://example.test/bls", **kwargs)
+    assert session.sent_headers[2] == {"If-None-Match": '"v1"'}
+    assert not after.changed
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from app.services.forecast import (
+    _classify_direction,
+    _fit_linear,
+    _interval_bounds,
+    _simulate_linear,
+    torch,
+)
+
+
+def test_linear_bootstrap_paths_bracket_point_forecast():
+    values = np.array([10.0, 10.5, 10.2, 11.0, 11.4, 11.1, 12.0], dtype=np.float32)
+    coeffs = _fit_linear(values)
+    paths = _simulate_linear(coeffs, values, 4, np.random.default_rng(0))
+    assert paths.shape == (500, 4)
+    bounds = _interval_bounds(paths[:, -1])
+    assert bounds["lower_95"] <= bounds["lower_80"] <= bounds["upper_80"] <= bounds["upper_95"]
+
+
+def test_direction_uses_interval_when_available():
+    assert _classify_direction(10.5, 10.0, "higher_is_better", (9.0, 12.0)) == "stable"
+    assert _classify_direction(10.5, 10.0, "higher_is_better", (10.2, 10.8)) == "improving"
+    assert _classify_direction(10.1, 10.0, "lower_is_better") == "stable"
+    assert _classify_direction(10.1, 10.0, "lower_is_better", (None, None)) == "stable"
+
+
+def test_mixed_frequency_panel_keeps_native_frequencies(monkeypatch):
+    import pandas as pd
+
+    from app.models import AdviceRequest, Geography
+    from app.services import forecast
+
+    monthly = pd.DataFrame({"date": pd.date_range("2020-01-01", periods=36, freq="MS"), "value": np.arange(36.0)})
+    annual = pd.DataFrame({"year": [2020, 2021, 2022], "value": [1.0, 2.0, 3.0]})
+    specs = [
+        forecast.MetricSpec("m_monthly", "economy", "Monthly", "ds", "fred", "value", "date", "%", "lower_is_better"),
+        forecast.MetricSpec("m_annual_a", "economy", "Annual A", "ds", "acs", "value", "year", "%", "lower_is_better"),
+        forecast.MetricSpec("m_annual_b", "economy", "Annual B", "ds", "acs", "value", "year", "%", "lower_is_better"),
+    ]
+    frames = {"m_monthly": monthly, "m_annual_a": annual, "m_annual_b": annual}
+    monkeypatch.setattr(forecast, "METRICS", specs)
+    monkeypatch.setattr(forecast, "_load_metric_series", lambda spec, geo, processed_dir=None: (frames[spec.metric_id], []))
+
+    request = AdviceRequest(
+        geography=Geography(level="state", value="Florida"),
+        issue_area="all",
+        time_horizon="1y",
+        budget_sensitivity=0.5,
+        policy_lens="balanced",
+    )
+    panel, panel_specs, _ = forecast._build_feature_panel(request)
+    assert panel.step_months == 1
+    assert panel.frequencies == (1, 12, 12)
+    assert panel.values.shape == (36, 3)
+    assert panel.mask.sum(axis=0).tolist() == [36, 3, 3]
+    assert panel.inputs(np.zeros(3), np.ones(3)).shape == (36, 6)
+    assert not np.isnan(panel.latest()).any()
+    assert panel.ages().tolist() == [0, 11, 11]
+
+    if forecast.torch is None:
+        return
+    budget = forecast.replace(forecast.training_budget(), max_epochs=5, min_epochs=1)
+    fitted = forecast._fit_multifactor(panel, budget)
+    assert fitted is not None
+    forecasts, paths = forecast._multifactor_forecast(fitted.artifact, panel, 3)
+    annual_path = forecasts["m_annual_a"]
+    assert annual_path[0] != pytest.approx(3.0)
+    assert annual_path[1] == annual_path[2] == annual_path[0]
+    assert paths["m_monthly"].shape == (500, 3)
+
+
+@pytest.mark.skipif(torch is None, reason="torch not installed")
+def test_train_mlp_refits_after_early_stop_and_reports_time_budget():
+    from app.services import forecast
+
+    device = forecast._select_device()
+    x, y = forecast._window_data(np.sin(np.linspace(0.0, 12.0, 80)).astype(np.float32), 4)
+    y = y[:, np.newaxis]
+
+    def build():
+        return forecast._build_mlp(4, 8, 1, device)
+
+    patient = forecast.TrainingBudget(
+        max_epochs=2000, min_epochs=1, patience=1, min_delta=0.5,
+        validation_fraction=0.2, min_validation_windows=2,
+    )
+    _, epochs, stop_reason = forecast._train_mlp(build, x, y, patient)
+    assert stop_reason == "early_stop"
+    assert epochs < 2000
+
+    expired = forecast.replace(patient, patience=0, deadline=0.0)
+    model, epochs, stop_reason = forecast._train_mlp(build, x, y, expired)
+    assert stop_reason == "time_budget"
+    assert epochs == 2
+
+    share = forecast.budget_share(forecast.replace(patient, deadline=forecast.time.monotonic() + 100.0), 4)
+    assert share.deadline - forecast.time.monotonic() <= 25.0
@@ -0,0 +1,33 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("torch")
+
+from app.models import AdviceRequest, Geography  # noqa: E402
+from app.services.forecast import generate_outlook  # noqa: E402
+
+
+def _request(value: str) -> AdviceRequest:
+    level = "state" if value == "Florida" else "county"
+    return AdviceRequest(
+        issue_area="all",
+        geography=Geography(level=level, value=value),
+        time_horizon="near_term",
+        budget_sensitivity=0.5,
+        policy_lens="market",
+    )
+
+
+def _snapshot(request: AdviceRequest):
+    items, summary, urgency, info = generate_outlook(request)
+    return [item.model_dump() for item in items], summary, urgency, info
+
+
+def test_outlook_is_reproducible_across_threads():
+    requests = [_request(value) for value in ("Florida", "12086", "Florida", "12095")]
+    sequential = [_snapshot(request) for request in requests]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        concurrent = list(pool.map(_snapshot, requests))
+    assert concurrent == sequential
+    assert sequential[0] == sequential[2]
@@ -0,0 +1,56 @@
+import json
+
+import pandas as pd
+
+from app.data.loaders import fred
+from app.data.loaders.fetch import FetchResult
+from app.data.staging import Stage, staged
+
+
+def test_catalog_refresh_appends_incrementally(tmp_path, monkeypatch):
+    catalog = tmp_path / "catalog.csv"
+    catalog.write_text("series_id,series_name\nFLUR,Unemployment\nMIAM112URN,Miami unemployment\n")
+    published = tmp_path / "published"
+    observations = {
+        "FLUR": [{"date": "2024-01-01", "value": "3.0"}, {"date": "2024-02-01", "value": "3.1"}],
+        "MIAM112URN": [{"date": "2024-01-01", "value": "2.5"}, {"date": "2024-02-01", "value": "."}],
+    }
+    starts = []
+
+    def fake_fetch(method, url, params=None, **kwargs):
+        starts.append(params.get("observation_start"))
+        rows = [obs for obs in observations[params["series_id"]] if obs["date"] >= params.get("observation_start", "")]
+        return FetchResult(json.dumps({"observations": rows}).encode(), True, 200, "x")
+
+    monkeypatch.setattr(fred, "fetch", fake_fetch)
+    monkeypatch.setattr(fred, "published_path", lambda dataset_id, filename: published / dataset_id / filename)
+    monkeypatch.setattr(fred, "raw_path", lambda dataset_id, filename: tmp_path / "raw" / filename)
+    monkeypatch.setattr(fred, "write_table", lambda df, dataset_id: None)
+    monkeypatch.setenv("FRED_CATALOG", str(catalog))
+    monkeypatch.setenv("FRED_REVISION_DAYS", "0")
+    monkeypatch.delenv("FORCE_OFFLINE", raising=False)
+
+    def run():
+        stage = Stage(root=tmp_path / f"stage{len(starts)}")
+        with staged(stage):
+            result = fred.refresh(allow_network=True)
+        written = sorted(str(path.relative_to(stage.root)) for path in stage.root.rglob("*.csv"))
+        for path in stage.root.rglob("*.csv"):
+            target = published / path.relative_to(stage.root)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            path.replace(target)
+        return result, written
+
+    result, written = run()
+    assert result["status"] == "downloaded" and starts == [None, None]
+    series = pd.read_csv(published / "fred_macro" / "series" / "MIAM112URN.csv")
+    assert series["value"].tolist() == [2.5]
+
+    observations["FLUR"].append({"date": "2024-03-01", "value": "3.2"})
+    result, written = run()
+    assert sorted(starts[2:]) == ["2024-01-01", "2024-02-01"]
+    assert written == ["fred_macro/fred_macro.csv", "fred_macro/series/FLUR.csv"]
+    assert pd.read_csv(published / "fred_macro" / "series" / "FLUR.csv")["value"].tolist() == [3.0, 3.1, 3.2]
+
+    result, _ = run()
+    assert result["status"] == "unchanged"
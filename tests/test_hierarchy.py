@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from app.models import Geography
+from app.services.forecast import METRICS
+from app.services.hierarchy import build_hierarchical_forecasts, forecast_metric, lookup_county_forecast
+
+RENT = next(spec for spec in METRICS if spec.metric_id == "housing_median_rent")
+
+
+def _synthetic_acs(counties: int = 67, years: int = 6) -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    rows = []
+    for idx in range(counties):
+        level = rng.uniform(900, 2000)
+        for offset in range(years):
+            rows.append({
+                "county_fips": f"12{2 * idx + 1:03d}",
+                "county_name": f"County {idx}, Florida",
+                "year": 2016 + offset,
+                "median_gross_rent": level * (1 + 0.03 * offset) + rng.normal(0, 10),
+            })
+    return pd.DataFrame(rows)
+
+
+def test_county_forecasts_reconcile_to_state_average():
+    frame, metadata = forecast_metric(RENT, _synthetic_acs(), steps=3)
+    assert metadata["counties"] == 67
+    for _, group in frame.groupby("step"):
+        counties = group[group["geography"] != "state"]
+        state = group[group["geography"] == "state"]
+        assert np.isclose(counties["forecast"].mean(), state["forecast"].iloc[0], rtol=1e-5)
+
+
+def test_persisted_forecasts_support_lookup(tmp_path):
+    processed = tmp_path / "processed" / "census_acs_fl_county"
+    processed.mkdir(parents=True)
+    _synthetic_acs(counties=5).to_csv(processed / "acs_county.csv", index=False)
+    written = build_hierarchical_forecasts(tmp_path / "processed", tmp_path / "forecasts", steps=2)
+    assert written
+    row = lookup_county_forecast("housing_median_rent", Geography(level="county", value="12003"), 2, tmp_path / "forecasts")
+    assert row["county_name"] == "County 1, Florida"
+    assert row["metadata"]["watermark_year"] == 2021
+    state = lookup_county_forecast("housing_median_rent", Geography(level="state", value="Florida"), 1, tmp_path / "forecasts")
+    assert state["geography"] == "state"
+
+    meta_path = tmp_path / "forecasts" / "housing_median_rent.json"
+    metadata = json.loads(meta_path.read_text())
+    meta_path.write_text(json.dumps({**metadata, "snapshot_id": metadata["snapshot_id"] + 1}))
+    assert lookup_county_forecast("housing_median_rent", Geography(level="state", value="Florida"), 1, tmp_path / "forecasts") is None
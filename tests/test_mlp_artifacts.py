@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from app.services import mlp_artifacts  # noqa: E402
+from app.services.forecast import _fit_torch, _forecast_series, _predict_mlp  # noqa: E402
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+VALUES = (np.sin(np.arange(40) / 4) * 2 + 10).astype(np.float32)
+
+
+def _torch_recursive(model, values, lookback, steps):
+    history = list(values)
+    predictions = []
+    with torch.no_grad():
+        for _ in range(steps):
+            window = torch.tensor(np.array(history[-lookback:], dtype=np.float32)).unsqueeze(0)
+            pred = float(model(window)[0, 0])
+            history.append(pred)
+            predictions.append(pred)
+    return predictions
+
+
+def test_numpy_inference_matches_torch(tmp_path):
+    fitted = _fit_torch(VALUES)
+    expected = _torch_recursive(fitted.model, VALUES, fitted.lookback, 12)
+    np.testing.assert_allclose(_predict_mlp(fitted, VALUES, 12), expected, rtol=1e-5, atol=1e-5)
+
+    path = mlp_artifacts.save_artifact(fitted.artifact, tmp_path / "model.npz")
+    loaded = mlp_artifacts.load_artifact(path)
+    np.testing.assert_allclose(mlp_artifacts.forecast_recursive(loaded, VALUES, 12), expected, rtol=1e-5, atol=1e-5)
+    assert loaded.metadata["lookback"] == fitted.lookback
+
+
+def test_prebuilt_mode_uses_artifact(tmp_path, monkeypatch):
+    fitted = _fit_torch(VALUES)
+    mlp_artifacts.save_artifact(fitted.artifact, mlp_artifacts.artifact_path("metric__state", tmp_path))
+    monkeypatch.setattr(mlp_artifacts, "MODEL_DIR", tmp_path)
+    monkeypatch.setenv("FORECAST_INFERENCE", "prebuilt")
+    predictions, note, _ = _forecast_series(VALUES, 6, model_key="metric__state")
+    assert note == "Prebuilt MLP (numpy)"
+    np.testing.assert_allclose(predictions, _predict_mlp(fitted, VALUES, 6), rtol=1e-6)
+
+
+def test_prebuilt_serving_does_not_import_torch():
+    env = {**os.environ, "FORECAST_INFERENCE": "prebuilt"}
+    code = "import sys, app.main; assert 'torch' not in sys.modules"
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, env=env, check=True)
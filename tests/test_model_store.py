@@ -0,0 +1,52 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from app.services import model_store
+from app.services.forecast import _fit_torch, torch, training_budget
+
+pytestmark = pytest.mark.skipif(torch is None, reason="torch not installed")
+
+
+def test_warm_start_reuses_finetunes_and_retrains(tmp_path, monkeypatch):
+    monkeypatch.setenv("FORECAST_WARM_START", "1")
+    monkeypatch.setenv("FORECAST_FINETUNE_EPOCHS", "3")
+    monkeypatch.setattr(model_store, "WARM_DIR", tmp_path)
+    budget = training_budget()
+    values = np.linspace(10.0, 14.0, 24).astype(np.float32)
+
+    cold = _fit_torch(values, budget, "metric__state", "2023-12-01")
+    assert cold.stop_reason in ("max_epochs", "early_stop")
+    assert (tmp_path / "metric__state.npz").exists()
+
+    reused = _fit_torch(values, budget, "metric__state", "2023-12-01")
+    assert reused.stop_reason == "reused"
+    np.testing.assert_array_equal(reused.artifact.w1, cold.artifact.w1)
+
+    appended = np.append(values, np.float32(14.2))
+    warm = _fit_torch(appended, budget, "metric__state", "2024-01-01")
+    assert warm.stop_reason in ("warm_start_max_epochs", "warm_start_early_stop")
+    assert warm.epochs <= 3
+    assert warm.artifact.metadata["n_obs"] == len(appended)
+    assert warm.artifact.metadata["watermark"] == "2024-01-01"
+
+    revised = appended.copy()
+    revised[0] += 1.0
+    retrained = _fit_torch(revised, budget, "metric__state", "2024-01-01")
+    assert not retrained.stop_reason.startswith("warm_start")
+
+
+def test_interrupted_fits_are_not_checkpointed(tmp_path, monkeypatch):
+    monkeypatch.setenv("FORECAST_WARM_START", "1")
+    monkeypatch.setattr(model_store, "WARM_DIR", tmp_path)
+    values = np.linspace(10.0, 14.0, 24).astype(np.float32)
+
+    expired = replace(training_budget(), deadline=0.0)
+    cut = _fit_torch(values, expired, "metric__state", "2023-12-01")
+    assert cut.stop_reason == "time_budget"
+    assert not (tmp_path / "metric__state.npz").exists()
+
+    full = _fit_torch(values, training_budget(), "metric__state", "2023-12-01")
+    assert full.stop_reason != "reused"
+    assert (tmp_path / "metric__state.npz").exists()
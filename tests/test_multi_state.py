@@ -0,0 +1,88 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.data import snapshots
+from app.data.geography import DEFAULT_STATE, STATES, state_name, state_scope
+from app.data.loaders.base import for_each_state, processed_path
+from app.data.loaders.bulk import aggregate_file
+from app.data.loaders.downloads import SOURCES
+from app.data.snapshots import SnapshotStore
+from app.data.staging import Stage, staged
+from app.models import Geography
+from app.services import forecast
+
+COUNTIES_PER_STATE = 60
+STATE_CODES = sorted(code for code in STATES if code != "DC")
+
+
+def _acs_rows(fips: str) -> pd.DataFrame:
+    counties = [f"{fips}{index * 2 + 1:03d}" for index in range(COUNTIES_PER_STATE)]
+    years = np.arange(2018, 2023)
+    frame = pd.DataFrame(
+        [(county, f"County {county}", year) for county in counties for year in years],
+        columns=["county_fips", "county_name", "year"],
+    )
+    frame["median_household_income"] = int(fips) * 1000 + frame["year"] - 2000
+    return frame
+
+
+def test_partitions_scope_lookups_for_fifty_states(tmp_path, monkeypatch):
+    store = SnapshotStore(tmp_path / "snapshots", tmp_path / "processed", tmp_path / "registry_state.json")
+    monkeypatch.setattr(snapshots, "_store", store)
+    monkeypatch.setenv("STATES", ",".join(STATE_CODES))
+    assert len(STATE_CODES) * COUNTIES_PER_STATE == 3000
+
+    def write_state(state):
+        path = processed_path("census_acs_fl_county", "acs_county.csv")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _acs_rows(STATES[state][0]).to_csv(path, index=False)
+        return {"dataset_id": "census_acs_fl_county", "status": "downloaded", "rows": str(COUNTIES_PER_STATE)}
+
+    stage = Stage(root=tmp_path / "stage")
+    with staged(stage):
+        result = for_each_state("census_acs_fl_county", write_state)
+    store.commit(stage.root, {"census_acs_fl_county": "2026-01-01"})
+    assert result["status"] == "downloaded" and result["rows"] == "3000"
+    assert (store.current().processed_dir / "census_acs_fl_county").is_dir()
+    assert (store.current().processed_dir / "states" / "GA" / "census_acs_fl_county").is_dir()
+
+    spec = next(spec for spec in forecast.METRICS if spec.dataset_id == "census_acs_fl_county")
+    read_paths = []
+    original = pd.read_csv
+    monkeypatch.setattr(forecast.pd, "read_csv", lambda path, *a, **k: read_paths.append(str(path)) or original(path, *a, **k))
+
+    started = time.perf_counter()
+    for state in STATE_CODES:
+        fips = STATES[state][0]
+        with state_scope(state):
+            county, _ = forecast._load_metric_series(spec, Geography(level="county", value=f"{fips}001"))
+            average, _ = forecast._load_metric_series(spec, Geography(level="state", value=state_name()))
+        assert set(county["county_fips"].astype(str)) == {f"{fips}001"}
+        assert average["county_name"].iloc[0] == f"{state_name(state)} (avg)"
+        assert average["median_household_income"].iloc[-1] == int(fips) * 1000 + 22
+    elapsed = time.perf_counter() - started
+
+    assert len(read_paths) == 2 * len(STATE_CODES)
+    for path, state in zip(read_paths[::2], STATE_CODES):
+        assert ("/states/" in path) == (state != DEFAULT_STATE)
+        assert state == DEFAULT_STATE or f"/states/{state}/" in path
+    assert elapsed < 10
+
+
+def test_bulk_aggregation_splits_states_in_one_pass(tmp_path):
+    path = tmp_path / "nri.csv"
+    lines = ["STATEFIPS,STCOFIPS,RISK_SCORE,POPULATION"]
+    for state in STATE_CODES:
+        fips = STATES[state][0]
+        for index in range(COUNTIES_PER_STATE):
+            lines.append(f"{fips},{fips}{index * 2 + 1:03d},{int(fips) + index % 2},100")
+    path.write_text("\n".join(lines) + "\n")
+
+    state_df, county_df = aggregate_file(path, SOURCES["fema_nri"], [STATES[code][0] for code in STATE_CODES], chunksize=1_000)
+
+    assert len(state_df) == len(STATE_CODES)
+    assert len(county_df) == 3000
+    georgia = state_df[state_df["state_fips"] == "13"]["risk_index"].iloc[0]
+    assert georgia == 13.5
@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+
+from app.data import registry
+from app.data.jobs import RefreshJobs
+from app.data.loaders.base import processed_path
+from app.data.snapshots import SnapshotStore
+
+
+def _wait(job, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while job.active and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+def test_refresh_job_stages_until_commit_and_dedupes(tmp_path, monkeypatch):
+    processed = tmp_path / "processed"
+    (processed / "demo").mkdir(parents=True)
+    (processed / "demo" / "values.csv").write_text("old\n")
+    store = SnapshotStore(tmp_path / "snapshots", processed, tmp_path / "registry_state.json")
+    release = threading.Event()
+
+    def slow_loader(allow_network=True):
+        path = processed_path("demo", "values.csv")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("new\n")
+        registry.update_dataset_refresh("demo", "2026-01-02")
+        release.wait(5)
+        return {"dataset_id": "demo", "status": "downloaded", "rows": "1"}
+
+    def broken_loader(allow_network=True):
+        raise RuntimeError("upstream down")
+
+    jobs = RefreshJobs({"demo": slow_loader, "broken": broken_loader}, store, tmp_path / "staging")
+    committed = []
+    jobs.on_commit(committed.append)
+
+    job, created = jobs.submit()
+    again, created_again = jobs.submit()
+    assert created and not created_again and again is job
+    time.sleep(0.05)
+    assert store.current() is None
+
+    release.set()
+    _wait(job)
+    assert job.status == "committed"
+    assert committed == [job]
+    snapshot = store.current()
+    assert job.snapshot_id == snapshot.snapshot_id == 1
+    assert (snapshot.processed_dir / "demo" / "values.csv").read_text() == "new\n"
+    assert (processed / "demo" / "values.csv").read_text() == "old\n"
+    assert json.loads(snapshot.registry_path.read_text())["demo"]["retrieval_date"] == "2026-01-02"
+    report = job.to_dict()
+    assert report["progress"] == {"completed": 2, "total": 2}
+    statuses = {item["dataset_id"]: item for item in report["datasets"]}
+    assert statuses["demo"]["status"] == "downloaded"
+    assert statuses["broken"]["status"] == "error"
+    assert statuses["broken"]["error"] == "upstream down"
+    assert statuses["demo"]["seconds"] is not None
+    assert not (tmp_path / "staging" / job.job_id).exists()
+
+
+def test_snapshot_commits_are_monotonic_pinned_and_pruned(tmp_path, monkeypatch):
+    from app.data import snapshots
+
+    monkeypatch.setenv("SNAPSHOT_RETAIN", "2")
+    processed = tmp_path / "processed"
+    (processed / "a").mkdir(parents=True)
+    (processed / "a" / "a.csv").write_text("1\n")
+    store = SnapshotStore(tmp_path / "snapshots", processed, tmp_path / "missing.json")
+    monkeypatch.setattr(snapshots, "_store", store)
+
+    first = store.commit(None, {"a": "2026-01-01"})
+    with snapshots.pinned_snapshot() as pinned:
+        staged = tmp_path / "stage"
+        (staged / "b").mkdir(parents=True)
+        (staged / "b" / "b.csv").write_text("2\n")
+        second = store.commit(staged, {"b": "2026-01-02"})
+        assert snapshots.current_snapshot_id() == pinned.snapshot_id == first.snapshot_id
+        assert registry.data_version() == f"snapshot-{first.snapshot_id}"
+    assert snapshots.current_processed_dir() == second.processed_dir
+    assert (second.processed_dir / "a" / "a.csv").read_text() == "1\n"
+    assert (second.processed_dir / "b" / "b.csv").exists()
+    assert not (first.processed_dir / "b").exists()
+    assert registry.data_version() == f"snapshot-{second.snapshot_id}"
+    assert set(registry._load_state()) == {"a", "b"}
+
+    third = store.commit(None, {})
+    assert [first.snapshot_id, second.snapshot_id, third.snapshot_id] == [1, 2, 3]
+    assert store.ids() == [2, 3]
+
+    monkeypatch.setenv("SNAPSHOT_RETAIN", "1")
+    with snapshots.pinned_snapshot() as reader:
+        assert reader.snapshot_id == third.snapshot_id
+        fourth = store.commit(None, {})
+        assert store.ids() == [3, 4] and (reader.processed_dir / "a" / "a.csv").exists()
+    store.commit(None, {})
+    assert store.ids() == [5] and not fourth.path.exists()
+
+
+def test_loader_fallback_reports_the_upstream_error(tmp_path, monkeypatch):
+    from app.data import snapshots
+    from app.data.loaders import base, bls
+
+    def unreachable(*args, **kwargs):
+        raise ConnectionError("bls unreachable")
+
+    store = SnapshotStore(tmp_path / "snapshots", tmp_path / "processed", tmp_path / "registry_state.json")
+    monkeypatch.setattr(snapshots, "_store", store)
+    monkeypatch.setattr(bls, "fetch", unreachable)
+    monkeypatch.setattr(bls, "raw_path", lambda dataset_id, filename: tmp_path / "raw" / filename)
+    monkeypatch.setattr(base, "raw_path", lambda dataset_id, filename: tmp_path / "raw" / filename)
+    monkeypatch.setattr(base, "write_table", lambda df, dataset_id: None)
+    monkeypatch.delenv("FORCE_OFFLINE", raising=False)
+
+    jobs = RefreshJobs({"bls_unemployment": bls.refresh}, store, tmp_path / "staging", tmp_path / "refresh.lock")
+    job, _ = jobs.submit()
+    progress = _wait(job).to_dict()["datasets"][0]
+    assert progress["status"] == "fallback" and progress["error"] == "bls unreachable"
+
+
+def test_sqlite_writes_wait_for_the_snapshot_commit(tmp_path):
+    import sqlite3
+
+    import pandas as pd
+
+    from app.data.sqlite import write_table
+
+    db = tmp_path / "app.db"
+    store = SnapshotStore(tmp_path / "snapshots", tmp_path / "processed", tmp_path / "registry_state.json")
+
+    def loader(allow_network=True):
+        path = processed_path("demo", "values.csv")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("value\n1\n")
+        registry.update_dataset_refresh("demo", "2026-01-02")
+        write_table(pd.DataFrame({"value": [1]}), "demo", db)
+        return {"dataset_id": "demo", "status": "downloaded", "rows": "1"}
+
+    def broken_precompute(snapshot, changed):
+        raise RuntimeError("precompute failed")
+
+    jobs = RefreshJobs({"demo": loader}, store, tmp_path / "staging", tmp_path / "refresh.lock", broken_precompute)
+    job, _ = jobs.submit()
+    assert _wait(job).status == "failed" and store.current() is None
+    assert not db.exists()
+
+    jobs.precompute = None
+    job, _ = jobs.submit()
+    assert _wait(job).status == "committed"
+    with sqlite3.connect(db) as conn:
+        assert conn.execute('SELECT COUNT(*) FROM "demo"').fetchone() == (1,)
@@ -0,0 +1,70 @@
+import time
+
+from fastapi.testclient import TestClient
+
+import app.main as main
+from app.core.response_cache import ResponseCache, etag_matches
+from app.data.jobs import RefreshJobs
+from app.data.registry import update_dataset_refresh
+from app.data.snapshots import SnapshotStore
+
+PAYLOAD = {
+    "issue_area": "labor_market",
+    "geography": {"level": "state", "value": "Florida"},
+    "time_horizon": "near_term",
+    "budget_sensitivity": 0.5,
+    "policy_lens": "market",
+}
+
+
+def test_lru_evicts_oldest_and_matches_etags():
+    cache = ResponseCache(2)
+    for key in ("a", "b", "a", "c"):
+        cache.put(key, key)
+    assert cache.get("b") is None
+    assert cache.get("a") == "a"
+    assert etag_matches('W/"x", "y"', '"x"')
+    assert not etag_matches('"z"', '"x"')
+
+
+def test_advice_and_datasets_use_etags_and_invalidate_on_refresh(tmp_path, monkeypatch):
+    calls = []
+    real_advice = main._validated_advice
+
+    def counting_advice(request):
+        calls.append(request)
+        return real_advice(request)
+
+    monkeypatch.setattr(main, "_validated_advice", counting_advice)
+    def demo_loader(allow_network=True):
+        update_dataset_refresh("demo", "2026-01-01")
+        return {"dataset_id": "demo", "status": "downloaded", "rows": "0"}
+
+    jobs = RefreshJobs(loaders={"demo": demo_loader}, store=SnapshotStore(tmp_path / "snapshots"), staging_dir=tmp_path / "staging")
+    jobs.on_commit(main._invalidate_after_refresh)
+    monkeypatch.setattr(main, "refresh_jobs", jobs)
+    monkeypatch.setattr(main, "response_cache", ResponseCache(8))
+    client = TestClient(main.app)
+
+    first = client.post("/api/advice", json=PAYLOAD)
+    second = client.post("/api/advice", json=PAYLOAD)
+    assert first.status_code == second.status_code == 200
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert first.content == second.content
+    assert len(calls) == 1
+
+    revalidated = client.post("/api/advice", json=PAYLOAD, headers={"If-None-Match": first.headers["ETag"]})
+    assert revalidated.status_code == 304
+
+    listing = client.get("/api/datasets")
+    assert listing.json()["datasets"]
+    assert client.get("/api/datasets", headers={"If-None-Match": listing.headers["ETag"]}).status_code == 304
+
+    job_id = client.post("/api/refresh").json()["job_id"]
+    for _ in range(500):
+        if client.get(f"/api/refresh/{job_id}").json()["status"] == "committed":
+            break
+        time.sleep(0.01)
+    assert client.get("/api/datasets", headers={"If-None-Match": listing.headers["ETag"]}).status_code == 200
+    assert client.post("/api/advice", json=PAYLOAD).headers["ETag"] != first.headers["ETag"]
+    assert len(calls) == 2
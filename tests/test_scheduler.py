@@ -0,0 +1,153 @@
+import os
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.data import registry, snapshots
+from app.data.jobs import RefreshJobs
+from app.data.loaders import base, bls
+from app.data.loaders.base import processed_path
+from app.data.lock import refresh_lock
+from app.data.scheduler import RefreshScheduler
+from app.data.snapshots import SnapshotStore
+
+
+def test_scheduler_runs_due_datasets_off_peak_with_backoff_and_breaker(tmp_path, monkeypatch):
+    monkeypatch.setenv("SCHEDULER_WINDOW", "01:00-05:00")
+    monkeypatch.setenv("SCHEDULER_JITTER_MINUTES", "30")
+    monkeypatch.setenv("SCHEDULER_BREAKER_FAILURES", "2")
+    calls = []
+
+    def bls(allow_network=True):
+        calls.append("bls_unemployment")
+        path = processed_path("bls_unemployment", "unemployment.csv")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("series_id,date,value\nLAUST120000000000003,2026-09,3.4\n")
+        registry.update_dataset_refresh("bls_unemployment", "2026-10-01")
+        return {"dataset_id": "bls_unemployment", "status": "downloaded", "rows": "1"}
+
+    def acs(allow_network=True):
+        calls.append("census_acs_fl_county")
+        return {"dataset_id": "census_acs_fl_county", "status": "failed", "rows": "0", "error": "census down"}
+
+    store = SnapshotStore(tmp_path / "snapshots", tmp_path / "processed", tmp_path / "registry_state.json")
+    events = []
+    jobs = RefreshJobs(
+        {"bls_unemployment": bls, "census_acs_fl_county": acs},
+        store,
+        tmp_path / "staging",
+        tmp_path / "refresh.lock",
+        lambda snapshot, changed: events.append(("precompute", snapshot.snapshot_id, store.current())),
+    )
+    jobs.on_commit(lambda job: events.append(("invalidate", job.snapshot_id)))
+    scheduler = RefreshScheduler(jobs, tmp_path / "state.json", random.Random(3))
+
+    assert scheduler.tick(datetime(2026, 10, 1, 12, 0)) is None
+    state = scheduler.load_state()
+    window_start = datetime.fromisoformat(state["window_start"])
+    assert datetime(2026, 10, 2, 1, 0) <= window_start <= datetime(2026, 10, 2, 1, 30)
+
+    first_run = window_start + timedelta(minutes=1)
+    job = scheduler.tick(first_run)
+    assert job.status == "committed" and job.changed == ["bls_unemployment"]
+    assert events == [("precompute", job.snapshot_id, None), ("invalidate", job.snapshot_id)]
+    state = scheduler.load_state()
+    assert state["datasets"]["bls_unemployment"]["failures"] == 0
+    census = state["datasets"]["census_acs_fl_county"]
+    assert census["failures"] == 1 and census["last_error"] == "census down"
+    retry_at = datetime.fromisoformat(census["retry_at"])
+    assert first_run + timedelta(minutes=15) <= retry_at <= first_run + timedelta(minutes=19)
+
+    assert scheduler.tick(first_run + timedelta(minutes=5)) is None
+    calls.clear()
+    job = scheduler.tick(retry_at)
+    assert calls == ["census_acs_fl_county"] and job.status == "unchanged"
+    state = scheduler.load_state()
+    assert state["sources"]["census"]["open_until"]
+
+    later = datetime.fromisoformat(state["datasets"]["census_acs_fl_county"]["retry_at"]) + timedelta(minutes=1)
+    assert scheduler.due(later, state) == []
+
+    with refresh_lock(tmp_path / "refresh.lock") as acquired:
+        assert acquired
+        job = scheduler.tick(later + timedelta(days=8), force=True)
+        assert job.status == "locked"
+    assert scheduler.load_state()["datasets"]["bls_unemployment"]["failures"] == 0
+
+
+class UnreachableSession:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def request(self, *args, **kwargs):
+        raise ConnectionError("api.bls.gov unreachable")
+
+
+def test_repeated_fixture_fallbacks_back_off_and_open_the_breaker(tmp_path, monkeypatch):
+    monkeypatch.setenv("SCHEDULER_BREAKER_FAILURES", "2")
+    monkeypatch.delenv("FORCE_OFFLINE", raising=False)
+    store = SnapshotStore(tmp_path / "snapshots", tmp_path / "processed", tmp_path / "registry_state.json")
+    monkeypatch.setattr(snapshots, "_store", store)
+    monkeypatch.setattr(bls.requests, "Session", UnreachableSession)
+    monkeypatch.setattr(bls, "raw_path", lambda dataset_id, filename: tmp_path / "raw" / filename)
+    monkeypatch.setattr(base, "raw_path", lambda dataset_id, filename: tmp_path / "raw" / filename)
+    monkeypatch.setattr(base, "write_table", lambda df, dataset_id: None)
+    jobs = RefreshJobs({"bls_unemployment": bls.refresh}, store, tmp_path / "staging", tmp_path / "refresh.lock")
+    scheduler = RefreshScheduler(jobs, tmp_path / "state.json", random.Random(5))
+
+    first_run = datetime(2026, 10, 2, 2, 0)
+    assert scheduler.tick(first_run, force=True).status == "committed"
+    entry = scheduler.load_state()["datasets"]["bls_unemployment"]
+    assert entry["last_status"] == "fallback" and entry["failures"] == 1
+    assert "unreachable" in entry["last_error"] and entry.get("last_success") is None
+
+    retry_at = datetime.fromisoformat(entry["retry_at"])
+    assert scheduler.tick(retry_at, force=True).status == "unchanged"
+    state = scheduler.load_state()
+    assert state["datasets"]["bls_unemployment"]["failures"] == 2
+    assert state["sources"]["bls"]["open_until"]
+
+
+def test_refresh_lock_follows_the_holder_not_the_file_age(tmp_path):
+    path = tmp_path / "refresh.lock"
+    path.write_text('{"pid": 1}')
+    os.utime(path, (0, 0))
+    with refresh_lock(path) as first:
+        assert first
+        os.utime(path, (0, 0))
+        with refresh_lock(path) as second:
+            assert not second
+    with refresh_lock(path) as again:
+        assert again
+
+
+def test_fred_series_are_refreshed_on_their_own_cadence(tmp_path, monkeypatch):
+    catalog = tmp_path / "fred.csv"
+    catalog.write_text("series_id,series_name,state,frequency\n{state}UR,Rate,*,M\nICSA,Claims,*,W\n{state}NGSP,GDP,*,A\n")
+    monkeypatch.setenv("FRED_CATALOG", str(catalog))
+    requested = []
+
+    def fred(allow_network=True, series=None):
+        requested.append(sorted(series))
+        return {"dataset_id": "fred_macro", "status": "unchanged", "rows": "0"}
+
+    jobs = RefreshJobs(
+        {"fred_macro": fred},
+        SnapshotStore(tmp_path / "snapshots", tmp_path / "processed", tmp_path / "registry_state.json"),
+        tmp_path / "staging",
+        tmp_path / "refresh.lock",
+    )
+    scheduler = RefreshScheduler(jobs, tmp_path / "state.json", random.Random(1))
+    start = datetime(2026, 10, 2, 2, 0)
+    scheduler.tick(start, force=True)
+    scheduler.tick(start + timedelta(days=3), force=True)
+    scheduler.tick(start + timedelta(days=8), force=True)
+    assert requested == [["ICSA", "{state}NGSP", "{state}UR"], ["ICSA"], ["ICSA", "{state}UR"]]
+
+    catalog.write_text("series_id,series_name,state,frequency\nX,Odd,*,Z\n")
+    with pytest.raises(ValueError):
+        scheduler.due(start, scheduler.load_state())
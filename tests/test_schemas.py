@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+from app.data.schemas import apply_schema, memory_report, read_typed, widen, write_csv
+
+
+def test_schema_round_trip_keeps_file_format_and_shrinks_frames(tmp_path):
+    counties = [f"{state:02d}{county:03d}" for state in range(1, 51) for county in range(1, 61)]
+    months = pd.date_range("2010-01-01", periods=24, freq="MS").strftime("%Y-%m")
+    df = pd.DataFrame({
+        "series_id": np.repeat([f"LAUCN{fips}0000000003" for fips in counties], len(months)),
+        "measure": "unemployment_rate",
+        "date": np.tile(months, len(counties)),
+        "value": np.round(np.random.default_rng(1).uniform(2, 9, len(counties) * len(months)), 1),
+    })
+    target = tmp_path / "bls_unemployment" / "county.csv"
+    target.parent.mkdir()
+    stored = write_csv(df, target, "bls_unemployment")
+
+    assert target.read_text().splitlines()[1] == f"LAUCN010010000000003,unemployment_rate,2010-01,{df['value'].iloc[0]}"
+    loaded = read_typed(target, "bls_unemployment")
+    assert loaded.dtypes.astype(str).tolist() == ["category", "category", "datetime64[ns]", "float32"]
+    assert loaded.equals(apply_schema(df, "bls_unemployment"))
+    assert stored["value"].tolist() == df["value"].tolist()
+
+    population = tmp_path / "population.csv"
+    write_csv(pd.DataFrame({"county_fips": ["06037"], "year": [2023], "population": [21538187]}), population, "cdc_places")
+    assert population.read_text().splitlines()[1] == "06037,2023,21538187.0"
+
+    report = memory_report(tmp_path).set_index("dataset_id").loc["bls_unemployment"]
+    assert report["rows"] == len(df)
+    assert report["memory_bytes"] * 4 < report["untyped_memory_bytes"]
+
+
+def test_acs_rates_round_trip_without_float32_noise(tmp_path):
+    from app.data.loaders.base import fixture_path
+    from app.data.loaders.census_acs import VARIABLES, _process_acs_json
+
+    fixture = pd.read_csv(fixture_path("census_acs_fl_county", "acs_county.csv")).iloc[0]
+    payload = [
+        VARIABLES + ["state", "county"],
+        [fixture["county_name"], "60000", "1650", str(round(fixture["poverty_rate"] * fixture["population"])),
+         str(fixture["population"]), str(fixture["total_population"]), str(fixture["housing_units"]),
+         str(fixture["vacant_units"]), str(fixture["median_home_value"]), "12", "086"],
+    ]
+    target = tmp_path / "acs.csv"
+    write_csv(_process_acs_json(payload), target, "census_acs_fl_county")
+    stored = pd.read_csv(target).iloc[0]
+    assert stored["poverty_rate"] == fixture["poverty_rate"] == 0.158
+    assert stored["vacancy_rate"] == fixture["vacancy_rate"] == 0.06
+    assert stored["rent_to_income"] == fixture["rent_to_income"] == 0.33
+    assert ",0.158,0.06,0.33," in target.read_text()
+
+
+def test_request_reads_are_typed_and_widen_exactly():
+    from app.data.loaders.base import DATA_DIR
+    from app.services.forecast import _load_processed
+
+    df = _load_processed("bls_unemployment", "unemployment.csv", DATA_DIR / "fixtures")
+    assert df.dtypes.astype(str).tolist() == ["category", "datetime64[ns]", "float32"]
+    raw = pd.read_csv(DATA_DIR / "fixtures" / "bls_unemployment" / "unemployment.csv")
+    assert widen(df["value"]).tolist() == raw["value"].tolist()
@@ -0,0 +1,45 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.series import lttb
+
+client = TestClient(app)
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(10_000, dtype=float)
+    y = np.sin(x / 500.0)
+    y[4321] = 25.0
+    keep = lttb(x, y, 200)
+    assert len(keep) == 200
+    assert keep[0] == 0 and keep[-1] == 9_999
+    assert 4321 in keep
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_series_endpoints_paginate_and_align():
+    full = client.get("/api/series/labor_unemployment_bls")
+    assert full.status_code == 200
+    data = full.json()
+    assert data["citations"] == ["bls_unemployment"]
+    assert len(data["dates"]) == len(data["values"]) == data["total_points"]
+
+    page = client.get("/api/series/labor_unemployment_bls", params={"limit": 1, "offset": 1}).json()
+    assert page["dates"] == data["dates"][1:2] and page["next_offset"] == 2
+
+    sampled = client.get("/api/series/labor_unemployment_bls", params={"max_points": 3, "end": data["dates"][1]}).json()
+    assert sampled["total_points"] == 2 and not sampled["downsampled"]
+
+    aligned = client.get(
+        "/api/series",
+        params={"metrics": "labor_unemployment_bls,fiscal_real_gdp", "level": "county", "value": "12086"},
+    ).json()
+    assert len(aligned["values"]["labor_unemployment_bls"]) == len(aligned["values"]["fiscal_real_gdp"]) == len(aligned["dates"])
+    capped = client.get(
+        "/api/series",
+        params={"metrics": "labor_unemployment_bls,fiscal_real_gdp", "max_points": 3},
+    ).json()
+    assert capped["total_points"] > 3 and capped["downsampled"]
+    assert len(capped["dates"]) == len(capped["values"]["fiscal_real_gdp"]) == 3
+    assert client.get("/api/series/unknown_metric").status_code == 404
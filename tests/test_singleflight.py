@@ -0,0 +1,68 @@
+import asyncio
+
+from app.core.singleflight import SingleFlight, request_key
+from app.models import AdviceRequest, Geography
+
+
+def _request(**overrides):
+    fields = {
+        "issue_area": "labor_market",
+        "geography": Geography(level="state", value="Florida"),
+        "time_horizon": "near_term",
+        "budget_sensitivity": 0.5,
+        "policy_lens": "market",
+    }
+    fields.update(overrides)
+    return AdviceRequest(**fields)
+
+
+def test_request_key_is_canonical_and_versioned():
+    assert request_key(_request(), "1", "a") == request_key(_request(), "1", "a")
+    assert request_key(_request(), "1", "a") != request_key(_request(), "2", "a")
+    assert request_key(_request(), "1", "a") != request_key(_request(policy_lens="equity"), "1", "a")
+
+
+def test_concurrent_identical_requests_share_one_computation():
+    flights = SingleFlight()
+    calls = []
+
+    async def compute(abandoned, value):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        return {"value": value}
+
+    async def scenario():
+        results = await asyncio.gather(
+            *[flights.do("same", lambda abandoned: compute(abandoned, 1)) for _ in range(5)],
+            flights.do("other", lambda abandoned: compute(abandoned, 2)),
+        )
+        assert flights.in_flight == 0
+        return results
+
+    results = asyncio.run(scenario())
+    assert sorted(calls) == [1, 2]
+    assert all(result is results[0] for result in results[:5])
+    assert results[5] == {"value": 2}
+
+
+def test_shared_work_is_abandoned_only_when_every_waiter_disconnects():
+    flights = SingleFlight()
+    seen = []
+
+    async def gone():
+        return True
+
+    async def connected():
+        return False
+
+    async def compute(abandoned):
+        await asyncio.sleep(0.01)
+        seen.append(await abandoned())
+        return "done"
+
+    async def scenario():
+        await asyncio.gather(flights.do("k", compute, gone), flights.do("k", compute, connected))
+        await flights.do("k", compute, gone)
+
+    asyncio.run(scenario())
+    assert seen == [False, True]